@@ -2,12 +2,14 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from database import get_db
 import models
 import schemas
+from services.stream_ticket_service import StreamTicketService
+from write_coordinator import WriteCoordinatorError, write_coordinator
 import os
 from dotenv import load_dotenv
 
@@ -19,6 +21,8 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# For event streams: EventSource can't set headers, so a stream ticket may come instead
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -97,3 +101,33 @@ def get_current_teacher(
     if not isinstance(current_user, models.TeacherAuth):
         raise HTTPException(status_code=403, detail="Not a teacher")
     return current_user.teacher
+
+def get_current_stream_admin(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    ticket: Optional[str] = Query(None, description="Stream ticket from POST /api/v1/events/ticket, for clients that can't send headers"),
+    db: Session = Depends(get_db, scope="function")
+):
+    """
+    Super admin for long-lived streams, from the bearer token or a stream
+    ticket (never a token in the URL, where access logs would keep it).
+    The session closes once the endpoint returns rather than when the
+    stream ends.
+    """
+    if token:
+        return get_current_super_admin(get_current_user(token, db))
+    if not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        username = write_coordinator.run(db, lambda: StreamTicketService(db).redeem(ticket))
+    except WriteCoordinatorError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+    user = db.query(models.User).filter(models.User.username == username).first()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    return get_current_super_admin(user)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Concurrent latency benchmark for the read endpoints.
+
+Run the API first (uvicorn main:app), then:
+    python benchmarks/latency.py --url http://localhost:8000 --username superadmin --password password123
+
+Prints request count, throughput and p50/p95/p99 latency per endpoint.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/v1/teachers",
+    "/api/v1/courses",
+    "/api/v1/semesters",
+    "/api/v1/reports/cumulative/1",
+]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> dict:
+    response = await client.post(
+        "/api/v1/token", data={"username": username, "password": password}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def run_path(client, path, headers, concurrency, total):
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                response = await client.get(path, headers=headers)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--username", default="superadmin")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS)
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        headers = await login(client, args.username, args.password)
+        print(f"{'endpoint':45} {'reqs':>6} {'err':>4} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for path in args.paths:
+            latencies, errors, elapsed = await run_path(
+                client, path, headers, args.concurrency, args.requests
+            )
+            print(
+                f"{path:45} {len(latencies):6d} {errors:4d} {len(latencies) / elapsed:8.1f} "
+                f"{statistics.median(latencies):7.1f}ms {percentile(latencies, 95):7.1f}ms "
+                f"{percentile(latencies, 99):7.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Memory per activity row on the report read path: ORM instances vs records.
+
+Fills a scratch SQLite database with --rows script evaluation rows, then
+loads them for one semester twice and reports the memory the loaded rows hold:
+
+- ORM: select(ScriptEvaluation) into a Session (identity map, instance state)
+- records: the table's columns unpacked into ScriptEvaluationRecord, as
+  RemunerationRepository does for reports and PDFs
+
+Run from the backend directory:
+    python benchmarks/report_memory.py --rows 100000
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+import models
+from database import Base
+from repositories.records import ScriptEvaluationRecord
+
+
+def fill(engine, rows: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Teacher), [
+            {"id": f"T{i}", "name": f"Teacher {i}", "designation": "Lecturer", "department": "CSE"}
+            for i in range(200)
+        ])
+        conn.execute(insert(models.ExamSemester), [{"id": 1, "year": 2024, "semester_name": "1st Semester"}])
+        conn.execute(insert(models.ScriptEvaluation), [
+            {"activity_type": "script_evaluations", "teacher_id": f"T{i % 200}", "exam_semester_id": 1, "course_code": f"CSE-{4100 + i % 40}",
+             "script_type": "Final", "script_count": i % 90}
+            for i in range(rows)
+        ])
+
+
+def load_orm(engine):
+    session = Session(engine)
+    rows = session.execute(
+        select(models.ScriptEvaluation).where(models.ScriptEvaluation.exam_semester_id == 1)
+    ).scalars().all()
+    return session, rows
+
+
+def load_records(engine):
+    with Session(engine) as session:
+        result = session.execute(
+            select(*models.ScriptEvaluation.activity_columns())
+            .where(models.ScriptEvaluation.activity_type == "script_evaluations",
+                   models.ScriptEvaluation.exam_semester_id == 1)
+        )
+        return None, [ScriptEvaluationRecord(*row) for row in result]
+
+
+def measure(loader, engine):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    session, rows = loader(engine)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(rows)
+    if session is not None:
+        session.close()
+    return count, retained, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        fill(engine, args.rows)
+        print(f"{'loader':8} {'rows':>8} {'held MB':>9} {'peak MB':>9} {'B/row':>7} {'MB/100k':>8} {'load s':>7}")
+        for name, loader in (("ORM", load_orm), ("records", load_records)):
+            count, retained, peak, elapsed = measure(loader, engine)
+            per_row = retained / count
+            print(f"{name:8} {count:8} {retained / 1e6:9.1f} {peak / 1e6:9.1f} {per_row:7.0f} "
+                  f"{per_row * 100_000 / 1e6:8.1f} {elapsed:7.2f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
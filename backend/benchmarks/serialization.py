@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Serialization and wire-size benchmark for the heavy report payloads.
+
+Builds the cumulative report and a sample of teachers' remuneration listings from
+the database in DATABASE_URL, then compares:
+
+- encode time: FastAPI's default path (jsonable_encoder + json.dumps, what
+  JSONResponse does) against FastJSONResponse (orjson)
+- bytes on the wire: uncompressed, gzip and brotli at the levels
+  utils.compression uses
+
+Run from the backend directory:
+    DATABASE_URL=sqlite:///./du_remuneration2.db python benchmarks/serialization.py --semester 1
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+
+import models
+from database import AsyncSessionLocal
+from services.remuneration_service import AsyncRemunerationService
+from utils.compression import BROTLI_QUALITY, GZIP_LEVEL, brotli
+from utils.responses import FastJSONResponse
+
+
+def default_render(content) -> bytes:
+    # Same as starlette's JSONResponse.render after FastAPI's serialize_response
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def fast_render(content) -> bytes:
+    return FastJSONResponse(content).body
+
+
+def time_ms(func, content, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func(content)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def wire_sizes(body: bytes) -> dict:
+    gzip = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    sizes = {"raw": len(body), "gzip": len(gzip.compress(body) + gzip.flush())}
+    if brotli is not None:
+        sizes["br"] = len(brotli.compress(body, quality=BROTLI_QUALITY))
+    return sizes
+
+
+async def load_payloads(semester_id: int, teachers: int) -> dict:
+    """Payloads as the endpoints build them (async service, ORM rows included)"""
+    async with AsyncSessionLocal() as db:
+        service = AsyncRemunerationService(db)
+        cumulative = await service.get_cumulative_report(semester_id)
+        teacher_ids = (await db.execute(select(models.Teacher.id).limit(teachers))).scalars().all()
+        listings = [await service.get_teacher_all_remunerations(teacher_id) for teacher_id in teacher_ids]
+    return {"cumulative report": cumulative, f"{len(listings)} teacher listings": listings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--semester", type=int, default=1)
+    parser.add_argument("--teachers", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    payloads = asyncio.run(load_payloads(args.semester, args.teachers))
+    print(f"{'payload':25} {'json ms':>9} {'orjson ms':>10} {'raw B':>10} {'gzip B':>10} {'br B':>10}")
+    for name, content in payloads.items():
+        if default_render(content) != fast_render(content):
+            print(f"warning: {name}: orjson output differs from the default encoder")
+        sizes = wire_sizes(fast_render(content))
+        print(
+            f"{name:25} {time_ms(default_render, content, args.rounds):9.1f} "
+            f"{time_ms(fast_render, content, args.rounds):10.1f} {sizes['raw']:10} "
+            f"{sizes['gzip']:10} {sizes.get('br', '-'):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
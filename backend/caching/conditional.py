@@ -0,0 +1,54 @@
+"""
+Conditional GET support: strong ETags, If-None-Match -> 304 and Cache-Control.
+
+Endpoints compute an ETag from data versions or cached content hashes
+*before* loading and serializing the response body, so a matching
+If-None-Match costs neither database work nor JSON encoding.
+"""
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Responses may be stored but must be revalidated on every use; cheap with 304s
+REVALIDATE = "no-cache"
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag hashing the JSON form of `parts`"""
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return '"' + hashlib.sha1(encoded).hexdigest()[:24] + '"'
+
+
+def _strip_coding(tag: str) -> str:
+    """Undo the -gzip/-br suffix utils.compression adds to tags of compressed responses"""
+    for suffix in ('-gzip"', '-br"'):
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match comparison (weak comparison, as RFC 9110 requires for it)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in header.split(","))
+    return any(_strip_coding(tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+
+def conditional_get(request: Request, response: Response, etag: str,
+                    cache_control: str = PRIVATE_REVALIDATE) -> Optional[Response]:
+    """
+    Tag the response with `etag` and `cache_control`; return a 304 response
+    to send instead when the client already holds this version.
+    """
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return None
@@ -0,0 +1,258 @@
+"""
+Cross-worker cache invalidation.
+
+Every uvicorn worker keeps its own in-process caches, so a write handled by
+one worker has to reach the others. Writers call `invalidation_bus.publish()`
+with the names of the affected cache keys after their transaction commits:
+
+- the version of each name is bumped in the cache_versions table
+- local listeners are notified immediately
+- every worker polls cache_versions every CACHE_INVALIDATION_POLL_SECONDS
+  (default 1s) and notifies its listeners of names whose version moved, so
+  other workers drop stale entries within one poll interval. On SQLite the
+  poll first reads `PRAGMA data_version`, which only changes when another
+  connection commits, and skips the table read when nothing was written
+
+With CACHE_INVALIDATION_REDIS_URL set (requires the `redis` package; any
+Redis-protocol server works), publish() also sends the names on a pub/sub
+channel and subscribers re-read cache_versions as soon as a message arrives
+instead of waiting for the next poll. The table stays the source of truth
+and polling keeps running, so a lost message only costs latency.
+
+The versions themselves are readable with `version(name)`, e.g. for ETags.
+
+If the shared bump fails (e.g. the database is locked past the retries),
+this worker still advances its own versions, so its caches and ETags move
+on, and keeps the names pending: every poll retries the bump until it goes
+through and the other workers see it. `pending_count` reports how many
+names are waiting.
+"""
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+
+import models
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+CACHE_INVALIDATION_POLL_SECONDS = float(os.getenv("CACHE_INVALIDATION_POLL_SECONDS", "1.0"))
+CACHE_INVALIDATION_REDIS_URL = os.getenv("CACHE_INVALIDATION_REDIS_URL")
+REDIS_CHANNEL = "cache-invalidation"
+
+Listener = Callable[[Set[str]], None]
+
+_versions_table = models.CacheVersion.__table__
+
+
+class InvalidationBus:
+    """Publishes cache key changes and relays other workers' changes to local listeners"""
+
+    def __init__(self, engine: Engine, poll_interval: float = CACHE_INVALIDATION_POLL_SECONDS,
+                 redis_url: Optional[str] = CACHE_INVALIDATION_REDIS_URL):
+        self.engine = engine
+        self.poll_interval = poll_interval
+        self.redis_url = redis_url
+        self._listeners: List[Listener] = []
+        self._versions: Dict[str, int] = {}
+        # Names whose shared bump failed; their local version is ahead of the table
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._redis = None
+
+    def subscribe(self, listener: Listener) -> None:
+        """Call `listener(names)` whenever cache keys change, locally or in another worker"""
+        self._listeners.append(listener)
+
+    def version(self, name: str) -> int:
+        """Last known version of a cache key (0 if it was never bumped)"""
+        return self._versions.get(name, 0)
+
+    def versions(self, prefix: str = "") -> Dict[str, int]:
+        """Known versions of all cache keys starting with `prefix`"""
+        with self._lock:
+            return {name: version for name, version in self._versions.items() if name.startswith(prefix)}
+
+    @property
+    def pending_count(self) -> int:
+        """Names whose change other workers have not been told about yet"""
+        return len(self._pending)
+
+    def publish(self, *names: str) -> None:
+        """Announce that the data behind `names` changed; call after the write commits"""
+        if not names:
+            return
+        with self._lock:
+            bumped = set(names) | self._pending
+        try:
+            versions = self._bump(bumped)
+        except Exception as e:
+            # Move this worker on anyway; the poll loop retries the shared bump
+            logger.error("Could not record cache invalidation for %s, retrying: %s", names, e)
+            with self._lock:
+                for name in names:
+                    self._versions[name] = self._versions.get(name, 0) + 1
+                self._pending.update(names)
+            self._wakeup.set()
+            self._notify(set(names))
+            return
+        with self._lock:
+            self._pending -= bumped
+            for name, version in versions.items():
+                self._versions[name] = max(self._versions.get(name, 0), version)
+        self._notify(set(names))
+        self._publish_redis(bumped)
+
+    def _retry_pending(self) -> None:
+        """Record the pending names' changes in the table; raises if that still fails"""
+        with self._lock:
+            pending = set(self._pending)
+        if not pending:
+            return
+        versions = self._bump(pending)
+        with self._lock:
+            self._pending -= pending
+            for name, version in versions.items():
+                self._versions[name] = max(self._versions.get(name, 0), version)
+        # The table now counts these changes; other workers pick them up as usual
+        self._notify(pending)
+        self._publish_redis(pending)
+        logger.info("Recorded pending cache invalidation for %s", sorted(pending))
+
+    def _bump(self, names: Iterable[str]) -> Dict[str, int]:
+        insert = sqlite_insert if self.engine.dialect.name == "sqlite" else postgresql_insert
+        names = sorted(set(names))
+        with self.engine.begin() as conn:
+            for name in names:
+                conn.execute(insert(_versions_table).values(name=name, version=0).on_conflict_do_nothing())
+                conn.execute(
+                    update(_versions_table)
+                    .where(_versions_table.c.name == name)
+                    .values(version=_versions_table.c.version + 1)
+                )
+            rows = conn.execute(
+                select(_versions_table.c.name, _versions_table.c.version)
+                .where(_versions_table.c.name.in_(names))
+            )
+            return {name: version for name, version in rows}
+
+    def refresh(self, notify: bool = True) -> Set[str]:
+        """Re-read cache_versions and notify listeners of names that moved"""
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(_versions_table.c.name, _versions_table.c.version)).all()
+        changed = set()
+        with self._lock:
+            for name, version in rows:
+                if name in self._pending:
+                    # This worker's own change is not in the table yet: stay ahead of it
+                    version += 1
+                if self._versions.get(name, 0) < version:
+                    self._versions[name] = version
+                    changed.add(name)
+        if changed and notify:
+            self._notify(changed)
+        return changed
+
+    def _notify(self, names: Set[str]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(names)
+            except Exception as e:
+                logger.warning("Cache invalidation listener failed for %s: %s", names, e)
+
+    def start(self) -> None:
+        """Load current versions and start the polling (and Redis subscriber) threads"""
+        if self._threads:
+            return
+        self._stop.clear()
+        try:
+            self.refresh(notify=False)
+        except Exception as e:
+            logger.warning("Could not load cache versions: %s", e)
+        self._threads.append(threading.Thread(target=self._poll_loop, name="cache-invalidation-poll", daemon=True))
+        if self.redis_url:
+            self._threads.append(threading.Thread(target=self._redis_loop, name="cache-invalidation-redis", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def _poll_loop(self) -> None:
+        is_sqlite = self.engine.dialect.name == "sqlite"
+        watcher = None
+        data_version = None
+        while not self._stop.is_set():
+            woken = self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            if self._stop.is_set():
+                break
+            try:
+                if self._pending:
+                    self._retry_pending()
+                if is_sqlite and not woken:
+                    if watcher is None:
+                        watcher = self.engine.raw_connection()
+                    cursor = watcher.cursor()
+                    cursor.execute("PRAGMA data_version")
+                    current = cursor.fetchone()[0]
+                    cursor.close()
+                    if current == data_version:
+                        continue
+                    data_version = current
+                self.refresh()
+            except Exception as e:
+                logger.warning("Cache invalidation poll failed: %s", e)
+                if watcher is not None:
+                    watcher.invalidate()
+                    watcher = None
+                data_version = None
+        if watcher is not None:
+            watcher.close()
+
+    def _redis_client(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url)
+        return self._redis
+
+    def _publish_redis(self, names: Iterable[str]) -> None:
+        if not self.redis_url:
+            return
+        try:
+            self._redis_client().publish(REDIS_CHANNEL, json.dumps(sorted(names)))
+        except Exception as e:
+            logger.warning("Could not publish cache invalidation to Redis: %s", e)
+
+    def _redis_loop(self) -> None:
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self._redis_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(REDIS_CHANNEL)
+                while not self._stop.is_set():
+                    if pubsub.get_message(timeout=1.0) is not None:
+                        self._wakeup.set()
+            except Exception as e:
+                logger.warning("Redis invalidation subscriber failed, retrying: %s", e)
+                self._stop.wait(self.poll_interval)
+            finally:
+                if pubsub is not None:
+                    pubsub.close()
+
+
+invalidation_bus = InvalidationBus(engine)
@@ -0,0 +1,155 @@
+"""
+Read-through cache for reference data: teachers, courses and exam semesters.
+
+These tables are small, read on every form load and change a few times a
+semester, so each one is cached as a whole-table snapshot with a TTL
+(REFERENCE_CACHE_TTL_SECONDS, default 300). Lookups by key and by department
+are served from the snapshot. The services invalidate a table explicitly
+after their create_* paths commit; invalidations go through the
+invalidation bus, so the other workers drop their snapshot too. The TTL
+still bounds staleness for writes that bypass the services (seed scripts,
+manual SQL).
+
+Snapshots are loaded through a private session that is closed straight
+away, so the cached ORM instances are detached, fully loaded, and never
+expired by a commit in some request's session. Treat them as read-only and
+don't navigate their relationships.
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Type
+
+from caching.conditional import make_etag
+from caching.invalidation import invalidation_bus
+from database import AsyncSessionLocal, SessionLocal
+from monitoring.metrics import record_cache_lookup
+from repositories.course_repository import AsyncCourseRepository, CourseRepository
+from repositories.exam_semester_repository import AsyncExamSemesterRepository, ExamSemesterRepository
+from repositories.teacher_repository import AsyncTeacherRepository, TeacherRepository
+
+REFERENCE_CACHE_TTL_SECONDS = float(os.getenv("REFERENCE_CACHE_TTL_SECONDS", "300"))
+
+
+class ReferenceSnapshot:
+    """All rows of a table, in table order and indexed by primary key"""
+
+    __slots__ = ("items", "by_key", "expires_at", "_etag")
+
+    def __init__(self, items: List[Any], key: str, ttl: float):
+        self.items = items
+        self.by_key: Dict[Any, Any] = {getattr(item, key): item for item in items}
+        self.expires_at = time.monotonic() + ttl
+        self._etag: Optional[str] = None
+
+    @property
+    def etag(self) -> str:
+        """Content hash of the snapshot's column values, computed once"""
+        if self._etag is None:
+            columns = self.items[0].__table__.columns.keys() if self.items else []
+            self._etag = make_etag([[getattr(item, column) for column in columns] for item in self.items])
+        return self._etag
+
+    def filter_by(self, attribute: str, value: Any) -> List[Any]:
+        return [item for item in self.items if getattr(item, attribute) == value]
+
+
+class ReferenceTable:
+    """TTL-cached snapshot of one reference table, loadable from sync or async code"""
+
+    def __init__(self, name: str, repository_class: Type, async_repository_class: Type,
+                 key: str, ttl: float = REFERENCE_CACHE_TTL_SECONDS):
+        self.name = name
+        self.repository_class = repository_class
+        self.async_repository_class = async_repository_class
+        self.key = key
+        self.ttl = ttl
+        self._snapshot: Optional[ReferenceSnapshot] = None
+        self._generation = 0
+        self._load_lock = threading.Lock()
+        # asyncio locks belong to one event loop; a new loop (e.g. a test client) gets its own
+        self._async_load_lock: Optional[asyncio.Lock] = None
+        self._async_load_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _fresh(self) -> Optional[ReferenceSnapshot]:
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.expires_at > time.monotonic():
+            return snapshot
+        return None
+
+    def _store(self, items: List[Any], generation: int) -> ReferenceSnapshot:
+        snapshot = ReferenceSnapshot(items, self.key, self.ttl)
+        # An invalidation that happened while loading wins over the loaded rows
+        if generation == self._generation:
+            self._snapshot = snapshot
+        return snapshot
+
+    def get(self) -> ReferenceSnapshot:
+        snapshot = self._fresh()
+        record_cache_lookup(self.name, snapshot is not None)
+        if snapshot is not None:
+            return snapshot
+        with self._load_lock:
+            snapshot = self._fresh()
+            if snapshot is not None:
+                return snapshot
+            generation = self._generation
+            db = SessionLocal()
+            try:
+                items = self.repository_class(db).get_all()
+            finally:
+                db.close()
+            return self._store(items, generation)
+
+    async def get_async(self) -> ReferenceSnapshot:
+        snapshot = self._fresh()
+        record_cache_lookup(self.name, snapshot is not None)
+        if snapshot is not None:
+            return snapshot
+        async with self._async_lock():
+            # Concurrent misses wait for the first one's load instead of each reloading the table
+            snapshot = self._fresh()
+            if snapshot is not None:
+                return snapshot
+            generation = self._generation
+            async with AsyncSessionLocal() as db:
+                items = await self.async_repository_class(db).get_all()
+            return self._store(items, generation)
+
+    def _async_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._async_load_loop is not loop:
+            self._async_load_lock = asyncio.Lock()
+            self._async_load_loop = loop
+        return self._async_load_lock
+
+    def invalidate(self) -> None:
+        """Drop this table's snapshot in every worker"""
+        invalidation_bus.publish(self.name)
+
+    def _drop(self) -> None:
+        self._generation += 1
+        self._snapshot = None
+
+
+teachers = ReferenceTable("teachers", TeacherRepository, AsyncTeacherRepository, "id")
+courses = ReferenceTable("courses", CourseRepository, AsyncCourseRepository, "course_code")
+semesters = ReferenceTable("semesters", ExamSemesterRepository, AsyncExamSemesterRepository, "id")
+
+TABLES: Dict[str, ReferenceTable] = {table.name: table for table in (teachers, courses, semesters)}
+
+
+def invalidate(*names: str) -> None:
+    """Drop the cached snapshots of the named tables (all tables if none given) in every worker"""
+    invalidation_bus.publish(*(names or TABLES))
+
+
+def _on_invalidation(names) -> None:
+    for name in names:
+        table = TABLES.get(name)
+        if table is not None:
+            table._drop()
+
+
+invalidation_bus.subscribe(_on_invalidation)
@@ -0,0 +1,89 @@
+"""
+Per-semester data versions and the report cache keyed by them.
+
+Every commit that changes a semester's remuneration rows (submissions,
+bulk saves, deletes) bumps that semester's data version through the
+invalidation bus, which propagates it to all workers. Computed reports are
+cached together with the version they were built from and served until the
+version moves, so repeated reads cost a dict lookup. The version doubles as
+the report's ETag.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from caching.invalidation import invalidation_bus
+from monitoring.metrics import record_cache_lookup
+
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "64"))
+
+SEMESTER_KEY_PREFIX = "semester:"
+
+
+def semester_key(semester_id: int) -> str:
+    return f"{SEMESTER_KEY_PREFIX}{semester_id}"
+
+
+def semester_version(semester_id: int) -> int:
+    """Current data version of a semester as known to this worker"""
+    return invalidation_bus.version(semester_key(semester_id))
+
+
+def semester_versions() -> Dict[str, int]:
+    """Data versions of every semester that has been written to"""
+    return invalidation_bus.versions(SEMESTER_KEY_PREFIX)
+
+
+def bump_semesters(semester_ids: Iterable[int]) -> None:
+    """Mark the semesters' data as changed; call after the write commits"""
+    invalidation_bus.publish(*(semester_key(semester_id) for semester_id in set(semester_ids)))
+
+
+def semester_etag(semester_id: int, version: int, kind: str) -> str:
+    return f'"{kind}-{semester_id}-v{version}"'
+
+
+class VersionedCache:
+    """Values cached per semester together with the data version they were built from"""
+
+    def __init__(self, name: str, max_entries: int = REPORT_CACHE_MAX_ENTRIES):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, semester_id: int, version: int) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(semester_id)
+            hit = entry is not None and entry[0] == version
+            if hit:
+                self._entries.move_to_end(semester_id)
+        record_cache_lookup(self.name, hit)
+        return entry[1] if hit else None
+
+    def put(self, semester_id: int, version: int, value: Any) -> None:
+        with self._lock:
+            self._entries[semester_id] = (version, value)
+            self._entries.move_to_end(semester_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def drop(self, semester_id: int) -> None:
+        with self._lock:
+            self._entries.pop(semester_id, None)
+
+
+cumulative_reports = VersionedCache("cumulative_report")
+
+
+def _on_invalidation(names) -> None:
+    # Stale entries would be ignored anyway (version mismatch); this frees them early
+    for name in names:
+        if name.startswith(SEMESTER_KEY_PREFIX):
+            semester_id = name[len(SEMESTER_KEY_PREFIX):]
+            if semester_id.isdigit():
+                cumulative_reports.drop(int(semester_id))
+
+
+invalidation_bus.subscribe(_on_invalidation)
@@ -3,6 +3,10 @@ from sqlalchemy import and_
 import models
 import schemas
 from typing import List
+from caching.report_cache import bump_semesters
+from repositories.summary_repository import SummaryRepository
+from repositories.rollup_repository import RollupRepository
+from repositories.change_log_repository import ChangeLogRepository
 
 def get_teacher_by_id(db: Session, teacher_id: str):
     return db.query(models.Teacher).filter(models.Teacher.id == teacher_id).first()
@@ -52,46 +56,13 @@ def create_semester(db: Session, semester: schemas.ExamSemesterCreate):
     return db_semester
 
 def submit_remuneration(db: Session, data: schemas.RemunerationSubmission):
-    # Delete existing records for this teacher and semester
-    db.query(models.QuestionPreparation).filter(
-        and_(models.QuestionPreparation.teacher_id == data.teacher_id,
-             models.QuestionPreparation.exam_semester_id == data.exam_semester_id)
-    ).delete()
-    
-    db.query(models.QuestionModeration).filter(
-        and_(models.QuestionModeration.teacher_id == data.teacher_id,
-             models.QuestionModeration.exam_semester_id == data.exam_semester_id)
-    ).delete()
-    
-    db.query(models.ScriptEvaluation).filter(
-        and_(models.ScriptEvaluation.teacher_id == data.teacher_id,
-             models.ScriptEvaluation.exam_semester_id == data.exam_semester_id)
-    ).delete()
-    
-    db.query(models.PracticalExam).filter(
-        and_(models.PracticalExam.teacher_id == data.teacher_id,
-             models.PracticalExam.exam_semester_id == data.exam_semester_id)
-    ).delete()
+    changes = ChangeLogRepository(db)
+    current = (models.RemunerationActivity.teacher_id == data.teacher_id,
+               models.RemunerationActivity.exam_semester_id == data.exam_semester_id)
     
-    db.query(models.VivaExam).filter(
-        and_(models.VivaExam.teacher_id == data.teacher_id,
-             models.VivaExam.exam_semester_id == data.exam_semester_id)
-    ).delete()
-    
-    db.query(models.Tabulation).filter(
-        and_(models.Tabulation.teacher_id == data.teacher_id,
-             models.Tabulation.exam_semester_id == data.exam_semester_id)
-    ).delete()
-    
-    db.query(models.AnswerSheetReview).filter(
-        and_(models.AnswerSheetReview.teacher_id == data.teacher_id,
-             models.AnswerSheetReview.exam_semester_id == data.exam_semester_id)
-    ).delete()
-    
-    db.query(models.OtherRemuneration).filter(
-        and_(models.OtherRemuneration.teacher_id == data.teacher_id,
-             models.OtherRemuneration.exam_semester_id == data.exam_semester_id)
-    ).delete()
+    # Delete existing records for this teacher and semester
+    changes.record(models.RemunerationActivity, models.CHANGE_DELETE, *current)
+    db.query(models.RemunerationActivity).filter(*current).delete()
     
     # Insert new records
     for item in data.question_preparations:
@@ -158,7 +129,12 @@ def submit_remuneration(db: Session, data: schemas.RemunerationSubmission):
         )
         db.add(db_item)
     
+    SummaryRepository(db).refresh(data.exam_semester_id, [data.teacher_id])
+    changes.record(models.RemunerationActivity, models.CHANGE_UPSERT, *current)
+    teacher = db.get(models.Teacher, data.teacher_id)
+    RollupRepository(db).refresh(data.exam_semester_id, [teacher.department or ""] if teacher else [])
     db.commit()
+    bump_semesters([data.exam_semester_id])
     return {"message": "Remuneration submitted successfully"}
 
 def get_teacher_remuneration(db: Session, teacher_id: int, semester_id: int):
@@ -199,34 +175,13 @@ def get_teacher_remuneration(db: Session, teacher_id: int, semester_id: int):
     return result
 
 def get_cumulative_report(db: Session, semester_id: int):
-    # Get all teachers who have submitted for this semester by performing outer joins
-    # and checking if they have any activity in the given semester.
-    teachers = db.query(models.Teacher).outerjoin(
-        models.QuestionPreparation, models.Teacher.id == models.QuestionPreparation.teacher_id
-    ).outerjoin(
-        models.QuestionModeration, models.Teacher.id == models.QuestionModeration.teacher_id
-    ).outerjoin(
-        models.ScriptEvaluation, models.Teacher.id == models.ScriptEvaluation.teacher_id
-    ).outerjoin(
-        models.PracticalExam, models.Teacher.id == models.PracticalExam.teacher_id
-    ).outerjoin(
-        models.VivaExam, models.Teacher.id == models.VivaExam.teacher_id
-    ).outerjoin(
-        models.Tabulation, models.Teacher.id == models.Tabulation.teacher_id
-    ).outerjoin(
-        models.AnswerSheetReview, models.Teacher.id == models.AnswerSheetReview.teacher_id
-    ).outerjoin(
-        models.OtherRemuneration, models.Teacher.id == models.OtherRemuneration.teacher_id
-    ).filter(
-        (models.QuestionPreparation.exam_semester_id == semester_id) |
-        (models.QuestionModeration.exam_semester_id == semester_id) |
-        (models.ScriptEvaluation.exam_semester_id == semester_id) |
-        (models.PracticalExam.exam_semester_id == semester_id) |
-        (models.VivaExam.exam_semester_id == semester_id) |
-        (models.Tabulation.exam_semester_id == semester_id) |
-        (models.AnswerSheetReview.exam_semester_id == semester_id) |
-        (models.OtherRemuneration.exam_semester_id == semester_id)
-    ).distinct(models.Teacher.id).all() # Use distinct on Teacher.id to get unique teachers
+    # Get all teachers who have any activity in the given semester
+    teachers = db.query(models.Teacher).filter(
+        db.query(models.RemunerationActivity).filter(
+            and_(models.RemunerationActivity.teacher_id == models.Teacher.id,
+                 models.RemunerationActivity.exam_semester_id == semester_id)
+        ).exists()
+    ).all()
 
     report_data = []
     for teacher in teachers:
@@ -0,0 +1,142 @@
+"""
+In-process event bus for change notifications pushed to clients (SSE).
+
+The service layer calls `event_bus.publish(type, **data)` after a change
+commits; every open event stream of this worker receives the event. Events
+carry only identifiers (semester ids, teacher id, file name); clients fetch
+what they need through the normal endpoints. Event types:
+
+- remuneration.submitted: a teacher's submission for a semester was stored
+- rate_schedule.updated: a rate schedule changed, re-pricing semesters
+- import.completed: an Excel import was processed
+- pdf.ready: a PDF export was generated
+- semester.changed: a semester's data version moved. Relayed from the cache
+  invalidation bus, so it also reports writes handled by other workers,
+  which the other event types (published in-process) do not
+
+publish() may be called from any thread; delivery is handed to each
+subscriber's event loop. A worker serves at most SSE_MAX_CONNECTIONS
+streams; subscribe() raises EventBusFull beyond that. A subscriber that
+falls SSE_QUEUE_SIZE events behind loses the newest events and is told to
+resync.
+"""
+import asyncio
+import itertools
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from caching.invalidation import invalidation_bus
+from caching.report_cache import SEMESTER_KEY_PREFIX
+
+SSE_MAX_CONNECTIONS = int(os.getenv("SSE_MAX_CONNECTIONS", "100"))
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "100"))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+# Sent in place of dropped events to a subscriber that fell behind
+RESYNC_EVENT = "resync"
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    type: str
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+class EventBusFull(Exception):
+    """This worker already serves SSE_MAX_CONNECTIONS event streams"""
+
+
+class Subscription:
+    """One event stream's queue; use as a context manager to unsubscribe on exit"""
+
+    def __init__(self, bus: "EventBus", loop: asyncio.AbstractEventLoop, queue_size: int):
+        self._bus = bus
+        self._loop = loop
+        self._queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self._overflowed = False
+
+    def _deliver(self, event: Event) -> None:
+        # Runs on the subscriber's event loop
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._overflowed = True
+
+    async def events(self, heartbeat: float = SSE_HEARTBEAT_SECONDS) -> AsyncIterator[Optional[Event]]:
+        """Events as they arrive; None after `heartbeat` seconds without one"""
+        while True:
+            if self._overflowed and self._queue.empty():
+                self._overflowed = False
+                yield Event(id=0, type=RESYNC_EVENT)
+            try:
+                yield await asyncio.wait_for(self._queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+
+    def close(self) -> None:
+        self._bus._unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class EventBus:
+    """Fans published events out to the subscriptions of this worker"""
+
+    def __init__(self, max_subscribers: int = SSE_MAX_CONNECTIONS, queue_size: int = SSE_QUEUE_SIZE):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self._subscriptions: Set[Subscription] = set()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self) -> Subscription:
+        """New subscription delivering to the running event loop; raises EventBusFull at the cap"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if len(self._subscriptions) >= self.max_subscribers:
+                raise EventBusFull(f"At most {self.max_subscribers} event streams per worker")
+            subscription = Subscription(self, loop, self.queue_size)
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event_type: str, **data: Any) -> None:
+        """Send an event to every subscription; call after the change commits"""
+        with self._lock:
+            event = Event(id=next(self._ids), type=event_type, data=data)
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription._deliver, event)
+            except RuntimeError:
+                # The subscriber's loop has closed; it unsubscribes on its way out
+                pass
+
+
+event_bus = EventBus()
+
+
+def _relay_semester_changes(names) -> None:
+    semester_ids = sorted(
+        int(name[len(SEMESTER_KEY_PREFIX):]) for name in names
+        if name.startswith(SEMESTER_KEY_PREFIX) and name[len(SEMESTER_KEY_PREFIX):].isdigit()
+    )
+    if semester_ids and event_bus.subscriber_count:
+        event_bus.publish("semester.changed", semester_ids=semester_ids)
+
+
+invalidation_bus.subscribe(_relay_semester_changes)
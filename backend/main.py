@@ -1,23 +1,47 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db, engine, Base
+from database import get_async_db, get_db, engine, async_engine, Base, SessionLocal, create_missing_indexes
 import models
 import schemas
-from typing import List
+from typing import List, Optional
 import uvicorn
+import os
 from contextlib import asynccontextmanager
 from fastapi import APIRouter, UploadFile, File, Depends, Form
 from sqlalchemy.orm import Session
-from auth import authenticate_teacher, authenticate_user, create_access_token, get_current_super_admin, get_current_teacher, get_password_hash
+from auth import authenticate_teacher, authenticate_user, create_access_token, get_current_stream_admin, get_current_super_admin, get_current_teacher, get_password_hash
 from fastapi.security import OAuth2PasswordRequestForm
 
 # Import services
-from services.teacher_service import TeacherService
-from services.course_service import CourseService
-from services.exam_semester_service import ExamSemesterService
-from services.remuneration_service import RemunerationService
+from services.teacher_service import AsyncTeacherService, TeacherService
+from services.course_service import AsyncCourseService, CourseService
+from services.exam_semester_service import AsyncExamSemesterService, ExamSemesterService
+from services.remuneration_service import AsyncRemunerationService, InvalidYearRange, RemunerationService
 from services.invite_service import InviteService
+from services.rate_schedule_service import RateScheduleService
+from services.analytics_service import AsyncAnalyticsService
+from services.change_feed_service import AsyncChangeFeedService, ChangeFeedService, ChangesExpiredError
+from services.stream_ticket_service import StreamTicketService
+from services.idempotency_service import IdempotencyKeyMismatch, IdempotencyService, MAX_IDEMPOTENCY_KEY_LENGTH, REPLAYED_HEADER, request_hash
+from migrate_activity_ledger import ensure_activity_views
+from caching.invalidation import invalidation_bus
+from caching.conditional import REVALIDATE, conditional_get
+from caching.report_cache import semester_etag
+from utils.compression import CompressionMiddleware
+from utils.pagination import PageParams, page_params, page_response
+from utils.responses import EncodedJSONResponse, EventStreamResponse, FastJSONResponse, NDJSONResponse
+from write_coordinator import WriteCoordinatorError, write_coordinator
+from events.event_bus import EventBusFull, SSE_HEARTBEAT_SECONDS, event_bus
+from monitoring.query_stats import QueryStatsMiddleware, install_query_instrumentation
+from monitoring import metrics
+from monitoring.metrics import MetricsMiddleware
+from monitoring.profiler import ProfilerMiddleware, profile_path
+from monitoring.server_timing import ServerTimingMiddleware, TimedAPIRoute
+from monitoring.slow_queries import install_slow_query_log, slow_query_registry
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -30,8 +54,22 @@ async def lifespan(app: FastAPI):
     print("Creating database tables...")
     try:
         Base.metadata.create_all(bind=engine)
+        ensure_activity_views(engine)
+        create_missing_indexes(engine)
         print("Tables created successfully!")
         
+        # Totals are priced from the rate schedule: seed the default one,
+        # recompute summaries that disagree with the activity ledger, and drop
+        # expired change log entries and idempotency keys
+        db = SessionLocal()
+        try:
+            RateScheduleService(db).ensure_default_schedule()
+            RemunerationService(db).ensure_summaries()
+            ChangeFeedService(db).prune_change_log()
+            IdempotencyService(db).prune_expired()
+        finally:
+            db.close()
+        
         # Verify tables exist
         from sqlalchemy import inspect
         inspector = inspect(engine)
@@ -42,7 +80,13 @@ async def lifespan(app: FastAPI):
         print(f"Error creating tables: {e}")
         raise
     
+    # Relay cache invalidations published by other workers
+    invalidation_bus.start()
+    
     yield
+    
+    invalidation_bus.stop()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="DU Examination Remuneration System", 
@@ -50,6 +94,8 @@ app = FastAPI(
     description="Repository + Service Layer Pattern Implementation",
     lifespan=lifespan
 )
+# Times each endpoint call separately from response serialization (Server-Timing)
+app.router.route_class = TimedAPIRoute
 
 # CORS middleware
 app.add_middleware(
@@ -58,8 +104,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Paginated list endpoints link the next page in these headers
+    expose_headers=["Link", "X-Next-Cursor", REPLAYED_HEADER],
 )
 
+# br/gzip compression of large responses (inside the timing middleware so
+# Server-Timing's total includes it)
+app.add_middleware(CompressionMiddleware)
+
+# Prometheus request metrics and Server-Timing header; added before
+# QueryStatsMiddleware so they run inside it and can read each request's DB time
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+
+# Per-request SQL statement counts / DB time / N+1 detection
+install_query_instrumentation(engine)
+install_query_instrumentation(async_engine.sync_engine)
+app.add_middleware(QueryStatsMiddleware)
+
+# Statements slower than SLOW_QUERY_THRESHOLD_MS go to logs/slow_queries.log
+install_slow_query_log(engine)
+install_slow_query_log(async_engine.sync_engine)
+
+# Sampling profiler for super admin requests sent with X-Profile: 1 (outermost)
+app.add_middleware(ProfilerMiddleware)
+
 # ============================================
 # AUTH ENDPOINTS
 # ============================================
@@ -123,7 +192,12 @@ def invite_teacher(teacher_id: str, invite_data: schemas.TeacherInviteCreate, cu
         if invite_data.teacher_id != teacher_id:
             raise HTTPException(status_code=400, detail="Teacher ID mismatch")
         service = InviteService(db)
-        return service.create_invite(invite_data)
+        invite = write_coordinator.run(db, lambda: service.create_invite(invite_data))
+        # Outside the writer slot: a slow email provider must not hold up other writes
+        service.send_invite_email(invite)
+        return invite
+    except WriteCoordinatorError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -134,7 +208,9 @@ def activate_teacher_account(activation_data: schemas.TeacherActivation, db: Ses
     """Activate teacher account using invitation token"""
     try:
         service = InviteService(db)
-        return service.activate_account(activation_data)
+        return write_coordinator.run(db, lambda: service.activate_account(activation_data))
+    except WriteCoordinatorError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -143,20 +219,28 @@ def activate_teacher_account(activation_data: schemas.TeacherActivation, db: Ses
 # TEACHERS ENDPOINTS
 # ============================================
 @app.get("/api/v1/teachers", response_model=List[schemas.Teacher])
-def get_teachers(db: Session = Depends(get_db)):
-    """Get all teachers"""
+async def get_teachers(request: Request, response: Response, department: Optional[str] = None, designation: Optional[str] = None, page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_async_db)):
+    """Get all teachers; filters or paging parameters switch to a keyset-paginated listing"""
     try:
-        service = TeacherService(db)
-        return service.get_all_teachers()
+        service = AsyncTeacherService(db)
+        if page.requested or department is not None or designation is not None:
+            items, next_cursor = await service.list_teachers(department, designation, page.cursor, page.limit, page.fields)
+            return page_response(request, items, next_cursor)
+        not_modified = conditional_get(request, response, await service.get_all_teachers_etag(), REVALIDATE)
+        if not_modified:
+            return not_modified
+        return await service.get_all_teachers()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/v1/teachers/{teacher_id}", response_model=schemas.Teacher)
-def get_teacher(teacher_id: str, db: Session = Depends(get_db)):
+async def get_teacher(teacher_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get a specific teacher by ID"""
     try:
-        service = TeacherService(db)
-        return service.get_teacher_by_id(teacher_id)
+        service = AsyncTeacherService(db)
+        return await service.get_teacher_by_id(teacher_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -177,18 +261,23 @@ def create_teacher(teacher: schemas.TeacherCreate, current_user: models.User = D
     """Create a new teacher"""
     try:
         service = TeacherService(db)
-        return service.create_teacher(teacher)
+        return write_coordinator.run(db, lambda: service.create_teacher(teacher))
+    except WriteCoordinatorError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/v1/teachers/department/{department}", response_model=List[schemas.Teacher])
-def get_teachers_by_department(department: str, current_user: models.User = Depends(get_current_super_admin), db: Session = Depends(get_db)):
+async def get_teachers_by_department(department: str, request: Request, designation: Optional[str] = None, page: PageParams = Depends(page_params), current_user: models.User = Depends(get_current_super_admin), db: AsyncSession = Depends(get_async_db)):
     """Get all teachers in a specific department"""
     try:
-        service = TeacherService(db)
-        return service.get_teachers_by_department(department)
+        service = AsyncTeacherService(db)
+        if page.requested or designation is not None:
+            items, next_cursor = await service.list_teachers(department, designation, page.cursor, page.limit, page.fields)
+            return page_response(request, items, next_cursor)
+        return await service.get_teachers_by_department(department)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -197,27 +286,100 @@ def get_teachers_by_department(department: str, current_user: models.User = Depe
 # TEACHER AUTH ENDPOINTS
 # ============================================
 @app.post("/api/v1/teacher/remuneration/submit", status_code=201)
-def submit_teacher_remuneration(data: schemas.RemunerationSubmission, current_teacher: models.Teacher = Depends(get_current_teacher), db: Session = Depends(get_db)):
-    """Submit remuneration data for the authenticated teacher"""
+def submit_teacher_remuneration(data: schemas.RemunerationSubmission, idempotency_key: Optional[str] = Header(None, max_length=MAX_IDEMPOTENCY_KEY_LENGTH), current_teacher: models.Teacher = Depends(get_current_teacher), db: Session = Depends(get_db)):
+    """Submit remuneration data for the authenticated teacher; retries sent with the same Idempotency-Key replay the first response"""
     try:
         if data.teacher_id != current_teacher.id:
             raise HTTPException(status_code=403, detail="Cannot submit for another teacher")
         service = RemunerationService(db)
-        return service.submit_remuneration(data)
+        if idempotency_key is None:
+            return write_coordinator.run(db, lambda: service.submit_remuneration(data))
+        record, replayed = write_coordinator.run(db, lambda: IdempotencyService(db).run(
+            f"teacher.remuneration.submit:{current_teacher.id}", idempotency_key, request_hash(data), 201,
+            lambda stage: service.submit_remuneration(data, before_commit=stage)
+        ))
+        return EncodedJSONResponse(record.response, status_code=record.status_code, headers={REPLAYED_HEADER: "true"} if replayed else None)
+    except WriteCoordinatorError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except IdempotencyKeyMismatch as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to submit remuneration")
 
-@app.get("/api/v1/teacher/remuneration")
-def get_teacher_remuneration(current_teacher: models.Teacher = Depends(get_current_teacher), db: Session = Depends(get_db)):
-    """Get remuneration data for the authenticated teacher"""
+@app.get("/api/v1/teacher/remuneration", response_model=List[schemas.TeacherSemesterRemuneration])
+async def get_teacher_remuneration(request: Request, response: Response, current_teacher: models.Teacher = Depends(get_current_teacher), db: AsyncSession = Depends(get_async_db)):
+    """Get remuneration data for the authenticated teacher (every semester with every row; see /semesters for the lazy variant)"""
     try:
-        service = RemunerationService(db)
-        return service.get_teacher_all_remunerations(current_teacher.id)
+        service = AsyncRemunerationService(db)
+        etag = await service.get_teacher_all_remunerations_etag(current_teacher.id)
+        not_modified = conditional_get(request, response, etag)
+        if not_modified:
+            return not_modified
+        remunerations = await service.get_teacher_all_remunerations(current_teacher.id)
+        return FastJSONResponse(remunerations, headers=response.headers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to fetch remuneration")
+
+@app.get("/api/v1/teacher/remuneration/semesters", response_model=List[schemas.TeacherSemesterIndexEntry])
+async def get_teacher_semester_index(request: Request, response: Response, current_teacher: models.Teacher = Depends(get_current_teacher), db: AsyncSession = Depends(get_async_db)):
+    """Semesters of the authenticated teacher with per-semester counts and totals"""
+    try:
+        service = AsyncRemunerationService(db)
+        etag = await service.get_teacher_semester_index_etag(current_teacher.id)
+        not_modified = conditional_get(request, response, etag)
+        if not_modified:
+            return not_modified
+        index = await service.get_teacher_semester_index(current_teacher.id)
+        return FastJSONResponse(index, headers=response.headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to fetch remuneration")
 
+@app.get("/api/v1/teacher/remuneration/semesters/{semester_id}", response_model=schemas.RemunerationDetails)
+async def get_teacher_semester_remuneration(semester_id: int, request: Request, response: Response, current_teacher: models.Teacher = Depends(get_current_teacher), db: AsyncSession = Depends(get_async_db)):
+    """Remuneration rows of the authenticated teacher for one semester"""
+    try:
+        service = AsyncRemunerationService(db)
+        etag = await service.get_teacher_remuneration_etag(current_teacher.id, semester_id)
+        not_modified = conditional_get(request, response, etag)
+        if not_modified:
+            return not_modified
+        details = await service.get_teacher_remuneration(current_teacher.id, semester_id)
+        return FastJSONResponse(details, headers=response.headers)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to fetch remuneration")
+
+@app.get("/api/v1/teacher/statement", response_model=schemas.TeacherStatement)
+async def get_teacher_statement(request: Request, response: Response, from_year: Optional[int] = None, to_year: Optional[int] = None, current_teacher: models.Teacher = Depends(get_current_teacher), db: AsyncSession = Depends(get_async_db)):
+    """Multi-year remuneration statement of the authenticated teacher"""
+    try:
+        service = AsyncRemunerationService(db)
+        etag = await service.get_teacher_statement_etag(current_teacher.id, from_year, to_year)
+        not_modified = conditional_get(request, response, etag)
+        if not_modified:
+            return not_modified
+        statement = await service.get_teacher_statement(current_teacher.id, from_year, to_year)
+        return FastJSONResponse(statement, headers=response.headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to fetch statement")
+
+@app.get("/api/v1/teacher/statement/pdf")
+def export_teacher_statement_pdf(from_year: Optional[int] = None, to_year: Optional[int] = None, current_teacher: models.Teacher = Depends(get_current_teacher), db: Session = Depends(get_db)):
+    """Multi-year remuneration statement of the authenticated teacher as PDF"""
+    try:
+        from pdf_generator import PDFGeneratorFactory
+        generator = PDFGeneratorFactory.create_generator("statement", db)
+        return generator.generate(schemas.StatementPDFRequest(teacher_id=current_teacher.id, from_year=from_year, to_year=to_year))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/v1/teacher/profile", response_model=schemas.Teacher)
 def get_teacher_profile(current_teacher: models.Teacher = Depends(get_current_teacher)):
     """Get profile for the authenticated teacher"""
@@ -226,11 +388,19 @@ def get_teacher_profile(current_teacher: models.Teacher = Depends(get_current_te
 # COURSES ENDPOINTS
 # ============================================
 @app.get("/api/v1/courses", response_model=List[schemas.Course])
-def get_courses(db: Session = Depends(get_db)):
-    """Get all courses"""
+async def get_courses(request: Request, response: Response, department: Optional[str] = None, page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_async_db)):
+    """Get all courses; filters or paging parameters switch to a keyset-paginated listing"""
     try:
-        service = CourseService(db)
-        return service.get_all_courses()
+        service = AsyncCourseService(db)
+        if page.requested or department is not None:
+            items, next_cursor = await service.list_courses(department, page.cursor, page.limit, page.fields)
+            return page_response(request, items, next_cursor)
+        not_modified = conditional_get(request, response, await service.get_all_courses_etag(), REVALIDATE)
+        if not_modified:
+            return not_modified
+        return await service.get_all_courses()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -250,18 +420,23 @@ def create_course(course: schemas.CourseCreate, current_user: models.User = Depe
     """Create a new course"""
     try:
         service = CourseService(db)
-        return service.create_course(course)
+        return write_coordinator.run(db, lambda: service.create_course(course))
+    except WriteCoordinatorError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/v1/courses/department/{department}", response_model=List[schemas.Course])
-def get_courses_by_department(department: str, current_user: models.User = Depends(get_current_super_admin), db: Session = Depends(get_db)):
+async def get_courses_by_department(department: str, request: Request, page: PageParams = Depends(page_params), current_user: models.User = Depends(get_current_super_admin), db: AsyncSession = Depends(get_async_db)):
     """Get all courses for a specific department"""
     try:
-        service = CourseService(db)
-        return service.get_courses_by_department(department)
+        service = AsyncCourseService(db)
+        if page.requested:
+            items, next_cursor = await service.list_courses(department, page.cursor, page.limit, page.fields)
+            return page_response(request, items, next_cursor)
+        return await service.get_courses_by_department(department)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -271,11 +446,19 @@ def get_courses_by_department(department: str, current_user: models.User = Depen
 # EXAM SEMESTERS ENDPOINTS
 # ============================================
 @app.get("/api/v1/semesters", response_model=List[schemas.ExamSemester])
-def get_semesters(current_user: models.User = Depends(get_current_super_admin), db: Session = Depends(get_db)):
-    """Get all exam semesters"""
+async def get_semesters(request: Request, response: Response, year: Optional[int] = None, page: PageParams = Depends(page_params), current_user: models.User = Depends(get_current_super_admin), db: AsyncSession = Depends(get_async_db)):
+    """Get all exam semesters; filters or paging parameters switch to a keyset-paginated listing"""
     try:
-        service = ExamSemesterService(db)
-        return service.get_all_semesters()
+        service = AsyncExamSemesterService(db)
+        if page.requested or year is not None:
+            items, next_cursor = await service.list_semesters(year, page.cursor, page.limit, page.fields)
+            return page_response(request, items, next_cursor)
+        not_modified = conditional_get(request, response, await service.get_all_semesters_etag())
+        if not_modified:
+            return not_modified
+        return await service.get_all_semesters()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -313,11 +496,11 @@ def get_or_create_semester(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/v1/semesters/{semester_id}", response_model=schemas.ExamSemester)
-def get_semester(semester_id: int, current_user: models.User = Depends(get_current_super_admin), db: Session = Depends(get_db)):
+async def get_semester(semester_id: int, current_user: models.User = Depends(get_current_super_admin), db: AsyncSession = Depends(get_async_db)):
     """Get a specific semester by ID"""
     try:
-        service = ExamSemesterService(db)
-        return service.get_semester_by_id(semester_id)
+        service = AsyncExamSemesterService(db)
+        return await service.get_semester_by_id(semester_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -329,7 +512,60 @@ def create_semester(semester: schemas.ExamSemesterCreate, current_user: models.U
     """Create a new semester"""
     try:
         service = ExamSemesterService(db)
-        return service.create_semester(semester)
+        return write_coordinator.run(db, lambda: service.create_semester(semester))
+    except WriteCoordinatorError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ============================================
+# RATE SCHEDULE ENDPOINTS
+# ============================================
+@app.get("/api/v1/rate-schedule", response_model=schemas.RateSchedule)
+def get_default_rate_schedule(current_user: models.User = Depends(get_current_super_admin), db: Session = Depends(get_db)):
+    """Get the default rate schedule, used by semesters without one of their own"""
+    try:
+        service = RateScheduleService(db)
+        return service.get_schedule()
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.put("/api/v1/rate-schedule", response_model=schemas.RateSchedule)
+def set_default_rate_schedule(data: schemas.RateScheduleCreate, current_user: models.User = Depends(get_current_super_admin), db: Session = Depends(get_db)):
+    """Store a new version of the default rate schedule"""
+    try:
+        service = RateScheduleService(db)
+        return write_coordinator.run(db, lambda: service.set_schedule(None, data.rates))
+    except WriteCoordinatorError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/v1/semesters/{semester_id}/rate-schedule", response_model=schemas.RateSchedule)
+def get_semester_rate_schedule(semester_id: int, current_user: models.User = Depends(get_current_super_admin), db: Session = Depends(get_db)):
+    """Get the rate schedule in force for a semester"""
+    try:
+        service = RateScheduleService(db)
+        return service.get_schedule(semester_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.put("/api/v1/semesters/{semester_id}/rate-schedule", response_model=schemas.RateSchedule)
+def set_semester_rate_schedule(semester_id: int, data: schemas.RateScheduleCreate, current_user: models.User = Depends(get_current_super_admin), db: Session = Depends(get_db)):
+    """Store a new version of a semester's own rate schedule; rates it doesn't list come from the default schedule"""
+    try:
+        service = RateScheduleService(db)
+        return write_coordinator.run(db, lambda: service.set_schedule(semester_id, data.rates))
+    except WriteCoordinatorError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -339,22 +575,32 @@ def create_semester(semester: schemas.ExamSemesterCreate, current_user: models.U
 # REMUNERATION ENDPOINTS
 # ============================================
 @app.post("/api/v1/remuneration/submit", status_code=201)
-def submit_remuneration(data: schemas.RemunerationSubmission, current_user: models.User = Depends(get_current_super_admin), db: Session = Depends(get_db)):
-    """Submit remuneration data for a teacher"""
+def submit_remuneration(data: schemas.RemunerationSubmission, idempotency_key: Optional[str] = Header(None, max_length=MAX_IDEMPOTENCY_KEY_LENGTH), current_user: models.User = Depends(get_current_super_admin), db: Session = Depends(get_db)):
+    """Submit remuneration data for a teacher; retries sent with the same Idempotency-Key replay the first response"""
     try:
         service = RemunerationService(db)
-        return service.submit_remuneration(data)
+        if idempotency_key is None:
+            return write_coordinator.run(db, lambda: service.submit_remuneration(data))
+        record, replayed = write_coordinator.run(db, lambda: IdempotencyService(db).run(
+            f"remuneration.submit:{current_user.username}", idempotency_key, request_hash(data), 201,
+            lambda stage: service.submit_remuneration(data, before_commit=stage)
+        ))
+        return EncodedJSONResponse(record.response, status_code=record.status_code, headers={REPLAYED_HEADER: "true"} if replayed else None)
+    except WriteCoordinatorError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except IdempotencyKeyMismatch as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/v1/remuneration/teacher/{teacher_id}/semester/{semester_id}")
-def get_teacher_remuneration(teacher_id: str, semester_id: int, current_user: models.User = Depends(get_current_super_admin), db: Session = Depends(get_db)):
+@app.get("/api/v1/remuneration/teacher/{teacher_id}/semester/{semester_id}", response_model=schemas.RemunerationDetails)
+async def get_teacher_remuneration(teacher_id: str, semester_id: int, current_user: models.User = Depends(get_current_super_admin), db: AsyncSession = Depends(get_async_db)):
     """Get remuneration data for a specific teacher and semester"""
     try:
-        service = RemunerationService(db)
-        return service.get_teacher_remuneration(teacher_id, semester_id)
+        service = AsyncRemunerationService(db)
+        return FastJSONResponse(await service.get_teacher_remuneration(teacher_id, semester_id))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -363,17 +609,176 @@ def get_teacher_remuneration(teacher_id: str, semester_id: int, current_user: mo
 # ============================================
 # REPORTS ENDPOINTS
 # ============================================
-@app.get("/api/v1/reports/cumulative/{semester_id}")
-def get_cumulative_report(semester_id: int, current_user: models.User = Depends(get_current_super_admin), db: Session = Depends(get_db)):
-    """Generate cumulative report for a semester"""
+@app.get("/api/v1/reports/cumulative/{semester_id}", response_model=List[schemas.CumulativeReportEntry])
+async def get_cumulative_report(semester_id: int, request: Request, response: Response, current_user: models.User = Depends(get_current_super_admin), db: AsyncSession = Depends(get_async_db)):
+    """Generate cumulative report for a semester (cached per semester data version)"""
     try:
-        service = RemunerationService(db)
-        return service.get_cumulative_report(semester_id)
+        service = AsyncRemunerationService(db)
+        etag = await service.get_semester_etag(semester_id, "cumulative")
+        not_modified = conditional_get(request, response, etag)
+        if not_modified:
+            return not_modified
+        version, report_data = await service.get_cumulative_report_versioned(semester_id)
+        response.headers["ETag"] = semester_etag(semester_id, version, "cumulative")
+        return FastJSONResponse(report_data, headers=response.headers)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/v1/reports/summary/{semester_id}", response_model=List[schemas.TeacherSummaryEntry])
+async def get_semester_summary(semester_id: int, request: Request, response: Response, current_user: models.User = Depends(get_current_super_admin), db: AsyncSession = Depends(get_async_db)):
+    """Per teacher activity counts and totals for a semester (materialized summary)"""
+    try:
+        service = AsyncRemunerationService(db)
+        etag = await service.get_semester_etag(semester_id, "summary")
+        not_modified = conditional_get(request, response, etag)
+        if not_modified:
+            return not_modified
+        return FastJSONResponse(await service.get_semester_summary(semester_id), headers=response.headers)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/v1/reports/teachers/{teacher_id}/statement", response_model=schemas.TeacherStatement)
+async def get_statement(teacher_id: str, request: Request, response: Response, from_year: Optional[int] = None, to_year: Optional[int] = None, current_user: models.User = Depends(get_current_super_admin), db: AsyncSession = Depends(get_async_db)):
+    """A teacher's remuneration statement over a year range (inclusive; either end optional)"""
+    try:
+        service = AsyncRemunerationService(db)
+        etag = await service.get_teacher_statement_etag(teacher_id, from_year, to_year)
+        not_modified = conditional_get(request, response, etag)
+        if not_modified:
+            return not_modified
+        statement = await service.get_teacher_statement(teacher_id, from_year, to_year)
+        return FastJSONResponse(statement, headers=response.headers)
+    except InvalidYearRange as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/v1/reports/cumulative/{semester_id}/stream", response_class=NDJSONResponse)
+async def stream_cumulative_report(semester_id: int, request: Request, response: Response, current_user: models.User = Depends(get_current_super_admin), db: AsyncSession = Depends(get_async_db)):
+    """Cumulative report as NDJSON, one teacher entry per line, streamed as it is computed"""
+    try:
+        service = AsyncRemunerationService(db)
+        etag = await service.get_semester_etag(semester_id, "cumulative-ndjson")
+        not_modified = conditional_get(request, response, etag)
+        if not_modified:
+            return not_modified
+        entries = await service.stream_cumulative_report(semester_id)
+        return NDJSONResponse(entries, headers=response.headers)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ============================================
+# CHANGES (DELTA SYNC) ENDPOINTS
+# ============================================
+@app.get("/api/v1/changes/cursor", response_model=schemas.ChangeCursor)
+async def get_changes_cursor(current_user: models.User = Depends(get_current_super_admin), db: AsyncSession = Depends(get_async_db)):
+    """Cursor at the latest change; take it before loading collections, then poll /changes from it"""
+    try:
+        return await AsyncChangeFeedService(db).get_cursor()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/v1/changes", response_model=schemas.ChangeFeed)
+async def get_changes(since: int = Query(..., description="next_since of the previous page, or a cursor from /changes/cursor"), limit: Optional[int] = Query(None, ge=1), current_user: models.User = Depends(get_current_super_admin), db: AsyncSession = Depends(get_async_db)):
+    """Teachers, courses, semesters and activity rows changed after `since`, with tombstones for deletes"""
+    try:
+        feed = await AsyncChangeFeedService(db).get_changes(since, limit)
+        return FastJSONResponse(feed)
+    except ChangesExpiredError as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ============================================
+# EVENTS ENDPOINTS
+# ============================================
+@app.post("/api/v1/events/ticket", response_model=schemas.StreamTicket, status_code=201)
+def create_stream_ticket(current_user: models.User = Depends(get_current_super_admin), db: Session = Depends(get_db)):
+    """
+    Single-use ticket for opening /api/v1/events from EventSource, which
+    can't send the Authorization header: pass it as ?ticket= within
+    STREAM_TICKET_TTL_SECONDS (30s by default)
+    """
+    try:
+        return write_coordinator.run(db, lambda: StreamTicketService(db).issue(current_user))
+    except WriteCoordinatorError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/v1/events")
+async def stream_events(
+    request: Request,
+    semester_id: Optional[int] = Query(None, description="Skip events concerning only other semesters"),
+    current_user: models.User = Depends(get_current_stream_admin)
+):
+    """
+    Server-Sent Events announcing data changes (submissions, rate schedule
+    updates, imports, semester changes, finished PDFs). Events carry ids
+    only; refetch through the regular endpoints. Comments are sent as
+    heartbeats; on a `resync` event, refetch everything of interest.
+    """
+    try:
+        subscription = event_bus.subscribe()
+    except EventBusFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(SSE_HEARTBEAT_SECONDS))})
+
+    async def events():
+        with subscription:
+            async for event in subscription.events():
+                if await request.is_disconnected():
+                    break
+                if (
+                    semester_id is not None
+                    and event is not None
+                    and "semester_ids" in event.data
+                    and semester_id not in event.data["semester_ids"]
+                ):
+                    continue
+                yield event
+
+    return EventStreamResponse(events())
+
+# ============================================
+# ANALYTICS ENDPOINTS
+# ============================================
+@app.get("/api/v1/analytics/rollup", response_model=List[schemas.RollupEntry])
+async def get_analytics_rollup(
+    request: Request,
+    response: Response,
+    group_by: Optional[str] = Query(None, description="Comma-separated dimensions: department, year, semester, activity_type (default department,semester,activity_type)"),
+    department: Optional[str] = Query(None),
+    year: Optional[int] = Query(None),
+    semester_id: Optional[int] = Query(None),
+    activity_type: Optional[str] = Query(None),
+    current_user: models.User = Depends(get_current_super_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Activity counts, quantities and amounts rolled up by department, year, semester and activity type"""
+    try:
+        groups = [name.strip() for name in group_by.split(",") if name.strip()] if group_by else None
+        service = AsyncAnalyticsService(db)
+        etag = service.get_rollup_etag(groups, department, year, semester_id, activity_type)
+        not_modified = conditional_get(request, response, etag)
+        if not_modified:
+            return not_modified
+        entries = await service.get_rollup(groups, department, year, semester_id, activity_type)
+        return FastJSONResponse(entries, headers=response.headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # ============================================
 # PDF EXPORT ENDPOINTS
 # ============================================
@@ -397,6 +802,18 @@ def export_cumulative_pdf(data: schemas.CumulativeReportRequest, current_user: m
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/v1/export/pdf/statement")
+def export_statement_pdf(data: schemas.StatementPDFRequest, current_user: models.User = Depends(get_current_super_admin), db: Session = Depends(get_db)):
+    """Export a teacher's multi-year statement as PDF"""
+    try:
+        from pdf_generator import PDFGeneratorFactory
+        generator = PDFGeneratorFactory.create_generator("statement", db)
+        return generator.generate(data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # ============================================
 # SEARCH ENDPOINTS
 # ============================================
@@ -420,6 +837,31 @@ async def search_teachers(query: str, current_user: models.User = Depends(get_cu
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ============================================
+# ADMIN DIAGNOSTICS ENDPOINTS
+# ============================================
+@app.get("/api/v1/admin/write-queue")
+def get_write_queue_stats(current_user: models.User = Depends(get_current_super_admin)):
+    """Write coordinator queue depth and wait-time counters for this worker"""
+    return write_coordinator.snapshot()
+
+@app.get("/api/v1/admin/slow-queries")
+def get_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    sort: str = Query("total", pattern="^(total|max|count)$"),
+    current_user: models.User = Depends(get_current_super_admin)
+):
+    """Slowest statement shapes seen by this worker since startup"""
+    return slow_query_registry.top(limit=limit, sort=sort)
+
+@app.get("/api/v1/admin/profiles/{profile_id}")
+def get_profile(profile_id: str, current_user: models.User = Depends(get_current_super_admin)):
+    """Collapsed-stack profile recorded for a request sent with X-Profile: 1"""
+    path = profile_path(profile_id)
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.collapsed")
+
 # ============================================
 # HEALTH CHECK
 # ============================================
@@ -428,23 +870,52 @@ def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "version": "2.0.0"}
 
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus scrape endpoint (metrics of the worker that answers)"""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
 
 @app.post("/api/remuneration/import-excel")
 async def import_excel_remuneration(
     file: UploadFile = File(...),
     semester_name: str = Form(...),
     exam_year: int = Form(...),
+    idempotency_key: Optional[str] = Header(None, max_length=MAX_IDEMPOTENCY_KEY_LENGTH),
     current_user: models.User = Depends(get_current_super_admin), db: Session = Depends(get_db)
 ):
+    if idempotency_key is not None:
+        # Retries of an import with the same key, file and form replay the first result
+        idempotency = IdempotencyService(db)
+        scope = f"remuneration.import:{current_user.username}"
+        body_hash = request_hash(await file.read(), semester_name, exam_year)
+        await file.seek(0)
+        try:
+            # Sync session (and, below, the writer slot): keep them off the event loop
+            record = await run_in_threadpool(idempotency.replay, scope, idempotency_key, body_hash)
+        except IdempotencyKeyMismatch as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        if record is not None:
+            return EncodedJSONResponse(record.response, status_code=record.status_code, headers={REPLAYED_HEADER: "true"})
+
     service = RemunerationService(db)
     result = await service.process_excel_import(file, semester_name, exam_year)
-    # log the result for debugging
-    print(f"Excel import result: {result}")
 
     if result["code"] == 404:
         raise HTTPException(status_code=404, detail=result)
     
-    return result
+    if idempotency_key is not None and result.get("status") == "success":
+        def store():
+            record = write_coordinator.run(db, lambda: idempotency.store(scope, idempotency_key, body_hash, 200, result))
+            # Read the record here too: the commit expired it, reloading is a query
+            return EncodedJSONResponse(record.response, status_code=record.status_code)
+        try:
+            return await run_in_threadpool(store)
+        except WriteCoordinatorError:
+            # The import itself succeeded; a retry just processes the file again
+            pass
+
+    return FastJSONResponse(result)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Move remuneration activity rows from the former per-activity tables
+(question_preparations, script_evaluations, ...) into the
+remuneration_activities ledger, then replace each former table with a
+read-only view of the same name and columns over the ledger, so SQL that
+reads the old tables keeps working.
+
+An explicit step, run once before starting the upgraded app (which
+refuses to start while former tables remain):
+
+    python migrate_activity_ledger.py
+
+The former tables are kept, renamed to <table>_legacy, as a backup; drop
+them once the ledger has been checked. Rows get new ids in the ledger (the
+old tables' ids overlapped); within each activity type their order is kept.
+Safe to re-run: tables already migrated are views by then.
+"""
+
+from sqlalchemy import MetaData, Table, inspect, insert, literal, select, text
+
+from database import Base, engine
+import models
+from repositories.remuneration_repository import ACTIVITY_MODELS
+
+LEGACY_SUFFIX = "_legacy"
+
+
+def _view_sql(key, model, dialect) -> str:
+    ledger = models.RemunerationActivity.__table__
+    query = select(*model.activity_columns()).where(ledger.c.activity_type == key)
+    return str(query.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+
+def _create_missing_views(conn) -> None:
+    views = set(inspect(conn).get_view_names())
+    for key, model in ACTIVITY_MODELS.items():
+        if key not in views:
+            conn.execute(text(f"CREATE VIEW {key} AS {_view_sql(key, model, conn.dialect)}"))
+
+
+def pending_activity_tables(conn) -> list:
+    """Former activity tables whose rows have not been moved into the ledger yet"""
+    tables = set(inspect(conn).get_table_names())
+    return [key for key in ACTIVITY_MODELS if key in tables]
+
+
+def ensure_activity_views(bind=engine) -> None:
+    """
+    Startup check: create any missing views over the ledger. Raises
+    RuntimeError while former activity tables still need migrating.
+    """
+    with bind.begin() as conn:
+        pending = pending_activity_tables(conn)
+        if pending:
+            raise RuntimeError(
+                f"Activity tables {', '.join(pending)} have not been migrated to the ledger; "
+                "back up the database and run `python migrate_activity_ledger.py` first"
+            )
+        _create_missing_views(conn)
+
+
+def migrate_activity_ledger(bind=engine) -> int:
+    """Migrate any former activity tables and create the views; returns the rows moved"""
+    Base.metadata.create_all(bind=bind, tables=[models.RemunerationActivity.__table__])
+    ledger = models.RemunerationActivity.__table__
+    moved = 0
+    with bind.begin() as conn:
+        for key in pending_activity_tables(conn):
+            model = ACTIVITY_MODELS[key]
+            legacy = Table(key, MetaData(), autoload_with=conn)
+            names = [column.key for column in model.activity_columns() if column.key != "id"]
+            rows = select(literal(key), *(legacy.c[name] for name in names)).order_by(legacy.c.id)
+            moved += conn.execute(insert(ledger).from_select(["activity_type", *names], rows)).rowcount
+            conn.execute(text(f"ALTER TABLE {key} RENAME TO {key}{LEGACY_SUFFIX}"))
+        _create_missing_views(conn)
+    return moved
+
+
+if __name__ == "__main__":
+    moved = migrate_activity_ledger()
+    print(f"Moved {moved} activity row(s) into remuneration_activities")
+    print(f"The former tables are kept as *{LEGACY_SUFFIX}; drop them once the ledger has been checked")
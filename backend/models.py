@@ -1,5 +1,5 @@
 # models.py
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Text, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Text, Boolean, DateTime, Index, UniqueConstraint, event
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -13,6 +13,12 @@ class Teacher(Base):
     department = Column(String)
     mobile_no = Column(String)
     
+    # Filtered listings walk these in primary key order (keyset pagination)
+    __table_args__ = (
+        Index("ix_teachers_department_id", "department", "id"),
+        Index("ix_teachers_designation_id", "designation", "id"),
+    )
+    
     # Relationships
     question_preparations = relationship("QuestionPreparation", back_populates="teacher")
     question_moderations = relationship("QuestionModeration", back_populates="teacher")
@@ -34,6 +40,10 @@ class ExamSemester(Base):
     result_publish_date = Column(Date)
     chairman_id = Column(String, ForeignKey("teachers.id"))
     
+    __table_args__ = (
+        Index("ix_exam_semesters_year_id", "year", "id"),
+    )
+    
     # Relationships
     chairman = relationship("Teacher")
 
@@ -44,122 +54,209 @@ class Course(Base):
     course_title = Column(String)
     credits = Column(Float)
     department = Column(String)
+    
+    __table_args__ = (
+        Index("ix_courses_department_course_code", "department", "course_code"),
+    )
 
-class QuestionPreparation(Base):
-    __tablename__ = "question_preparations"
+class RemunerationActivity(Base):
+    """
+    Ledger of all remuneration activity rows. activity_type says which kind
+    of activity a row records (the keys of ACTIVITY_MODELS, which are also
+    the names of the former per-activity tables); each kind uses its own
+    subset of the typed columns and leaves the rest NULL. The per-activity
+    classes below are mapped onto it with single-table inheritance, and
+    migrate_activity_ledger.py keeps a read-only view per former table.
+    """
+    __tablename__ = "remuneration_activities"
     
     id = Column(Integer, primary_key=True, index=True)
+    activity_type = Column(String, nullable=False)
     teacher_id = Column(String, ForeignKey("teachers.id"))
     exam_semester_id = Column(Integer, ForeignKey("exam_semesters.id"))
-    course_code = Column(String, ForeignKey("courses.course_code"))
-    section_type = Column(String)  # Full/Half
+    course_code = Column(String, ForeignKey("courses.course_code"), nullable=True)
+    section_type = Column(String)  # question_preparations: Full/Half
+    script_type = Column(String)  # script_evaluations: Final/Incourse/Assignment/Presentation/Practical
+    question_count = Column(Integer)
+    team_member_count = Column(Integer)
+    script_count = Column(Integer)
+    student_count = Column(Integer)  # practical_exams, viva_exams, tabulations
+    day_count = Column(Integer)
+    answer_sheet_count = Column(Integer)
+    remuneration_type = Column(String)  # other_remunerations: Exam Committee Honorium/Stencil/Question Setter/Question Preparation and Printing
+    details = Column(Text)
+    page_count = Column(Integer, nullable=True)
+    
+    # Teacher/semester reads and deletes are one range scan on the first;
+    # semester reports group the second by teacher
+    __table_args__ = (
+        Index("ix_remuneration_activities_teacher_semester_type", "teacher_id", "exam_semester_id", "activity_type", "id"),
+        Index("ix_remuneration_activities_semester_teacher", "exam_semester_id", "teacher_id"),
+    )
+    
+    __mapper_args__ = {"polymorphic_on": activity_type}
+    
+    # Columns used by an activity type besides id/teacher_id/exam_semester_id
+    type_columns = ()
+    
+    @classmethod
+    def activity_columns(cls):
+        """Ledger columns of this activity type, in the order of its former table"""
+        columns = cls.__table__.columns
+        return tuple(columns[name] for name in ("id", "teacher_id", "exam_semester_id") + cls.type_columns)
+
+class QuestionPreparation(RemunerationActivity):
+    __mapper_args__ = {"polymorphic_identity": "question_preparations"}
+    type_columns = ("course_code", "section_type")
     
     # Relationships
     teacher = relationship("Teacher", back_populates="question_preparations")
     exam_semester = relationship("ExamSemester")
     course = relationship("Course")
 
-class QuestionModeration(Base):
-    __tablename__ = "question_moderations"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    teacher_id = Column(String, ForeignKey("teachers.id"))
-    exam_semester_id = Column(Integer, ForeignKey("exam_semesters.id"))
-    course_code = Column(String, ForeignKey("courses.course_code"))
-    question_count = Column(Integer)
-    team_member_count = Column(Integer)
+class QuestionModeration(RemunerationActivity):
+    __mapper_args__ = {"polymorphic_identity": "question_moderations"}
+    type_columns = ("course_code", "question_count", "team_member_count")
     
     # Relationships
     teacher = relationship("Teacher", back_populates="question_moderations")
     exam_semester = relationship("ExamSemester")
     course = relationship("Course")
 
-class ScriptEvaluation(Base):
-    __tablename__ = "script_evaluations"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    teacher_id = Column(String, ForeignKey("teachers.id"))
-    exam_semester_id = Column(Integer, ForeignKey("exam_semesters.id"))
-    course_code = Column(String, ForeignKey("courses.course_code"))
-    script_type = Column(String)  # Final/Incourse/Assignment/Presentation/Practical
-    script_count = Column(Integer)
+class ScriptEvaluation(RemunerationActivity):
+    __mapper_args__ = {"polymorphic_identity": "script_evaluations"}
+    type_columns = ("course_code", "script_type", "script_count")
     
     # Relationships
     teacher = relationship("Teacher", back_populates="script_evaluations")
     exam_semester = relationship("ExamSemester")
     course = relationship("Course")
 
-class PracticalExam(Base):
-    __tablename__ = "practical_exams"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    teacher_id = Column(String, ForeignKey("teachers.id"))
-    exam_semester_id = Column(Integer, ForeignKey("exam_semesters.id"))
-    course_code = Column(String, ForeignKey("courses.course_code"))
-    student_count = Column(Integer)
-    day_count = Column(Integer)
+class PracticalExam(RemunerationActivity):
+    __mapper_args__ = {"polymorphic_identity": "practical_exams"}
+    type_columns = ("course_code", "student_count", "day_count")
     
     # Relationships
     teacher = relationship("Teacher", back_populates="practical_exams")
     exam_semester = relationship("ExamSemester")
     course = relationship("Course")
 
-class VivaExam(Base):
-    __tablename__ = "viva_exams"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    teacher_id = Column(String, ForeignKey("teachers.id"))
-    exam_semester_id = Column(Integer, ForeignKey("exam_semesters.id"))
-    course_code = Column(String, ForeignKey("courses.course_code"))
-    student_count = Column(Integer)
+class VivaExam(RemunerationActivity):
+    __mapper_args__ = {"polymorphic_identity": "viva_exams"}
+    type_columns = ("course_code", "student_count")
     
     # Relationships
     teacher = relationship("Teacher", back_populates="viva_exams")
     exam_semester = relationship("ExamSemester")
     course = relationship("Course")
 
-class Tabulation(Base):
-    __tablename__ = "tabulations"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    teacher_id = Column(String, ForeignKey("teachers.id"))
-    exam_semester_id = Column(Integer, ForeignKey("exam_semesters.id"))
-    course_code = Column(String, ForeignKey("courses.course_code"))
-    student_count = Column(Integer)
+class Tabulation(RemunerationActivity):
+    __mapper_args__ = {"polymorphic_identity": "tabulations"}
+    type_columns = ("course_code", "student_count")
     
     # Relationships
     teacher = relationship("Teacher", back_populates="tabulations")
     exam_semester = relationship("ExamSemester")
     course = relationship("Course")
 
-class AnswerSheetReview(Base):
-    __tablename__ = "answer_sheet_reviews"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    teacher_id = Column(String, ForeignKey("teachers.id"))
-    exam_semester_id = Column(Integer, ForeignKey("exam_semesters.id"))
-    course_code = Column(String, ForeignKey("courses.course_code"))
-    answer_sheet_count = Column(Integer)
+class AnswerSheetReview(RemunerationActivity):
+    __mapper_args__ = {"polymorphic_identity": "answer_sheet_reviews"}
+    type_columns = ("course_code", "answer_sheet_count")
     
     # Relationships
     teacher = relationship("Teacher", back_populates="answer_sheet_reviews")
     exam_semester = relationship("ExamSemester")
     course = relationship("Course")
 
-class OtherRemuneration(Base):
-    __tablename__ = "other_remunerations"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    teacher_id = Column(String, ForeignKey("teachers.id"))
-    exam_semester_id = Column(Integer, ForeignKey("exam_semesters.id"))
-    remuneration_type = Column(String)  # Exam Committee Honorium/Stencil/Question Setter/Question Preparation and Printing
-    details = Column(Text)
-    page_count = Column(Integer, nullable=True)
+class OtherRemuneration(RemunerationActivity):
+    __mapper_args__ = {"polymorphic_identity": "other_remunerations"}
+    type_columns = ("remuneration_type", "details", "page_count")
     
     # Relationships
     teacher = relationship("Teacher", back_populates="other_remunerations")
     exam_semester = relationship("ExamSemester")
 
+class RateSchedule(Base):
+    """
+    One version of the remuneration rates. Rows with exam_semester_id NULL
+    form the default schedule; a semester with its own versions uses its
+    latest one. New rates are added as a new version, never edited in place.
+    """
+    __tablename__ = "rate_schedules"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    exam_semester_id = Column(Integer, ForeignKey("exam_semesters.id"), nullable=True)
+    version = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint("exam_semester_id", "version", name="uq_rate_schedules_semester_version"),
+    )
+    
+    # Relationships
+    rates = relationship("RateScheduleRate", back_populates="schedule", cascade="all, delete-orphan")
+
+class RateScheduleRate(Base):
+    __tablename__ = "rate_schedule_rates"
+    
+    schedule_id = Column(Integer, ForeignKey("rate_schedules.id"), primary_key=True)
+    activity_type = Column(String, primary_key=True)  # activity key, e.g. script_evaluations
+    variant = Column(String, primary_key=True)  # e.g. final/incourse for scripts; * = any other
+    rate = Column(Float, nullable=False)
+    
+    # Relationships
+    schedule = relationship("RateSchedule", back_populates="rates")
+
+class RemunerationSummary(Base):
+    """
+    Per teacher per semester counts and total, derived from the activity
+    tables. Rewritten in the same transaction as every write to them (see
+    SummaryRepository); rebuild_summaries.py recomputes it from scratch.
+    """
+    __tablename__ = "remuneration_summaries"
+
+    teacher_id = Column(String, ForeignKey("teachers.id"), primary_key=True)
+    exam_semester_id = Column(Integer, ForeignKey("exam_semesters.id"), primary_key=True)
+    question_preparation_count = Column(Integer, nullable=False, default=0)
+    question_moderation_count = Column(Integer, nullable=False, default=0)
+    script_evaluation_count = Column(Integer, nullable=False, default=0)
+    practical_exam_count = Column(Integer, nullable=False, default=0)
+    viva_exam_count = Column(Integer, nullable=False, default=0)
+    tabulation_count = Column(Integer, nullable=False, default=0)
+    answer_sheet_review_count = Column(Integer, nullable=False, default=0)
+    other_remuneration_count = Column(Integer, nullable=False, default=0)
+    script_count = Column(Integer, nullable=False, default=0)  # scripts evaluated
+    student_count = Column(Integer, nullable=False, default=0)  # practical + viva + tabulation students
+    answer_sheet_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    # Semester reports read a semester's rows in teacher order
+    __table_args__ = (
+        Index("ix_remuneration_summaries_semester_teacher", "exam_semester_id", "teacher_id"),
+    )
+
+class RemunerationRollup(Base):
+    """
+    Department x semester x activity type cube of activity counts, quantity
+    sums and amounts, for analytics. A write recomputes the cells of the
+    department and semester it touched in its own transaction (see
+    RollupRepository); rebuild_summaries.py recomputes the whole cube.
+    """
+    __tablename__ = "remuneration_rollups"
+
+    department = Column(String, primary_key=True)
+    exam_semester_id = Column(Integer, ForeignKey("exam_semesters.id"), primary_key=True)
+    activity_type = Column(String, primary_key=True)
+    activity_count = Column(Integer, nullable=False, default=0)  # activity rows
+    question_count = Column(Integer, nullable=False, default=0)
+    script_count = Column(Integer, nullable=False, default=0)
+    student_count = Column(Integer, nullable=False, default=0)
+    answer_sheet_count = Column(Integer, nullable=False, default=0)
+    page_count = Column(Integer, nullable=False, default=0)
+    amount = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
 class User(Base):
     __tablename__ = "users"
     
@@ -191,4 +288,76 @@ class TeacherInvite(Base):
     is_used = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    teacher = relationship("Teacher")
\ No newline at end of file
+    teacher = relationship("Teacher")
+
+class CacheVersion(Base):
+    """Version counter per cache key; bumped on writes so every worker can drop stale entries"""
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+# Change log operations: a row was inserted or updated / a row was deleted
+CHANGE_UPSERT = "upsert"
+CHANGE_DELETE = "delete"
+
+class ChangeLog(Base):
+    """
+    Append-only log of inserted, updated and deleted rows of the synced
+    tables (teachers, courses, exam_semesters, remuneration_activities), for
+    delta sync. seq only ever grows; old entries are pruned after a
+    retention period (see ChangeLogRepository.prune).
+    """
+    __tablename__ = "change_log"
+
+    seq = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)  # table name
+    key = Column(String, nullable=False)  # primary key of the row, as text
+    op = Column(String, nullable=False)  # CHANGE_UPSERT / CHANGE_DELETE
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # AUTOINCREMENT: seq values are never reused, even after pruning
+    __table_args__ = {"sqlite_autoincrement": True}
+
+
+def _log_change(op: str):
+    def listener(mapper, connection, target):
+        key = mapper.primary_key_from_instance(target)[0]
+        connection.execute(ChangeLog.__table__.insert().values(
+            entity=mapper.local_table.name, key=str(key), op=op, changed_at=datetime.utcnow()
+        ))
+    return listener
+
+# ORM writes to the reference tables log themselves in the flushing
+# transaction. Activity rows are written with bulk statements, which skip
+# mapper events; the remuneration repositories log those explicitly.
+for _model in (Teacher, Course, ExamSemester):
+    event.listen(_model, "after_insert", _log_change(CHANGE_UPSERT))
+    event.listen(_model, "after_update", _log_change(CHANGE_UPSERT))
+    event.listen(_model, "after_delete", _log_change(CHANGE_DELETE))
+
+class IdempotencyKey(Base):
+    """
+    Response of a write sent with an Idempotency-Key header, replayed when
+    the client retries it with the same key and body until expires_at
+    """
+    __tablename__ = "idempotency_keys"
+
+    scope = Column(String, primary_key=True)  # endpoint and caller the key belongs to
+    key = Column(String, primary_key=True)
+    body_hash = Column(String, nullable=False)  # sha256 of the request body
+    status_code = Column(Integer, nullable=False)
+    response = Column(Text, nullable=False)  # JSON response body
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class StreamTicket(Base):
+    """
+    Single-use ticket opening an event stream (EventSource can't send an
+    Authorization header); only its sha256 is stored
+    """
+    __tablename__ = "stream_tickets"
+
+    ticket_hash = Column(String, primary_key=True)
+    username = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,281 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+A small registry of counters, gauges and histograms (no client library, no
+push gateway); GET /metrics renders it. Metrics are per worker process, so
+with several uvicorn workers each scrape sees the worker that answered it.
+
+Recorded here:
+- HTTP request counts and latency histograms per route template, in-flight
+  requests (MetricsMiddleware), plus DB time per request from query_stats
+- write coordinator queue depth, time waited for the writer slot and
+  outcomes (completed, failed, queue full, deadline exceeded, busy retry);
+  write_coordinator records them
+- PDF render duration (pdf_generator), Excel import rows and rows/sec
+  (excel_import_processor)
+- cache lookups by result via record_cache_lookup(); the hit ratio is
+  cache_requests_total{result="hit"} / sum(cache_requests_total)
+"""
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from caching.invalidation import invalidation_bus
+from monitoring.query_stats import current_stats
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base class: a named metric family with one child per label combination"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self):
+        for key, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class Gauge(Counter):
+    """Gauge; set_function() makes it report a callback's value at scrape time"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], float]] = None
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    def _samples(self):
+        if self._function is not None:
+            yield f"{self.name} {_format_value(self._function())}"
+            return
+        yield from super()._samples()
+
+
+class _HistogramValue:
+    __slots__ = ("upper_bounds", "bucket_counts", "sum", "count", "_lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.bucket_counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.bucket_counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self):
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts = list(child.bucket_counts)
+                total, count = child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+registry = MetricsRegistry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status"))
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled", ("method",))
+http_request_db_seconds = registry.histogram(
+    "http_request_db_seconds", "Database time spent per HTTP request", ("method", "route"))
+db_queries_total = registry.counter(
+    "db_queries_total", "SQL statements executed while handling HTTP requests", ("route",))
+pdf_render_duration_seconds = registry.histogram(
+    "pdf_render_duration_seconds", "HTML to PDF render time", ("generator",))
+excel_import_rows_total = registry.counter(
+    "excel_import_rows_total", "Rows read from imported Excel sheets")
+excel_import_rows_per_second = registry.histogram(
+    "excel_import_rows_per_second", "Excel import throughput per upload",
+    buckets=(10, 50, 100, 500, 1000, 5000, 10000, 50000))
+write_queue_depth = registry.gauge(
+    "write_queue_depth", "Writes waiting for the write coordinator's writer slot")
+write_wait_seconds = registry.histogram(
+    "write_wait_seconds", "Time writes waited for the write coordinator's writer slot")
+write_outcomes_total = registry.counter(
+    "write_outcomes_total", "Write coordinator outcomes: completed, failed, rejected_queue_full, "
+    "deadline_exceeded, and busy_retries (one per retry)", ("outcome",))
+cache_invalidations_pending = registry.gauge(
+    "cache_invalidations_pending", "Cache keys whose invalidation other workers have not seen yet")
+cache_invalidations_pending.set_function(lambda: invalidation_bus.pending_count)
+cache_requests_total = registry.counter(
+    "cache_requests_total", "Cache lookups by cache name and result (hit/miss)", ("cache", "result"))
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    cache_requests_total.labels(cache, "hit" if hit else "miss").inc()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request metrics by route template.
+    Add it before QueryStatsMiddleware so it runs inside it and can read the
+    request's DB time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        # The route template is only known once routing has happened, so the
+        # in-flight gauge is labelled by method alone.
+        in_flight = http_requests_in_flight.labels(method)
+        in_flight.inc()
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            in_flight.dec()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            http_requests_total.labels(method, route, status).inc()
+            http_request_duration_seconds.labels(method, route).observe(duration)
+            stats = current_stats()
+            if stats is not None and stats.count:
+                http_request_db_seconds.labels(method, route).observe(stats.total_time)
+                db_queries_total.labels(route).inc(stats.count)
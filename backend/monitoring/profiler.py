@@ -0,0 +1,173 @@
+"""
+On-demand sampling profiler for single requests.
+
+A request is profiled when it carries `X-Profile: 1` (or `?profile=1`) and a
+super admin bearer token. While it runs, a background thread samples the
+Python stacks of the process every PROFILER_INTERVAL_MS and counts them in
+collapsed-stack format ("frame;frame;frame count" per line), which
+flamegraph.pl and speedscope open directly. The profile is written to
+PROFILE_DIR/<id>.collapsed; the id is returned in the X-Profile-Id response
+header and the file is served by GET /api/v1/admin/profiles/{id}.
+
+Stacks are sampled for every thread (the event loop and the threadpool
+running sync endpoints), not only the profiled request, so concurrent
+traffic shows up too; idle threads waiting on a lock, queue or selector are
+skipped. Only one request is profiled at a time per worker.
+
+Requests without the flag only pay for a header lookup.
+"""
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Optional
+
+import anyio
+from jose import JWTError, jwt
+from starlette.datastructures import MutableHeaders
+
+import models
+from auth import ALGORITHM, SECRET_KEY
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "120"))
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{12}$")
+
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Path of a stored profile, or None for ids that can't have been issued"""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    return os.path.join(PROFILE_DIR, f"{profile_id}.collapsed")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class SamplingProfiler:
+    """Background thread counting collapsed stacks of all other threads"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {}
+        deadline = time.monotonic() + PROFILER_MAX_SECONDS
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if frame.f_code.co_filename.endswith(_IDLE_FILES):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def write(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _wants_profile(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"x-profile" and value in (b"1", b"true"):
+            return True
+    query = scope.get("query_string", b"")
+    return b"profile=1" in query or b"profile=true" in query
+
+
+def _bearer_token(scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return token if scheme.lower() == "bearer" else None
+    return None
+
+
+def _is_super_admin(token: str) -> bool:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return False
+    if payload.get("role") != "super_admin" or payload.get("sub") is None:
+        return False
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).filter(models.User.username == payload["sub"]).first()
+        return bool(user and user.is_super_admin)
+    finally:
+        db.close()
+
+
+class ProfilerMiddleware:
+    """ASGI middleware profiling opted-in super admin requests"""
+
+    def __init__(self, app):
+        self.app = app
+        self._busy = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        token = _bearer_token(scope)
+        if token is None or not await anyio.to_thread.run_sync(_is_super_admin, token):
+            await self.app(scope, receive, send)
+            return
+        if not self._busy.acquire(blocking=False):
+            logger.info("Profiler busy, not profiling %s %s", scope["method"], scope["path"])
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:12]}"
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        profiler = SamplingProfiler(PROFILER_INTERVAL_MS / 1000)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.stop()
+            self._busy.release()
+            path = profile_path(profile_id)
+            await anyio.to_thread.run_sync(profiler.write, path)
+            logger.info(
+                "Profiled %s %s: %d samples -> %s",
+                scope["method"], scope["path"], sum(profiler.samples.values()), path,
+            )
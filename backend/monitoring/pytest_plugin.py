@@ -0,0 +1,21 @@
+"""
+pytest plugin exposing query budgets as a fixture.
+
+Enable with `pytest -p monitoring.pytest_plugin` (run from backend/), then:
+
+    def test_cumulative_report_query_budget(client, query_budget):
+        with query_budget(15):
+            client.get("/api/v1/reports/cumulative/1", headers=admin_headers)
+"""
+import pytest
+
+from database import async_engine, engine
+from monitoring.query_stats import install_query_instrumentation, query_budget as _query_budget
+
+
+@pytest.fixture
+def query_budget():
+    """Context manager factory: query_budget(max_queries, allow_n_plus_one=False)"""
+    install_query_instrumentation(engine)
+    install_query_instrumentation(async_engine.sync_engine)
+    return _query_budget
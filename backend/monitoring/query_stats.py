@@ -0,0 +1,170 @@
+"""
+Per-request SQL instrumentation.
+
+SQLAlchemy cursor events record every statement executed while a request is
+being handled: statement count, total DB time, and how often each statement
+shape repeats. A shape repeated more than N_PLUS_ONE_THRESHOLD times in one
+request is reported as a suspected N+1 query.
+
+Results are surfaced three ways:
+- QueryStatsMiddleware logs a summary (WARNING when N+1 is suspected or the
+  request runs more than QUERY_COUNT_WARN statements, DEBUG otherwise)
+- with QUERY_STATS_HEADERS=1 the middleware adds X-DB-Query-Count,
+  X-DB-Time-Ms and X-DB-N-Plus-One response headers
+- query_budget() asserts a statement budget around a block of code; the
+  pytest plugin in monitoring/pytest_plugin.py exposes it as a fixture
+"""
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+QUERY_COUNT_WARN = int(os.getenv("QUERY_COUNT_WARN", "200"))
+QUERY_STATS_HEADERS = os.getenv("QUERY_STATS_HEADERS", "0") == "1"
+
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%\([^)]+\)s|\$\d+|:\w+)\s*,)+\s*(?:\?|%\([^)]+\)s|\$\d+|:\w+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so that calls differing only in IN-list size compare equal"""
+    return _IN_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    """Statements executed within one request (or one query_budget block)"""
+
+    __slots__ = ("count", "total_time", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes: Dict[str, int] = {}
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.shapes[statement] = self.shapes.get(statement, 0) + 1
+
+    def suspected_n_plus_one(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[Tuple[str, int]]:
+        """Statement shapes repeated more than `threshold` times, most repeated first"""
+        repeated: Dict[str, int] = {}
+        for statement, count in self.shapes.items():
+            shape = statement_shape(statement)
+            repeated[shape] = repeated.get(shape, 0) + count
+        return sorted(
+            ((shape, count) for shape, count in repeated.items() if count > threshold),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+    def summary(self) -> str:
+        return f"{self.count} queries, {self.total_time * 1000:.1f}ms DB time"
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_budget_collectors: List[QueryStats] = []
+
+
+def current_stats() -> Optional[QueryStats]:
+    """QueryStats of the request being handled, if any"""
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    for collector in _budget_collectors:
+        collector.record(statement, duration)
+
+
+def install_query_instrumentation(engine: Engine) -> None:
+    """Attach the cursor listeners to a (sync) engine; idempotent"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def query_budget(max_queries: int, allow_n_plus_one: bool = False):
+    """
+    Fail with AssertionError if the block runs more than `max_queries`
+    statements (or, unless allowed, a suspected N+1 pattern).
+    Counts statements from every thread, so it also sees work done by
+    TestClient's server thread.
+    """
+    stats = QueryStats()
+    _budget_collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        _budget_collectors.remove(stats)
+    if stats.count > max_queries:
+        raise AssertionError(
+            f"Query budget exceeded: {stats.count} > {max_queries} ({stats.summary()})"
+        )
+    repeated = stats.suspected_n_plus_one()
+    if repeated and not allow_n_plus_one:
+        shape, count = repeated[0]
+        raise AssertionError(f"Suspected N+1: statement ran {count} times: {shape[:200]}")
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware collecting QueryStats for each HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and QUERY_STATS_HEADERS:
+                headers = MutableHeaders(scope=message)
+                headers.append("X-DB-Query-Count", str(stats.count))
+                headers.append("X-DB-Time-Ms", f"{stats.total_time * 1000:.1f}")
+                headers.append("X-DB-N-Plus-One", str(len(stats.suspected_n_plus_one())))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_stats.reset(token)
+            self._log(scope, stats)
+
+    def _log(self, scope, stats: QueryStats) -> None:
+        if not stats.count:
+            return
+        request = f"{scope['method']} {scope['path']}"
+        repeated = stats.suspected_n_plus_one()
+        if repeated:
+            shape, count = repeated[0]
+            logger.warning(
+                "%s: %s; suspected N+1 (%d repeated shapes), worst ran %d times: %s",
+                request, stats.summary(), len(repeated), count, shape[:300],
+            )
+        elif stats.count > QUERY_COUNT_WARN:
+            logger.warning("%s: %s", request, stats.summary())
+        else:
+            logger.debug("%s: %s", request, stats.summary())
@@ -0,0 +1,156 @@
+"""
+Stage timers reported in the Server-Timing response header.
+
+Code marks stages with `with stage("pdf-layout"):` or the `@timed_stage(...)`
+decorator. Every stage duration is recorded in the stage_duration_seconds
+histogram; while a request is being handled it is also added to that
+request's Server-Timing header, which browser devtools show in the network
+panel's Timing tab. Repeated stages within one request are summed.
+
+ServerTimingMiddleware adds these entries on its own:
+- db: SQL time of the request (from query_stats)
+- handler: time spent in the endpoint function (TimedAPIRoute)
+- serialize: from the endpoint returning to the response starting, i.e.
+  response model validation and JSON encoding
+- total: from the request arriving to the response starting
+"""
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+
+from monitoring.metrics import registry
+from monitoring.query_stats import current_stats
+
+stage_duration_seconds = registry.histogram(
+    "stage_duration_seconds", "Duration of named processing stages", ("stage",))
+
+
+class ServerTimings:
+    """Stage durations collected for one request"""
+
+    __slots__ = ("stages", "handler_end")
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.handler_end: Optional[float] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def header_value(self) -> str:
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items())
+
+
+_current_timings: ContextVar[Optional[ServerTimings]] = ContextVar("server_timings", default=None)
+
+
+def record_stage(name: str, seconds: float) -> None:
+    stage_duration_seconds.labels(name).observe(seconds)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def stage(name: str):
+    """Time the enclosed block as stage `name`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def timed_stage(name: str) -> Callable:
+    """Decorator timing a sync or async function as stage `name`"""
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with stage(name):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    def done(start: float) -> None:
+        end = time.perf_counter()
+        record_stage("handler", end - start)
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.handler_end = end
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                done(start)
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            done(start)
+    return wrapper
+
+
+class TimedAPIRoute(APIRoute):
+    """APIRoute that times the endpoint call, separating it from serialization"""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware emitting the Server-Timing header.
+    Add it before QueryStatsMiddleware so it can read the request's DB time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = ServerTimings()
+        token = _current_timings.set(timings)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                if timings.handler_end is not None:
+                    record_stage("serialize", now - timings.handler_end)
+                stats = current_stats()
+                if stats is not None and stats.count:
+                    timings.add("db", stats.total_time)
+                timings.add("total", now - start)
+                MutableHeaders(scope=message).append("Server-Timing", timings.header_value())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timings.reset(token)
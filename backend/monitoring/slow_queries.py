@@ -0,0 +1,174 @@
+"""
+Slow query log.
+
+Statements slower than SLOW_QUERY_THRESHOLD_MS are written as JSON lines to a
+rotating log file (SLOW_QUERY_LOG_PATH, default logs/slow_queries.log) with
+their text, the shape of their parameters (types only, never values),
+duration and query plan: `EXPLAIN QUERY PLAN` on SQLite, `EXPLAIN` elsewhere.
+The plan is captured the first time a statement shape is slow and reused
+afterwards, so a hot slow query does not pay for EXPLAIN on every call.
+
+Aggregates per statement shape are kept in memory since startup and served
+by the admin endpoint GET /api/v1/admin/slow-queries.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from monitoring.query_stats import statement_shape
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_LOG_PATH = os.getenv("SLOW_QUERY_LOG_PATH", "logs/slow_queries.log")
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5"))
+
+_EXPLAINABLE = ("select", "with", "update", "delete", "insert")
+
+logger = logging.getLogger(__name__)
+_slow_log = logging.getLogger("slow_queries")
+_slow_log.propagate = False
+
+
+def _configure_file_log() -> None:
+    if _slow_log.handlers:
+        return
+    directory = os.path.dirname(SLOW_QUERY_LOG_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    handler = RotatingFileHandler(
+        SLOW_QUERY_LOG_PATH,
+        maxBytes=SLOW_QUERY_LOG_MAX_BYTES,
+        backupCount=SLOW_QUERY_LOG_BACKUPS,
+        encoding="utf-8",
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _slow_log.addHandler(handler)
+    _slow_log.setLevel(logging.INFO)
+
+
+def parameters_shape(parameters: Any) -> Any:
+    """Describe bound parameters by type only, e.g. ['str', 'int']"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return {"executemany": len(parameters), "row": parameters_shape(parameters[0])}
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class SlowQueryRegistry:
+    """Per-shape aggregates of slow statements since startup"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def get_plan(self, shape: str) -> Optional[List[str]]:
+        entry = self._entries.get(shape)
+        return entry["plan"] if entry else None
+
+    def record(self, shape: str, statement: str, params_shape: Any,
+               duration_ms: float, plan: Optional[List[str]]) -> None:
+        now = datetime.utcnow().isoformat()
+        with self._lock:
+            entry = self._entries.get(shape)
+            if entry is None:
+                entry = self._entries[shape] = {
+                    "statement": statement,
+                    "parameters_shape": params_shape,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "first_seen": now,
+                    "plan": plan,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_seen"] = now
+            if entry["plan"] is None:
+                entry["plan"] = plan
+
+    def top(self, limit: int = 20, sort: str = "total") -> List[Dict[str, Any]]:
+        key = {"total": "total_ms", "max": "max_ms", "count": "count"}.get(sort, "total_ms")
+        with self._lock:
+            entries = [dict(entry) for entry in self._entries.values()]
+        for entry in entries:
+            entry["avg_ms"] = entry["total_ms"] / entry["count"]
+        entries.sort(key=lambda entry: entry[key], reverse=True)
+        return entries[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_registry = SlowQueryRegistry()
+
+
+def _explain(conn, statement: str, parameters: Any, executemany: bool) -> Optional[List[str]]:
+    """Run EXPLAIN on the raw DBAPI connection (bypasses the SQLAlchemy events)"""
+    if not statement.lstrip().lower().startswith(_EXPLAINABLE):
+        return None
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    is_sqlite = conn.dialect.name == "sqlite"
+    prefix = "EXPLAIN QUERY PLAN " if is_sqlite else "EXPLAIN "
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+    except Exception as e:
+        logger.debug("EXPLAIN failed for slow query: %s", e)
+        return None
+    if is_sqlite:
+        # (id, parent, notused, detail)
+        return [str(row[-1]) for row in rows]
+    return [str(row[0]) for row in rows]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration_ms = (time.perf_counter() - conn.info["slow_query_start_time"].pop()) * 1000
+    if duration_ms < SLOW_QUERY_THRESHOLD_MS:
+        return
+    try:
+        shape = statement_shape(statement)
+        plan = slow_query_registry.get_plan(shape)
+        if plan is None:
+            plan = _explain(conn, statement, parameters, executemany)
+        params_shape = parameters_shape(parameters)
+        slow_query_registry.record(shape, statement, params_shape, duration_ms, plan)
+        _slow_log.info(json.dumps({
+            "time": datetime.utcnow().isoformat(),
+            "duration_ms": round(duration_ms, 2),
+            "statement": statement,
+            "parameters_shape": params_shape,
+            "plan": plan,
+        }))
+    except Exception as e:
+        # Never let diagnostics break the query that was being measured
+        logger.warning("Failed to record slow query: %s", e)
+
+
+def install_slow_query_log(engine: Engine) -> None:
+    """Attach the slow query listeners to a (sync) engine; idempotent"""
+    _configure_file_log()
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
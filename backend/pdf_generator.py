@@ -4,15 +4,36 @@ import traceback
 from weasyprint import HTML, CSS
 from sqlalchemy.orm import Session
 import models
-import crud
 from jinja2 import Template
 import base64
+import time
 from io import BytesIO
+from monitoring.metrics import pdf_render_duration_seconds
+from monitoring.server_timing import stage, timed_stage
+from caching import reference_cache
+from events.event_bus import event_bus
+from repositories.remuneration_repository import RemunerationRepository
+from services.remuneration_service import RemunerationService
+
+# Statement PDF columns: activities counted per semester
+STATEMENT_ACTIVITY_LABELS = {
+    "question_preparations": "Question preparation",
+    "question_moderations": "Question moderation",
+    "script_evaluations": "Script evaluation",
+    "practical_exams": "Practical exam",
+    "viva_exams": "Viva",
+    "tabulations": "Tabulation",
+    "answer_sheet_reviews": "Answer sheet review",
+    "other_remunerations": "Other",
+}
 
 
 class PDFGenerator(ABC):
     """Abstract base class for PDF generators"""
 
+    # Reported with the pdf.ready event
+    kind = "pdf"
+
     def __init__(self, db: Session):
         self.db = db
 
@@ -24,11 +45,17 @@ class PDFGenerator(ABC):
     def _generate_pdf_from_html(self, html_content: str, filename: str) -> dict:
         """Common PDF generation logic"""
         try:
-            pdf_buffer = BytesIO()
-            HTML(string=html_content).write_pdf(pdf_buffer)
-            pdf_buffer.seek(0)
+            start = time.perf_counter()
+            with stage("pdf-layout"):
+                pdf_buffer = BytesIO()
+                HTML(string=html_content).write_pdf(pdf_buffer)
+                pdf_buffer.seek(0)
+            pdf_render_duration_seconds.labels(type(self).__name__).observe(time.perf_counter() - start)
+
+            with stage("pdf-base64"):
+                pdf_base64 = base64.b64encode(pdf_buffer.read()).decode('utf-8')
 
-            pdf_base64 = base64.b64encode(pdf_buffer.read()).decode('utf-8')
+            event_bus.publish("pdf.ready", kind=self.kind, filename=filename)
 
             return {
                 "pdf_data": pdf_base64,
@@ -44,6 +71,9 @@ class PDFGenerator(ABC):
 class IndividualPDFGenerator(PDFGenerator):
     """Generator for individual teacher remuneration PDFs"""
 
+    kind = "individual"
+
+    @timed_stage("pdf-generate")
     def generate(self, data):
         """Generate individual teacher remuneration PDF"""
         try:
@@ -60,8 +90,8 @@ class IndividualPDFGenerator(PDFGenerator):
             if not semester:
                 raise HTTPException(status_code=404, detail="Semester not found")
 
-            remuneration_data = crud.get_teacher_remuneration(
-                self.db, data.teacher_id, data.exam_semester_id
+            remuneration_data = RemunerationRepository(self.db).get_teacher_remuneration(
+                data.teacher_id, data.exam_semester_id
             )
 
             chairman = self.db.query(models.Teacher).filter(
@@ -448,21 +478,22 @@ class IndividualPDFGenerator(PDFGenerator):
 
             template = Template(html_template)
 
-            html_content = template.render(
-                teacher=teacher,
-                semester=semester,
-                chairman=chairman,
-                question_preparations=remuneration_data.get('question_preparations', []),
-                question_moderations=remuneration_data.get('question_moderations', []),
-                script_evaluations=remuneration_data.get('script_evaluations', []),
-                practical_exams=remuneration_data.get('practical_exams', []),
-                viva_exams=remuneration_data.get('viva_exams', []),
-                tabulations=remuneration_data.get('tabulations', []),
-                answer_sheet_reviews=remuneration_data.get('answer_sheet_reviews', []),
-                other_remunerations=remuneration_data.get('other_remunerations', []),
-                current_date="২০২৫-০১-০৭",
-                bill_serial="001"
-            )
+            with stage("pdf-html"):
+                html_content = template.render(
+                    teacher=teacher,
+                    semester=semester,
+                    chairman=chairman,
+                    question_preparations=remuneration_data.get('question_preparations', []),
+                    question_moderations=remuneration_data.get('question_moderations', []),
+                    script_evaluations=remuneration_data.get('script_evaluations', []),
+                    practical_exams=remuneration_data.get('practical_exams', []),
+                    viva_exams=remuneration_data.get('viva_exams', []),
+                    tabulations=remuneration_data.get('tabulations', []),
+                    answer_sheet_reviews=remuneration_data.get('answer_sheet_reviews', []),
+                    other_remunerations=remuneration_data.get('other_remunerations', []),
+                    current_date="২০২৫-০১-০৭",
+                    bill_serial="001"
+                )
 
             filename = f"remuneration_bill_{teacher.name}_{semester.year}_{semester.semester_name}.pdf"
             return self._generate_pdf_from_html(html_content, filename)
@@ -479,6 +510,9 @@ class IndividualPDFGenerator(PDFGenerator):
 class CumulativePDFGenerator(PDFGenerator):
     """Generator for cumulative remuneration report PDFs"""
 
+    kind = "cumulative"
+
+    @timed_stage("pdf-generate")
     def generate(self, data):
         """Generate cumulative remuneration report PDF"""
         print("[CumulativePDFGenerator] Started PDF generation...")
@@ -492,10 +526,10 @@ class CumulativePDFGenerator(PDFGenerator):
                 raise HTTPException(status_code=404, detail="Semester not found")
 
             print("[CumulativePDFGenerator] Fetching cumulative report...")
-            report_data = crud.get_cumulative_report(self.db, data.exam_semester_id)
+            report_data = RemunerationService(self.db).get_cumulative_report(data.exam_semester_id)
 
             print("[CumulativePDFGenerator] Fetching all courses...")
-            all_courses = {course.course_code: course for course in self.db.query(models.Course).all()}
+            all_courses = reference_cache.courses.get().by_key
 
             # HTML Template
             html_template = """
@@ -705,12 +739,13 @@ class CumulativePDFGenerator(PDFGenerator):
             ).first()
 
             print("[CumulativePDFGenerator] Rendering HTML...")
-            html_content = template.render(
-                semester=semester,
-                chairman=chairman,
-                report_data=report_data,
-                all_courses=all_courses
-            )
+            with stage("pdf-html"):
+                html_content = template.render(
+                    semester=semester,
+                    chairman=chairman,
+                    report_data=report_data,
+                    all_courses=all_courses
+                )
 
             print("[CumulativePDFGenerator] Generating PDF...")
             filename = f"cumulative_report_{semester.year}_{semester.semester_name}.pdf"
@@ -727,6 +762,135 @@ class CumulativePDFGenerator(PDFGenerator):
             )
 
 
+class StatementPDFGenerator(PDFGenerator):
+    """Generator for multi-year teacher statement PDFs"""
+
+    kind = "statement"
+
+    @timed_stage("pdf-generate")
+    def generate(self, data):
+        """Generate a teacher's statement over data.from_year..data.to_year"""
+        try:
+            statement = RemunerationService(self.db).get_teacher_statement(
+                data.teacher_id, data.from_year, data.to_year
+            )
+
+            # HTML Template
+            html_template = """
+            <!DOCTYPE html>
+            <html>
+            <head>
+                <meta charset="utf-8">
+                <title>Remuneration Statement</title>
+                <style>
+                    body {
+                        font-family: 'Arial', sans-serif;
+                        margin: 20px;
+                        font-size: 11px;
+                    }
+                    table {
+                        width: 100%;
+                        border-collapse: collapse;
+                        margin-top: 5px;
+                        margin-bottom: 15px;
+                    }
+                    th, td {
+                        border: 1px solid #000;
+                        padding: 4px;
+                        text-align: center;
+                    }
+                    th {
+                        background-color: #f0f0f0;
+                        font-weight: bold;
+                    }
+                    td.semester {
+                        text-align: left;
+                    }
+                    .header {
+                        text-align: center;
+                        font-weight: bold;
+                        font-size: 14px;
+                        margin-bottom: 5px;
+                    }
+                    .subheader {
+                        text-align: center;
+                        margin-bottom: 15px;
+                    }
+                    .year-title {
+                        font-weight: bold;
+                        margin-top: 15px;
+                    }
+                    .total-row td {
+                        font-weight: bold;
+                    }
+                    .grand-total {
+                        font-weight: bold;
+                        text-align: right;
+                        font-size: 12px;
+                    }
+                </style>
+            </head>
+            <body>
+                <div class="header">Examination Remuneration Statement</div>
+                <div class="subheader">
+                    {{ statement.teacher.name }}, {{ statement.teacher.designation }}, {{ statement.teacher.department }}<br>
+                    {% if statement.from_year or statement.to_year %}
+                    Years {{ statement.from_year or "" }} &ndash; {{ statement.to_year or "" }}
+                    {% else %}
+                    All years
+                    {% endif %}
+                </div>
+
+                {% for year in statement.years %}
+                <div class="year-title">{{ year.year }}</div>
+                <table>
+                    <tr>
+                        <th>Semester</th>
+                        {% for label in activity_labels.values() %}<th>{{ label }}</th>{% endfor %}
+                        <th>Amount (Tk.)</th>
+                    </tr>
+                    {% for entry in year.semesters %}
+                    <tr>
+                        <td class="semester">{{ entry.semester.name }}</td>
+                        {% for key in activity_labels %}<td>{{ entry.remunerations[key] | length }}</td>{% endfor %}
+                        <td>{{ "%.2f" | format(entry.total_amount) }}</td>
+                    </tr>
+                    {% endfor %}
+                    <tr class="total-row">
+                        <td class="semester" colspan="{{ activity_labels | length + 1 }}">Total for {{ year.year }}</td>
+                        <td>{{ "%.2f" | format(year.total_amount) }}</td>
+                    </tr>
+                </table>
+                {% else %}
+                <p>No remuneration activity in this period.</p>
+                {% endfor %}
+
+                <div class="grand-total">Grand total: Tk. {{ "%.2f" | format(statement.total_amount) }}</div>
+            </body>
+            </html>
+            """
+
+            template = Template(html_template)
+
+            with stage("pdf-html"):
+                html_content = template.render(
+                    statement=statement,
+                    activity_labels=STATEMENT_ACTIVITY_LABELS
+                )
+
+            period = f"{data.from_year or 'start'}-{data.to_year or 'now'}"
+            filename = f"remuneration_statement_{statement.teacher.name}_{period}.pdf"
+            return self._generate_pdf_from_html(html_content, filename)
+
+        except (HTTPException, ValueError):
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to generate statement PDF: {str(e)}"
+            )
+
+
 class PDFGeneratorFactory:
     """Factory for creating PDF generators"""
 
@@ -737,6 +901,8 @@ class PDFGeneratorFactory:
             return IndividualPDFGenerator(db)
         elif generator_type == "cumulative":
             return CumulativePDFGenerator(db)
+        elif generator_type == "statement":
+            return StatementPDFGenerator(db)
         else:
             raise ValueError(f"Unknown generator type: {generator_type}")
 
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Recompute the materialized remuneration summaries (remuneration_summaries)
+and the analytics rollup (remuneration_rollups) from the activity tables.
+Writes keep both current; run this after changing activity rows or teacher
+departments outside the API, or to check for drift.
+"""
+
+from database import SessionLocal, Base, engine
+from services.remuneration_service import RemunerationService
+
+
+def rebuild_summaries():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        semester_ids = RemunerationService(db).rebuild_summaries()
+    finally:
+        db.close()
+    print(f"Rebuilt summaries for {len(semester_ids)} semester(s): {semester_ids}")
+
+
+if __name__ == "__main__":
+    rebuild_summaries()
@@ -1,10 +1,84 @@
+import base64
+import binascii
+import json
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar, List, Optional
+from typing import Any, Dict, Generic, TypeVar, List, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 T = TypeVar('T')
 
-class BaseRepository(ABC, Generic[T]):
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(key: Any) -> str:
+    """Opaque cursor pointing after the row with primary key `key`"""
+    return base64.urlsafe_b64encode(json.dumps([key]).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Any:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        (key,) = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return key
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+class KeysetListMixin:
+    """
+    Filtered, projected listings in primary key order with keyset pagination,
+    shared by the sync and async repositories. Each page continues with
+    `WHERE key > last_key ORDER BY key LIMIT n`, which stays an index range
+    scan however deep the page is (no OFFSET).
+    """
+    
+    # Columns accepted as equality filters; back each with an index on (column, primary key)
+    filter_fields: Tuple[str, ...] = ()
+    
+    def _list_statement(
+        self, filters: Optional[Dict[str, Any]], cursor: Optional[str],
+        limit: Optional[int], fields: Optional[Sequence[str]]
+    ):
+        key = self.model.__mapper__.primary_key[0]
+        columns = self.model.__table__.columns
+        if fields:
+            unknown = [name for name in fields if name not in columns]
+            if unknown:
+                raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+            # The key is always returned; the next page's cursor is built from it
+            selected = [key] + [columns[name] for name in dict.fromkeys(fields) if name != key.key]
+        else:
+            selected = list(columns)
+        stmt = select(*selected).order_by(key)
+        for name, value in (filters or {}).items():
+            if name not in self.filter_fields:
+                raise ValueError(f"Cannot filter by {name}")
+            if value is not None:
+                stmt = stmt.where(columns[name] == value)
+        if cursor is not None:
+            after = decode_cursor(cursor)
+            if not isinstance(after, key.type.python_type):
+                raise ValueError("Invalid cursor")
+            stmt = stmt.where(key > after)
+            limit = limit or DEFAULT_PAGE_SIZE
+        if limit is not None:
+            # One extra row tells whether there is a next page
+            stmt = stmt.limit(min(limit, MAX_PAGE_SIZE) + 1)
+        return stmt, key.key, limit
+    
+    @staticmethod
+    def _page(rows, key_name: str, limit: Optional[int]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        items = [dict(row._mapping) for row in rows]
+        if limit is not None and len(items) > limit:
+            del items[limit:]
+            return items, encode_cursor(items[-1][key_name])
+        return items, None
+
+
+class BaseRepository(KeysetListMixin, ABC, Generic[T]):
     """Abstract base repository defining common CRUD operations"""
     
     def __init__(self, db: Session):
@@ -29,3 +103,51 @@ class BaseRepository(ABC, Generic[T]):
     @abstractmethod
     def delete(self, id: any) -> bool:
         pass
+    
+    def list_page(
+        self, filters: Optional[Dict[str, Any]] = None, cursor: Optional[str] = None,
+        limit: Optional[int] = None, fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Rows matching `filters` (column -> value, None = no filter) after
+        `cursor`, as dicts of the requested `fields` (default all columns).
+        Returns the rows and the cursor of the next page (None on the last page).
+        Without `limit` and `cursor` every matching row is returned.
+        """
+        stmt, key_name, limit = self._list_statement(filters, cursor, limit, fields)
+        return self._page(self.db.execute(stmt), key_name, limit)
+
+
+class AsyncBaseRepository(KeysetListMixin, ABC, Generic[T]):
+    """Abstract base repository for the asyncio session (read-heavy endpoints)"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    @abstractmethod
+    async def get_by_id(self, id: any) -> Optional[T]:
+        pass
+    
+    @abstractmethod
+    async def get_all(self) -> List[T]:
+        pass
+    
+    @abstractmethod
+    async def create(self, entity: T) -> T:
+        pass
+    
+    @abstractmethod
+    async def update(self, entity: T) -> T:
+        pass
+    
+    @abstractmethod
+    async def delete(self, id: any) -> bool:
+        pass
+    
+    async def list_page(
+        self, filters: Optional[Dict[str, Any]] = None, cursor: Optional[str] = None,
+        limit: Optional[int] = None, fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Async counterpart of BaseRepository.list_page"""
+        stmt, key_name, limit = self._list_statement(filters, cursor, limit, fields)
+        return self._page(await self.db.execute(stmt), key_name, limit)
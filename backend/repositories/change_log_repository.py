@@ -0,0 +1,126 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import DateTime, String, cast, delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+import models
+import schemas
+
+_log = models.ChangeLog
+
+# Tables whose changes are logged, by the entity name used in the log
+SYNCED_MODELS = {
+    model.__tablename__: model
+    for model in (models.Teacher, models.Course, models.ExamSemester, models.RemunerationActivity)
+}
+
+
+def record_changes(model, op: str, *criteria):
+    """
+    INSERT ... SELECT logging `op` for every row of `model`'s table matching
+    `criteria`. For set-based writes that mapper events don't see: run it
+    before a DELETE, or after an INSERT, in the same transaction.
+    """
+    key = model.__mapper__.primary_key[0]
+    rows = select(
+        literal(model.__tablename__),
+        cast(key, String),
+        literal(op),
+        literal(datetime.utcnow(), DateTime),
+    ).where(*criteria).order_by(key)
+    return insert(_log).from_select(["entity", "key", "op", "changed_at"], rows)
+
+
+def _row_data(entity: str, row) -> Dict[str, Any]:
+    values = row._mapping
+    if entity != models.RemunerationActivity.__tablename__:
+        return dict(values)
+    # Activity rows carry only their own type's columns
+    model = models.RemunerationActivity.__mapper__.polymorphic_map[values["activity_type"]].class_
+    data = {column.key: values[column.key] for column in model.activity_columns()}
+    data["activity_type"] = values["activity_type"]
+    return data
+
+
+class ChangeLogRepository:
+    """Writes and maintenance of the change log (models.ChangeLog)"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, model, op: str, *criteria) -> None:
+        """Log `op` for the rows of `model` matching `criteria` (see record_changes)"""
+        self.db.execute(record_changes(model, op, *criteria))
+
+    def prune(self, before: datetime) -> int:
+        """
+        Delete entries logged before `before`; returns how many. The newest
+        entry is always kept, so readers can tell how far the log was pruned.
+        """
+        newest = select(func.max(_log.seq)).scalar_subquery()
+        return self.db.execute(delete(_log).where(_log.changed_at < before, _log.seq < newest)).rowcount
+
+
+class AsyncChangeLogRepository:
+    """Async reads of the change log"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_bounds(self) -> Tuple[Optional[int], Optional[int]]:
+        """Oldest and latest retained seq (None, None when the log is empty)"""
+        result = await self.db.execute(select(func.min(_log.seq), func.max(_log.seq)))
+        return tuple(result.one())
+
+    async def get_changes(self, since: int, limit: int) -> Tuple[List[schemas.ChangeEntry], int, bool]:
+        """
+        Changes logged after `since`, reading at most `limit` entries.
+        Several changes of one row collapse into its latest; upserts carry
+        the row's current values. Returns the changes, the seq to continue
+        from, and whether more entries follow.
+        """
+        result = await self.db.execute(
+            select(_log.seq, _log.entity, _log.key, _log.op)
+            .where(_log.seq > since)
+            .order_by(_log.seq)
+            .limit(limit + 1)
+        )
+        entries = result.all()
+        has_more = len(entries) > limit
+        del entries[limit:]
+        next_since = entries[-1].seq if entries else since
+
+        latest = {}
+        for entry in entries:
+            latest.pop((entry.entity, entry.key), None)
+            latest[(entry.entity, entry.key)] = entry
+
+        # Current values of the upserted rows, one query per table
+        upserted: Dict[str, List[str]] = {}
+        for entity, key in latest:
+            if latest[(entity, key)].op == models.CHANGE_UPSERT:
+                upserted.setdefault(entity, []).append(key)
+        data: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for entity, keys in upserted.items():
+            model = SYNCED_MODELS[entity]
+            key_column = model.__mapper__.primary_key[0]
+            key_type = key_column.type.python_type
+            rows = await self.db.execute(
+                select(*model.__table__.columns).where(key_column.in_([key_type(key) for key in keys]))
+            )
+            for row in rows:
+                data[(entity, str(row._mapping[key_column.key]))] = _row_data(entity, row)
+
+        changes = []
+        for entry in latest.values():
+            if entry.op == models.CHANGE_UPSERT:
+                values = data.get((entry.entity, entry.key))
+                if values is None:
+                    # Deleted since; its tombstone follows later in the log
+                    continue
+            else:
+                values = None
+            changes.append(schemas.ChangeEntry.model_construct(
+                seq=entry.seq, entity=entry.entity, key=entry.key, op=entry.op, data=values
+            ))
+        return changes, next_since, has_more
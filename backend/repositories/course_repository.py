@@ -1,12 +1,16 @@
 from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from repositories.base import BaseRepository
+from repositories.base import AsyncBaseRepository, BaseRepository
 import models
 import schemas
 
 class CourseRepository(BaseRepository[models.Course]):
     """Repository for Course entity operations"""
     
+    filter_fields = ("department",)
+    
     def __init__(self, db: Session):
         super().__init__(db)
         self.model = models.Course
@@ -42,4 +46,50 @@ class CourseRepository(BaseRepository[models.Course]):
     def get_by_department(self, department: str) -> List[models.Course]:
         return self.db.query(self.model).filter(
             self.model.department == department
-        ).all()
\ No newline at end of file
+        ).all()
+
+
+class AsyncCourseRepository(AsyncBaseRepository[models.Course]):
+    """Async repository for Course entity operations"""
+    
+    filter_fields = ("department",)
+    
+    def __init__(self, db: AsyncSession):
+        super().__init__(db)
+        self.model = models.Course
+    
+    async def get_by_id(self, course_code: str) -> Optional[models.Course]:
+        result = await self.db.execute(
+            select(self.model).where(self.model.course_code == course_code)
+        )
+        return result.scalars().first()
+    
+    async def get_all(self) -> List[models.Course]:
+        result = await self.db.execute(select(self.model))
+        return list(result.scalars().all())
+    
+    async def create(self, course_data: schemas.CourseCreate) -> models.Course:
+        db_course = self.model(**course_data.dict())
+        self.db.add(db_course)
+        await self.db.commit()
+        await self.db.refresh(db_course)
+        return db_course
+    
+    async def update(self, course: models.Course) -> models.Course:
+        await self.db.commit()
+        await self.db.refresh(course)
+        return course
+    
+    async def delete(self, course_code: str) -> bool:
+        course = await self.get_by_id(course_code)
+        if course:
+            await self.db.delete(course)
+            await self.db.commit()
+            return True
+        return False
+    
+    async def get_by_department(self, department: str) -> List[models.Course]:
+        result = await self.db.execute(
+            select(self.model).where(self.model.department == department)
+        )
+        return list(result.scalars().all())
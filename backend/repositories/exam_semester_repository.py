@@ -1,13 +1,16 @@
 from typing import List, Optional
-from sqlalchemy import and_
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from repositories.base import BaseRepository
+from repositories.base import AsyncBaseRepository, BaseRepository
 import models
 import schemas
 
 class ExamSemesterRepository(BaseRepository[models.ExamSemester]):
     """Repository for ExamSemester entity operations"""
     
+    filter_fields = ("year",)
+    
     def __init__(self, db: Session):
         super().__init__(db)
         self.model = models.ExamSemester
@@ -51,3 +54,54 @@ class ExamSemesterRepository(BaseRepository[models.ExamSemester]):
     
     
 
+
+class AsyncExamSemesterRepository(AsyncBaseRepository[models.ExamSemester]):
+    """Async repository for ExamSemester entity operations"""
+    
+    filter_fields = ("year",)
+    
+    def __init__(self, db: AsyncSession):
+        super().__init__(db)
+        self.model = models.ExamSemester
+    
+    async def get_by_id(self, semester_id: int) -> Optional[models.ExamSemester]:
+        result = await self.db.execute(
+            select(self.model).where(self.model.id == semester_id)
+        )
+        return result.scalars().first()
+    
+    async def get_all(self) -> List[models.ExamSemester]:
+        result = await self.db.execute(select(self.model))
+        return list(result.scalars().all())
+    
+    async def create(self, semester_data: schemas.ExamSemesterCreate) -> models.ExamSemester:
+        db_semester = self.model(**semester_data.dict())
+        self.db.add(db_semester)
+        await self.db.commit()
+        await self.db.refresh(db_semester)
+        return db_semester
+    
+    async def update(self, semester: models.ExamSemester) -> models.ExamSemester:
+        await self.db.commit()
+        await self.db.refresh(semester)
+        return semester
+    
+    async def delete(self, semester_id: int) -> bool:
+        semester = await self.get_by_id(semester_id)
+        if semester:
+            await self.db.delete(semester)
+            await self.db.commit()
+            return True
+        return False
+    
+    async def get_by_year_and_name(self, year: int, semester_name: str) -> Optional[models.ExamSemester]:
+        """Get semester by year and name"""
+        result = await self.db.execute(
+            select(self.model).where(
+                and_(
+                    self.model.year == int(year),
+                    self.model.semester_name == semester_name
+                )
+            )
+        )
+        return result.scalars().first()
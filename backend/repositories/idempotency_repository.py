@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+import models
+
+_keys = models.IdempotencyKey
+
+
+class IdempotencyRepository:
+    """Repository for stored responses of idempotent writes (models.IdempotencyKey)"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, scope: str, key: str, now: datetime) -> Optional[models.IdempotencyKey]:
+        """Unexpired record of a key"""
+        return self.db.execute(
+            select(_keys).where(_keys.scope == scope, _keys.key == key, _keys.expires_at > now)
+        ).scalars().first()
+
+    def save(self, record: models.IdempotencyKey, now: datetime) -> None:
+        """Store a record, replacing an expired one of the same key"""
+        self.db.execute(delete(_keys).where(
+            _keys.scope == record.scope, _keys.key == record.key, _keys.expires_at <= now
+        ))
+        self.db.add(record)
+        self.db.flush()
+
+    def prune(self, now: datetime) -> int:
+        """Delete expired records; returns how many"""
+        return self.db.execute(delete(_keys).where(_keys.expires_at <= now)).rowcount
+
+    def commit(self) -> None:
+        self.db.commit()
+
+    def rollback(self) -> None:
+        self.db.rollback()
@@ -0,0 +1,65 @@
+from typing import List, Optional
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session, selectinload
+import models
+import schemas
+
+
+def effective_schedule_id(semester_id: Optional[int]):
+    """
+    Scalar subquery selecting the rate schedule in force for a semester: its
+    own latest version if it has one, else the latest default version.
+    `semester_id=None` selects the latest default version.
+    """
+    schedule = models.RateSchedule
+    if semester_id is None:
+        scope = schedule.exam_semester_id.is_(None)
+    else:
+        scope = or_(schedule.exam_semester_id == semester_id, schedule.exam_semester_id.is_(None))
+    return (
+        select(schedule.id)
+        .where(scope)
+        .order_by(schedule.exam_semester_id.is_(None), schedule.version.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+class RateScheduleRepository:
+    """Repository for the versioned remuneration rate schedules"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_effective(self, semester_id: Optional[int]) -> Optional[models.RateSchedule]:
+        """Schedule in force for a semester (None: the default schedule)"""
+        return self.db.execute(
+            select(models.RateSchedule)
+            .options(selectinload(models.RateSchedule.rates))
+            .where(models.RateSchedule.id == effective_schedule_id(semester_id))
+        ).scalars().first()
+
+    def latest_version(self, semester_id: Optional[int]) -> int:
+        """Highest version of a semester's own schedule (None: the default schedule); 0 if none"""
+        scope = (
+            models.RateSchedule.exam_semester_id.is_(None) if semester_id is None
+            else models.RateSchedule.exam_semester_id == semester_id
+        )
+        return self.db.execute(
+            select(func.coalesce(func.max(models.RateSchedule.version), 0)).where(scope)
+        ).scalar_one()
+
+    def add_version(
+        self, semester_id: Optional[int], version: int, rates: List[schemas.RateEntry]
+    ) -> models.RateSchedule:
+        """Stage a new schedule version; the caller commits"""
+        schedule = models.RateSchedule(
+            exam_semester_id=semester_id,
+            version=version,
+            rates=[
+                models.RateScheduleRate(activity_type=rate.activity_type, variant=rate.variant, rate=rate.rate)
+                for rate in rates
+            ]
+        )
+        self.db.add(schedule)
+        return schedule
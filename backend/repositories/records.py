@@ -0,0 +1,39 @@
+"""
+Compact read-only records for the report and PDF read paths.
+
+Each activity type gets a slotted dataclass holding exactly its columns.
+Report queries select plain columns and build records from the row tuples,
+so the rows never enter the Session: no identity map entry, instance state,
+attribute history or lazy relationships per row. orjson and jsonable_encoder
+serialize dataclasses in the same shape as the ORM row.
+"""
+from dataclasses import make_dataclass
+from typing import Any, Dict, Type
+
+import models
+from caching import reference_cache
+
+
+def _course(self):
+    """The row's course, from the reference cache (replaces the ORM relationship)"""
+    return reference_cache.courses.get().by_key.get(self.course_code)
+
+
+def record_class(model) -> Type:
+    """Slotted dataclass with one field per column of activity type `model`, in column order"""
+    columns = [column.key for column in model.activity_columns()]
+    namespace: Dict[str, Any] = {}
+    if "course_code" in columns:
+        namespace["course"] = property(_course)
+    return make_dataclass(f"{model.__name__}Record", [(name, Any) for name in columns],
+                          namespace=namespace, slots=True)
+
+
+QuestionPreparationRecord = record_class(models.QuestionPreparation)
+QuestionModerationRecord = record_class(models.QuestionModeration)
+ScriptEvaluationRecord = record_class(models.ScriptEvaluation)
+PracticalExamRecord = record_class(models.PracticalExam)
+VivaExamRecord = record_class(models.VivaExam)
+TabulationRecord = record_class(models.Tabulation)
+AnswerSheetReviewRecord = record_class(models.AnswerSheetReview)
+OtherRemunerationRecord = record_class(models.OtherRemuneration)
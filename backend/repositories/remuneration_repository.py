@@ -1,265 +1,453 @@
-from typing import List, Dict, Any
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from operator import itemgetter
+from typing import AsyncIterator, List, Dict, Any, Optional, Sequence, Set, Tuple
+from sqlalchemy import Float, and_, case, cast, delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
 import models
 import schemas
+from caching.report_cache import bump_semesters
+from repositories import records
+from repositories.rate_schedule_repository import effective_schedule_id
+from repositories.change_log_repository import record_changes
+
+# Activity tables keyed by the name used in submissions and report payloads
+ACTIVITY_MODELS = {
+    "question_preparations": models.QuestionPreparation,
+    "question_moderations": models.QuestionModeration,
+    "script_evaluations": models.ScriptEvaluation,
+    "practical_exams": models.PracticalExam,
+    "viva_exams": models.VivaExam,
+    "tabulations": models.Tabulation,
+    "answer_sheet_reviews": models.AnswerSheetReview,
+    "other_remunerations": models.OtherRemuneration,
+}
+
+# Read-only record per activity table. Report reads select the table's columns
+# and unpack each row into its record, so report rows never enter the Session
+ACTIVITY_RECORDS = {
+    "question_preparations": records.QuestionPreparationRecord,
+    "question_moderations": records.QuestionModerationRecord,
+    "script_evaluations": records.ScriptEvaluationRecord,
+    "practical_exams": records.PracticalExamRecord,
+    "viva_exams": records.VivaExamRecord,
+    "tabulations": records.TabulationRecord,
+    "answer_sheet_reviews": records.AnswerSheetReviewRecord,
+    "other_remunerations": records.OtherRemunerationRecord,
+}
+
+_SEMESTER_SUMMARY_COLUMNS = (
+    models.ExamSemester.id,
+    models.ExamSemester.semester_name.label("name"),
+    models.ExamSemester.year,
+    models.ExamSemester.exam_start_date,
+    models.ExamSemester.exam_end_date,
+    models.ExamSemester.result_publish_date,
+)
+
+
+def _build(schema, row):
+    # Values come from typed columns, so pydantic validation is skipped
+    return schema.model_construct(**row._mapping)
+
+
+_LEDGER = models.RemunerationActivity
+_LEDGER_COLUMNS = tuple(_LEDGER.__table__.columns)
+
+
+def _record_builder(key: str, model):
+    """Build activity type `key`'s record from a full ledger row"""
+    names = [column.key for column in _LEDGER_COLUMNS]
+    fields = itemgetter(*(names.index(column.key) for column in model.activity_columns()))
+    record = ACTIVITY_RECORDS[key]
+    return lambda row: record(*fields(row))
+
+
+_RECORD_BUILDERS = {key: _record_builder(key, model) for key, model in ACTIVITY_MODELS.items()}
+
+
+def _ledger_rows(*criteria):
+    return select(*_LEDGER_COLUMNS).where(*criteria)
+
+
+def _teacher_semester_rows(teacher_id: str, semester_id: int):
+    # Served in index order by ix_remuneration_activities_teacher_semester_type
+    return _ledger_rows(
+        _LEDGER.teacher_id == teacher_id,
+        _LEDGER.exam_semester_id == semester_id
+    ).order_by(_LEDGER.activity_type, _LEDGER.id)
+
+
+def _teachers_with_semester_activity(semester_id: int):
+    return select(*models.Teacher.__table__.columns).where(
+        select(_LEDGER.id).where(
+            and_(
+                _LEDGER.teacher_id == models.Teacher.id,
+                _LEDGER.exam_semester_id == semester_id
+            )
+        ).exists()
+    )
+
+
+def _semesters_with_teacher_activity(teacher_id: str):
+    return select(_LEDGER.id).where(
+        and_(
+            _LEDGER.exam_semester_id == models.ExamSemester.id,
+            _LEDGER.teacher_id == teacher_id
+        )
+    ).exists()
+
+
+def _in_years(from_year: Optional[int], to_year: Optional[int]) -> List[Any]:
+    """Criteria on ExamSemester.year for an inclusive, optionally open year range"""
+    criteria = []
+    if from_year is not None:
+        criteria.append(models.ExamSemester.year >= from_year)
+    if to_year is not None:
+        criteria.append(models.ExamSemester.year <= to_year)
+    return criteria
+
+
+def _teacher_rows(teacher_id: str, from_year: Optional[int] = None, to_year: Optional[int] = None):
+    """
+    All of a teacher's ledger rows, optionally only in semesters of the year
+    range; served in index order by ix_remuneration_activities_teacher_semester_type
+    """
+    criteria = [_LEDGER.teacher_id == teacher_id]
+    years = _in_years(from_year, to_year)
+    if years:
+        criteria.append(_LEDGER.exam_semester_id.in_(select(models.ExamSemester.id).where(*years)))
+    return _ledger_rows(*criteria).order_by(_LEDGER.exam_semester_id, _LEDGER.activity_type, _LEDGER.id)
+
+
+def _teacher_semesters(teacher_id: str, from_year: Optional[int] = None, to_year: Optional[int] = None):
+    """Semesters in the year range where a teacher has activity, oldest first"""
+    return (
+        select(*_SEMESTER_SUMMARY_COLUMNS)
+        .where(_semesters_with_teacher_activity(teacher_id), *_in_years(from_year, to_year))
+        .order_by(models.ExamSemester.year, models.ExamSemester.id)
+    )
+
+
+def _teacher_semester_changes(op: str, pairs):
+    """Change log statements recording `op` for the ledger rows of each (teacher, semester) pair"""
+    return [
+        record_changes(_LEDGER, op, _LEDGER.teacher_id == teacher_id, _LEDGER.exam_semester_id == semester_id)
+        for teacher_id, semester_id in pairs
+    ]
+
+
+def _group_records(rows) -> Dict[str, List[Any]]:
+    """Records of ledger rows, grouped by activity type"""
+    details = empty_details()
+    for row in rows:
+        details[row.activity_type].append(_RECORD_BUILDERS[row.activity_type](row))
+    return details
+
+
+def _group_records_by(rows, group: str) -> Dict[Any, Dict[str, List[Any]]]:
+    """Records of ledger rows, grouped by the `group` column and then by activity type"""
+    result: Dict[Any, Dict[str, List[Any]]] = {}
+    for row in rows:
+        key = getattr(row, group)
+        details = result.get(key)
+        if details is None:
+            details = result[key] = empty_details()
+        details[row.activity_type].append(_RECORD_BUILDERS[row.activity_type](row))
+    return result
+
+def empty_details() -> Dict[str, List[Any]]:
+    """Rows per activity type of a teacher without activity"""
+    return {activity: [] for activity in ACTIVITY_MODELS}
+
+
+def ledger_semester_counts():
+    """Per semester: teachers with activity and activity rows, straight from the ledger"""
+    ledger = models.RemunerationActivity
+    return select(
+        ledger.exam_semester_id,
+        func.count(func.distinct(ledger.teacher_id)),
+        func.count()
+    ).group_by(ledger.exam_semester_id)
+
+
+def priced_activities(semester_id: int, teacher_ids=None):
+    """
+    The activity ledger rows of a semester (only `teacher_ids`' if given: a
+    sequence or a select of ids) with an `amount` column: the
+    row's quantity * rate / divisor, the rate looked up by activity type and
+    variant. A variant without a rate of its own uses the activity's "*"
+    rate. Rates the semester's own schedule doesn't list come from the
+    default schedule, the same way. Unpriceable rows (a moderation without
+    team members) have a NULL amount, which SUM skips.
+    """
+    activity_type = _LEDGER.activity_type
+    has_pages = func.coalesce(_LEDGER.page_count, 0) != 0
+    variant = case(
+        (activity_type == "question_preparations", func.lower(_LEDGER.section_type)),
+        (activity_type == "script_evaluations", func.lower(_LEDGER.script_type)),
+        (activity_type == "other_remunerations", case((has_pages, literal("page")), else_=literal("fixed"))),
+        else_=literal("*")
+    )
+    quantity = case(
+        (activity_type == "question_preparations", literal(1.0)),
+        (activity_type == "question_moderations", cast(_LEDGER.question_count, Float)),
+        (activity_type == "script_evaluations", cast(_LEDGER.script_count, Float)),
+        (activity_type == "practical_exams", cast(_LEDGER.student_count * _LEDGER.day_count, Float)),
+        (activity_type.in_(("viva_exams", "tabulations")), cast(_LEDGER.student_count, Float)),
+        (activity_type == "answer_sheet_reviews", cast(_LEDGER.answer_sheet_count, Float)),
+        (activity_type == "other_remunerations", case((has_pages, cast(_LEDGER.page_count, Float)), else_=literal(1.0))),
+        else_=literal(0.0)
+    )
+    divisor = case(
+        (activity_type != "question_moderations", literal(1.0)),
+        (_LEDGER.team_member_count > 0, cast(_LEDGER.team_member_count, Float)),
+        else_=None
+    )
+    # Lookup order: semester exact, semester "*", default exact, default "*"
+    lookups = [
+        (aliased(models.RateScheduleRate), schedule_id, rate_variant)
+        for schedule_id in (effective_schedule_id(semester_id), effective_schedule_id(None))
+        for rate_variant in (variant, literal("*"))
+    ]
+    rate = func.coalesce(*(rates.rate for rates, _, _ in lookups), 0.0)
+    stmt = select(*_LEDGER_COLUMNS, (quantity * rate / divisor).label("amount"))
+    for rates, schedule_id, rate_variant in lookups:
+        stmt = stmt.outerjoin(rates, and_(
+            rates.schedule_id == schedule_id,
+            rates.activity_type == activity_type,
+            rates.variant == rate_variant
+        ))
+    stmt = stmt.where(_LEDGER.exam_semester_id == semester_id)
+    if teacher_ids is not None:
+        stmt = stmt.where(_LEDGER.teacher_id.in_(teacher_ids))
+    return stmt
+
+
+def semester_totals(semester_id: int, teacher_ids: Optional[Sequence[str]] = None):
+    """Total remuneration per teacher for a semester in one GROUP BY over the priced activity ledger"""
+    priced = priced_activities(semester_id, teacher_ids).subquery("priced")
+    return select(
+        priced.c.teacher_id,
+        func.coalesce(func.sum(priced.c.amount), 0.0).label("total_amount")
+    ).group_by(priced.c.teacher_id)
 
 class RemunerationRepository:
     """Repository for handling remuneration-related operations"""
     
     def __init__(self, db: Session):
         self.db = db
+        # Semesters written in the current transaction; their data version is bumped on commit
+        self._touched_semesters: Set[int] = set()
+        # (teacher, semester) pairs given new rows; their rows are change-logged on commit
+        self._touched_activities: Set[Tuple[str, int]] = set()
     
     def delete_teacher_semester_data(self, teacher_id: str, semester_id: int) -> None:
         """Delete all remuneration data for a teacher in a specific semester"""
-        models_to_clean = [
-            models.QuestionPreparation,
-            models.QuestionModeration,
-            models.ScriptEvaluation,
-            models.PracticalExam,
-            models.VivaExam,
-            models.Tabulation,
-            models.AnswerSheetReview,
-            models.OtherRemuneration
-        ]
-        
-        for model in models_to_clean:
-            self.db.query(model).filter(
+        self._touched_semesters.add(semester_id)
+        for statement in _teacher_semester_changes(models.CHANGE_DELETE, [(teacher_id, semester_id)]):
+            self.db.execute(statement)
+        self.db.execute(
+            delete(_LEDGER).where(
                 and_(
-                    model.teacher_id == teacher_id,
-                    model.exam_semester_id == semester_id
+                    _LEDGER.teacher_id == teacher_id,
+                    _LEDGER.exam_semester_id == semester_id
                 )
-            ).delete()
+            )
+        )
+    
+    def _insert_activities(self, model, teacher_id: str, semester_id: int, items: List[Any]) -> None:
+        """Insert one activity type's rows in a single executemany"""
+        self._touched_semesters.add(semester_id)
+        if items:
+            self._touched_activities.add((teacher_id, semester_id))
+            self.db.execute(insert(model), [
+                dict(teacher_id=teacher_id, exam_semester_id=semester_id, **item.dict())
+                for item in items
+            ])
     
     def save_question_preparations(
         self, teacher_id: str, semester_id: int, 
         items: List[schemas.QuestionPreparationData]
     ) -> None:
-        for item in items:
-            db_item = models.QuestionPreparation(
-                teacher_id=teacher_id,
-                exam_semester_id=semester_id,
-                **item.dict()
-            )
-            self.db.add(db_item)
+        self._insert_activities(models.QuestionPreparation, teacher_id, semester_id, items)
     
     def save_question_moderations(
         self, teacher_id: str, semester_id: int,
         items: List[schemas.QuestionModerationData]
     ) -> None:
-        for item in items:
-            db_item = models.QuestionModeration(
-                teacher_id=teacher_id,
-                exam_semester_id=semester_id,
-                **item.dict()
-            )
-            self.db.add(db_item)
+        self._insert_activities(models.QuestionModeration, teacher_id, semester_id, items)
     
     def save_script_evaluations(
         self, teacher_id: str, semester_id: int,
         items: List[schemas.ScriptEvaluationData]
     ) -> None:
-        for item in items:
-            db_item = models.ScriptEvaluation(
-                teacher_id=teacher_id,
-                exam_semester_id=semester_id,
-                **item.dict()
-            )
-            self.db.add(db_item)
+        self._insert_activities(models.ScriptEvaluation, teacher_id, semester_id, items)
     
     def save_practical_exams(
         self, teacher_id: str, semester_id: int,
         items: List[schemas.PracticalExamData]
     ) -> None:
-        for item in items:
-            db_item = models.PracticalExam(
-                teacher_id=teacher_id,
-                exam_semester_id=semester_id,
-                **item.dict()
-            )
-            self.db.add(db_item)
+        self._insert_activities(models.PracticalExam, teacher_id, semester_id, items)
     
     def save_viva_exams(
         self, teacher_id: str, semester_id: int,
         items: List[schemas.VivaExamData]
     ) -> None:
-        for item in items:
-            db_item = models.VivaExam(
-                teacher_id=teacher_id,
-                exam_semester_id=semester_id,
-                **item.dict()
-            )
-            self.db.add(db_item)
+        self._insert_activities(models.VivaExam, teacher_id, semester_id, items)
     
     def save_tabulations(
         self, teacher_id: str, semester_id: int,
         items: List[schemas.TabulationData]
     ) -> None:
-        for item in items:
-            db_item = models.Tabulation(
-                teacher_id=teacher_id,
-                exam_semester_id=semester_id,
-                **item.dict()
-            )
-            self.db.add(db_item)
+        self._insert_activities(models.Tabulation, teacher_id, semester_id, items)
     
     def save_answer_sheet_reviews(
         self, teacher_id: str, semester_id: int,
         items: List[schemas.AnswerSheetReviewData]
     ) -> None:
-        for item in items:
-            db_item = models.AnswerSheetReview(
-                teacher_id=teacher_id,
-                exam_semester_id=semester_id,
-                **item.dict()
-            )
-            self.db.add(db_item)
+        self._insert_activities(models.AnswerSheetReview, teacher_id, semester_id, items)
     
     def save_other_remunerations(
         self, teacher_id: str, semester_id: int,
         items: List[schemas.OtherRemunerationData]
     ) -> None:
-        for item in items:
-            db_item = models.OtherRemuneration(
-                teacher_id=teacher_id,
-                exam_semester_id=semester_id,
-                **item.dict()
-            )
-            self.db.add(db_item)
+        self._insert_activities(models.OtherRemuneration, teacher_id, semester_id, items)
     
     def get_teacher_remuneration(
         self, teacher_id: str, semester_id: int
     ) -> Dict[str, List[Any]]:
         """Get all remuneration data for a teacher in a specific semester"""
-        return {
-            "question_preparations": self.db.query(models.QuestionPreparation).filter(
-                and_(
-                    models.QuestionPreparation.teacher_id == teacher_id,
-                    models.QuestionPreparation.exam_semester_id == semester_id
-                )
-            ).all(),
-            "question_moderations": self.db.query(models.QuestionModeration).filter(
-                and_(
-                    models.QuestionModeration.teacher_id == teacher_id,
-                    models.QuestionModeration.exam_semester_id == semester_id
-                )
-            ).all(),
-            "script_evaluations": self.db.query(models.ScriptEvaluation).filter(
-                and_(
-                    models.ScriptEvaluation.teacher_id == teacher_id,
-                    models.ScriptEvaluation.exam_semester_id == semester_id
-                )
-            ).all(),
-            "practical_exams": self.db.query(models.PracticalExam).filter(
-                and_(
-                    models.PracticalExam.teacher_id == teacher_id,
-                    models.PracticalExam.exam_semester_id == semester_id
-                )
-            ).all(),
-            "viva_exams": self.db.query(models.VivaExam).filter(
-                and_(
-                    models.VivaExam.teacher_id == teacher_id,
-                    models.VivaExam.exam_semester_id == semester_id
-                )
-            ).all(),
-            "tabulations": self.db.query(models.Tabulation).filter(
-                and_(
-                    models.Tabulation.teacher_id == teacher_id,
-                    models.Tabulation.exam_semester_id == semester_id
-                )
-            ).all(),
-            "answer_sheet_reviews": self.db.query(models.AnswerSheetReview).filter(
-                and_(
-                    models.AnswerSheetReview.teacher_id == teacher_id,
-                    models.AnswerSheetReview.exam_semester_id == semester_id
-                )
-            ).all(),
-            "other_remunerations": self.db.query(models.OtherRemuneration).filter(
-                and_(
-                    models.OtherRemuneration.teacher_id == teacher_id,
-                    models.OtherRemuneration.exam_semester_id == semester_id
-                )
-            ).all(),
-        }
+        return _group_records(self.db.execute(_teacher_semester_rows(teacher_id, semester_id)))
+    
+    def get_semester_remuneration_by_teacher(
+        self, semester_id: int
+    ) -> Dict[str, Dict[str, List[Any]]]:
+        """Get all remuneration rows of a semester grouped by teacher id"""
+        rows = self.db.execute(
+            _ledger_rows(_LEDGER.exam_semester_id == semester_id).order_by(_LEDGER.teacher_id, _LEDGER.id)
+        )
+        return _group_records_by(rows, "teacher_id")
+    
+    def get_semester_totals(
+        self, semester_id: int, teacher_ids: Optional[Sequence[str]] = None
+    ) -> Dict[str, float]:
+        """Total remuneration per teacher id for a semester, computed in SQL"""
+        result = self.db.execute(semester_totals(semester_id, teacher_ids))
+        return {row.teacher_id: row.total_amount for row in result}
     
     def get_teachers_with_semester_activity(
         self, semester_id: int
-    ) -> List[models.Teacher]:
+    ) -> List[schemas.Teacher]:
         """Get all teachers who have submitted remuneration for a semester"""
-        return self.db.query(models.Teacher).outerjoin(
-            models.QuestionPreparation,
-            models.Teacher.id == models.QuestionPreparation.teacher_id
-        ).outerjoin(
-            models.QuestionModeration,
-            models.Teacher.id == models.QuestionModeration.teacher_id
-        ).outerjoin(
-            models.ScriptEvaluation,
-            models.Teacher.id == models.ScriptEvaluation.teacher_id
-        ).outerjoin(
-            models.PracticalExam,
-            models.Teacher.id == models.PracticalExam.teacher_id
-        ).outerjoin(
-            models.VivaExam,
-            models.Teacher.id == models.VivaExam.teacher_id
-        ).outerjoin(
-            models.Tabulation,
-            models.Teacher.id == models.Tabulation.teacher_id
-        ).outerjoin(
-            models.AnswerSheetReview,
-            models.Teacher.id == models.AnswerSheetReview.teacher_id
-        ).outerjoin(
-            models.OtherRemuneration,
-            models.Teacher.id == models.OtherRemuneration.teacher_id
-        ).filter(
-            (models.QuestionPreparation.exam_semester_id == semester_id) |
-            (models.QuestionModeration.exam_semester_id == semester_id) |
-            (models.ScriptEvaluation.exam_semester_id == semester_id) |
-            (models.PracticalExam.exam_semester_id == semester_id) |
-            (models.VivaExam.exam_semester_id == semester_id) |
-            (models.Tabulation.exam_semester_id == semester_id) |
-            (models.AnswerSheetReview.exam_semester_id == semester_id) |
-            (models.OtherRemuneration.exam_semester_id == semester_id)
-        ).distinct(models.Teacher.id).all()
+        result = self.db.execute(_teachers_with_semester_activity(semester_id))
+        return [_build(schemas.Teacher, row) for row in result]
     
     def get_semesters_with_teacher_activity(
         self, teacher_id: str
     ) -> List[models.ExamSemester]:
         """Get all semesters where a teacher has submitted remuneration"""
-        return self.db.query(models.ExamSemester).outerjoin(
-            models.QuestionPreparation,
-            models.ExamSemester.id == models.QuestionPreparation.exam_semester_id
-        ).outerjoin(
-            models.QuestionModeration,
-            models.ExamSemester.id == models.QuestionModeration.exam_semester_id
-        ).outerjoin(
-            models.ScriptEvaluation,
-            models.ExamSemester.id == models.ScriptEvaluation.exam_semester_id
-        ).outerjoin(
-            models.PracticalExam,
-            models.ExamSemester.id == models.PracticalExam.exam_semester_id
-        ).outerjoin(
-            models.VivaExam,
-            models.ExamSemester.id == models.VivaExam.exam_semester_id
-        ).outerjoin(
-            models.Tabulation,
-            models.ExamSemester.id == models.Tabulation.exam_semester_id
-        ).outerjoin(
-            models.AnswerSheetReview,
-            models.ExamSemester.id == models.AnswerSheetReview.exam_semester_id
-        ).outerjoin(
-            models.OtherRemuneration,
-            models.ExamSemester.id == models.OtherRemuneration.exam_semester_id
-        ).filter(
-            (models.QuestionPreparation.teacher_id == teacher_id) |
-            (models.QuestionModeration.teacher_id == teacher_id) |
-            (models.ScriptEvaluation.teacher_id == teacher_id) |
-            (models.PracticalExam.teacher_id == teacher_id) |
-            (models.VivaExam.teacher_id == teacher_id) |
-            (models.Tabulation.teacher_id == teacher_id) |
-            (models.AnswerSheetReview.teacher_id == teacher_id) |
-            (models.OtherRemuneration.teacher_id == teacher_id)
-        ).distinct(models.ExamSemester.id).all()
+        return self.db.query(models.ExamSemester).filter(
+            _semesters_with_teacher_activity(teacher_id)
+        ).all()
+    
+    def get_teacher_remuneration_by_semester(
+        self, teacher_id: str, from_year: Optional[int] = None, to_year: Optional[int] = None
+    ) -> Dict[int, Dict[str, List[Any]]]:
+        """Get all remuneration rows of a teacher (in the year range, if given) grouped by semester id"""
+        return _group_records_by(self.db.execute(_teacher_rows(teacher_id, from_year, to_year)), "exam_semester_id")
+    
+    def get_teacher_semesters(
+        self, teacher_id: str, from_year: Optional[int] = None, to_year: Optional[int] = None
+    ) -> List[schemas.SemesterSummary]:
+        """Semesters in the year range where a teacher has activity, by year"""
+        result = self.db.execute(_teacher_semesters(teacher_id, from_year, to_year))
+        return [_build(schemas.SemesterSummary, row) for row in result]
     
     def commit(self) -> None:
-        """Commit the current transaction"""
+        """
+        Change-log the rows written, commit the current transaction and bump
+        the data version of the semesters it wrote
+        """
+        self.db.flush()
+        for statement in _teacher_semester_changes(models.CHANGE_UPSERT, self._touched_activities):
+            self.db.execute(statement)
+        self._touched_activities = set()
         self.db.commit()
+        touched, self._touched_semesters = self._touched_semesters, set()
+        bump_semesters(touched)
+
+
+class AsyncRemunerationRepository:
+    """Async reads of remuneration data; writes go through RemunerationRepository and the write coordinator"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_teacher_remuneration(
+        self, teacher_id: str, semester_id: int
+    ) -> Dict[str, List[Any]]:
+        """Get all remuneration data for a teacher in a specific semester"""
+        return _group_records(await self.db.execute(_teacher_semester_rows(teacher_id, semester_id)))
+    
+    async def get_semester_remuneration_by_teacher(
+        self, semester_id: int, teacher_ids: Optional[Sequence[str]] = None
+    ) -> Dict[str, Dict[str, List[Any]]]:
+        """
+        Get all remuneration rows of a semester grouped by teacher id, in one
+        query. `teacher_ids` restricts the rows to those teachers.
+        """
+        stmt = _ledger_rows(_LEDGER.exam_semester_id == semester_id)
+        if teacher_ids is not None:
+            stmt = stmt.where(_LEDGER.teacher_id.in_(teacher_ids))
+        rows = await self.db.execute(stmt.order_by(_LEDGER.teacher_id, _LEDGER.id))
+        return _group_records_by(rows, "teacher_id")
+    
+    async def get_semester_totals(
+        self, semester_id: int, teacher_ids: Optional[Sequence[str]] = None
+    ) -> Dict[str, float]:
+        """Total remuneration per teacher id for a semester, computed in SQL"""
+        result = await self.db.execute(semester_totals(semester_id, teacher_ids))
+        return {row.teacher_id: row.total_amount for row in result}
+    
+    async def get_teacher_remuneration_by_semester(
+        self, teacher_id: str, from_year: Optional[int] = None, to_year: Optional[int] = None
+    ) -> Dict[int, Dict[str, List[Any]]]:
+        """Get all remuneration rows of a teacher (in the year range, if given) grouped by semester id"""
+        rows = await self.db.execute(_teacher_rows(teacher_id, from_year, to_year))
+        return _group_records_by(rows, "exam_semester_id")
+    
+    async def get_teacher_semesters(
+        self, teacher_id: str, from_year: Optional[int] = None, to_year: Optional[int] = None
+    ) -> List[schemas.SemesterSummary]:
+        """Semesters in the year range where a teacher has activity, by year"""
+        result = await self.db.execute(_teacher_semesters(teacher_id, from_year, to_year))
+        return [_build(schemas.SemesterSummary, row) for row in result]
+    
+    async def get_teachers_with_semester_activity(
+        self, semester_id: int
+    ) -> List[schemas.Teacher]:
+        """Get all teachers who have submitted remuneration for a semester"""
+        result = await self.db.execute(_teachers_with_semester_activity(semester_id))
+        return [_build(schemas.Teacher, row) for row in result]
+    
+    async def stream_teachers_with_semester_activity(
+        self, semester_id: int, batch_size: int
+    ) -> AsyncIterator[List[schemas.Teacher]]:
+        """
+        Teachers with activity in a semester, in id order, in batches of
+        `batch_size` fetched from a server-side cursor
+        """
+        stmt = _teachers_with_semester_activity(semester_id).order_by(models.Teacher.id)
+        result = await self.db.stream(stmt.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield [_build(schemas.Teacher, row) for row in partition]
+    
+    async def get_semesters_with_teacher_activity(
+        self, teacher_id: str
+    ) -> List[schemas.SemesterSummary]:
+        """Get all semesters where a teacher has submitted remuneration"""
+        stmt = select(*_SEMESTER_SUMMARY_COLUMNS).where(
+            _semesters_with_teacher_activity(teacher_id)
+        )
+        result = await self.db.execute(stmt)
+        return [_build(schemas.SemesterSummary, row) for row in result]
@@ -0,0 +1,127 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import DateTime, delete, func, insert, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+import models
+import schemas
+from repositories.remuneration_repository import ledger_semester_counts, priced_activities
+
+# Ledger quantities summed into each cube cell
+_QUANTITIES = ("question_count", "script_count", "student_count", "answer_sheet_count", "page_count")
+_MEASURES = ("activity_count",) + _QUANTITIES + ("amount",)
+
+# Dimensions a rollup can group by, and the column each groups on
+_rollup = models.RemunerationRollup
+ROLLUP_DIMENSIONS = {
+    "department": _rollup.department,
+    "year": models.ExamSemester.year,
+    "semester": _rollup.exam_semester_id,
+    "activity_type": _rollup.activity_type,
+}
+
+
+def _department_teachers(departments: Sequence[str]):
+    """Ids of the teachers in `departments` ("" stands for no department)"""
+    teacher = models.Teacher
+    in_departments = teacher.department.in_(departments)
+    if "" in departments:
+        in_departments = or_(in_departments, teacher.department.is_(None))
+    return select(teacher.id).where(in_departments)
+
+
+def _cells(semester_id: int, departments: Optional[Sequence[str]] = None):
+    """
+    Cube cells of a semester computed from the priced activity ledger; only
+    `departments`' cells, from their teachers' rows alone, if given
+    """
+    teacher_ids = _department_teachers(departments) if departments is not None else None
+    priced = priced_activities(semester_id, teacher_ids).subquery("priced")
+    department = func.coalesce(models.Teacher.department, "")
+    stmt = (
+        select(
+            department.label("department"),
+            literal(semester_id).label("exam_semester_id"),
+            priced.c.activity_type,
+            func.count().label("activity_count"),
+            *(func.coalesce(func.sum(priced.c[name]), 0).label(name) for name in _QUANTITIES),
+            func.coalesce(func.sum(priced.c.amount), 0.0).label("amount"),
+            literal(datetime.utcnow(), DateTime).label("updated_at"),
+        )
+        .select_from(priced)
+        .join(models.Teacher, models.Teacher.id == priced.c.teacher_id)
+        .group_by(department, priced.c.activity_type)
+    )
+    return stmt
+
+
+class RollupRepository:
+    """
+    Repository for the analytics cube (models.RemunerationRollup). Writers
+    call refresh() for the semester and departments they changed before
+    committing, so the cube commits with them.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def refresh(self, semester_id: int, departments: Optional[Sequence[str]] = None) -> None:
+        """Recompute a semester's cells (only `departments`' if given) in the current transaction"""
+        self.db.flush()
+        stale = delete(_rollup).where(_rollup.exam_semester_id == semester_id)
+        if departments is not None:
+            stale = stale.where(_rollup.department.in_(departments))
+        self.db.execute(stale)
+        cells = _cells(semester_id, departments)
+        self.db.execute(insert(_rollup).from_select([column.name for column in cells.selected_columns], cells))
+
+    def rebuild(self, semester_ids: Sequence[int]) -> None:
+        """Recompute the whole cube from the given semesters' activity"""
+        self.db.execute(delete(_rollup))
+        for semester_id in semester_ids:
+            self.refresh(semester_id)
+
+    def get_drifted_semesters(self) -> List[int]:
+        """Semesters whose cells disagree with the activity ledger on the number of activity rows"""
+        counted = self.db.execute(
+            select(_rollup.exam_semester_id, func.sum(_rollup.activity_count)).group_by(_rollup.exam_semester_id)
+        )
+        cube = dict(counted.all())
+        ledger = {semester_id: activities for semester_id, _, activities in self.db.execute(ledger_semester_counts())}
+        return sorted(
+            semester_id for semester_id in cube.keys() | ledger.keys()
+            if semester_id is not None and cube.get(semester_id) != ledger.get(semester_id)
+        )
+
+
+class AsyncRollupRepository:
+    """Async reads of the analytics cube"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def rollup(
+        self, group_by: Sequence[str], filters: Dict[str, object]
+    ) -> List[schemas.RollupEntry]:
+        """
+        Sum the cube's cells into one row per combination of the `group_by`
+        dimensions, keeping only cells that match `filters` (dimension ->
+        value, both keyed as in ROLLUP_DIMENSIONS)
+        """
+        labels = {"semester": "exam_semester_id"}
+        groups = [ROLLUP_DIMENSIONS[name].label(labels.get(name, name)) for name in group_by]
+        stmt = select(*groups, *(func.sum(getattr(_rollup, name)).label(name) for name in _MEASURES))
+        stmt = stmt.select_from(_rollup)
+        if "year" in group_by or "year" in filters:
+            stmt = stmt.join(models.ExamSemester, models.ExamSemester.id == _rollup.exam_semester_id)
+        for name, value in filters.items():
+            stmt = stmt.where(ROLLUP_DIMENSIONS[name] == value)
+        if groups:
+            stmt = stmt.group_by(*(ROLLUP_DIMENSIONS[name] for name in group_by))
+            stmt = stmt.order_by(*(ROLLUP_DIMENSIONS[name] for name in group_by))
+        result = await self.db.execute(stmt)
+        return [
+            schemas.RollupEntry.model_construct(**row._mapping)
+            for row in result
+            if row.activity_count is not None
+        ]
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+import models
+
+_tickets = models.StreamTicket
+
+
+class StreamTicketRepository:
+    """Repository for event stream tickets (models.StreamTicket)"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def save(self, record: models.StreamTicket, now: datetime) -> None:
+        """Store a ticket, dropping expired ones"""
+        self.db.execute(delete(_tickets).where(_tickets.expires_at <= now))
+        self.db.add(record)
+        self.db.flush()
+
+    def consume(self, ticket_hash: str, now: datetime) -> Optional[str]:
+        """Delete an unexpired ticket; returns its username, None if it was not there (or already used)"""
+        username = self.db.execute(
+            select(_tickets.username).where(_tickets.ticket_hash == ticket_hash, _tickets.expires_at > now)
+        ).scalar()
+        if username is None:
+            return None
+        deleted = self.db.execute(delete(_tickets).where(_tickets.ticket_hash == ticket_hash)).rowcount
+        return username if deleted else None
+
+    def commit(self) -> None:
+        self.db.commit()
@@ -0,0 +1,233 @@
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+from sqlalchemy import DateTime, case, delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+import models
+import schemas
+from repositories.remuneration_repository import ledger_semester_counts, semester_totals
+
+# Summary count column per activity table
+SUMMARY_COUNT_COLUMNS = {
+    "question_preparations": "question_preparation_count",
+    "question_moderations": "question_moderation_count",
+    "script_evaluations": "script_evaluation_count",
+    "practical_exams": "practical_exam_count",
+    "viva_exams": "viva_exam_count",
+    "tabulations": "tabulation_count",
+    "answer_sheet_reviews": "answer_sheet_review_count",
+    "other_remunerations": "other_remuneration_count",
+}
+
+# Quantities summed into the summary. Each is a column of the activity
+# ledger that only the activity types carrying it fill in
+_SUM_COLUMNS = ("script_count", "student_count", "answer_sheet_count")
+
+_SUMMARY_COLUMNS = tuple(
+    column for column in models.RemunerationSummary.__table__.columns
+    if column.name not in ("teacher_id", "updated_at")
+)
+
+
+def _summary_rows(semester_id: int, teacher_ids: Optional[Sequence[str]] = None):
+    """
+    Summary rows of a semester computed from the activity ledger: one
+    GROUP BY for the counts and sums, joined to the semester's totals
+    (semester_totals)
+    """
+    ledger = models.RemunerationActivity
+    grouped = select(
+        ledger.teacher_id,
+        *(
+            func.sum(case((ledger.activity_type == key, 1), else_=0)).label(column)
+            for key, column in SUMMARY_COUNT_COLUMNS.items()
+        ),
+        *(func.coalesce(func.sum(getattr(ledger, name)), 0).label(name) for name in _SUM_COLUMNS),
+    ).where(ledger.exam_semester_id == semester_id)
+    if teacher_ids is not None:
+        grouped = grouped.where(ledger.teacher_id.in_(teacher_ids))
+    grouped = grouped.group_by(ledger.teacher_id).subquery("grouped")
+    totals = semester_totals(semester_id, teacher_ids).subquery("totals")
+
+    return select(
+        grouped.c.teacher_id,
+        literal(semester_id).label("exam_semester_id"),
+        *(grouped.c[column] for column in SUMMARY_COUNT_COLUMNS.values()),
+        *(grouped.c[name] for name in _SUM_COLUMNS),
+        func.coalesce(totals.c.total_amount, 0.0).label("total_amount"),
+        literal(datetime.utcnow(), DateTime).label("updated_at"),
+    ).outerjoin(totals, totals.c.teacher_id == grouped.c.teacher_id)
+
+
+def _refresh_statements(semester_id: int, teacher_ids: Optional[Sequence[str]] = None):
+    summary = models.RemunerationSummary
+    stale = delete(summary).where(summary.exam_semester_id == semester_id)
+    if teacher_ids is not None:
+        stale = stale.where(summary.teacher_id.in_(teacher_ids))
+    rows = _summary_rows(semester_id, teacher_ids)
+    fresh = insert(summary).from_select([column.name for column in rows.selected_columns], rows)
+    return stale, fresh
+
+
+def _semester_summaries(semester_id: int):
+    summary = models.RemunerationSummary
+    return (
+        select(*models.Teacher.__table__.columns, *_SUMMARY_COLUMNS)
+        .select_from(summary)
+        .join(models.Teacher, models.Teacher.id == summary.teacher_id)
+        .where(summary.exam_semester_id == semester_id)
+        .order_by(summary.teacher_id)
+    )
+
+
+_INDEX_SEMESTER_COLUMNS = (
+    models.ExamSemester.id,
+    models.ExamSemester.semester_name.label("name"),
+    models.ExamSemester.year,
+    models.ExamSemester.exam_start_date,
+    models.ExamSemester.exam_end_date,
+    models.ExamSemester.result_publish_date,
+)
+
+
+def _teacher_semester_index(teacher_id: str):
+    """A teacher's summaries with their semesters, oldest first"""
+    summary = models.RemunerationSummary
+    return (
+        select(*_INDEX_SEMESTER_COLUMNS, *_SUMMARY_COLUMNS)
+        .select_from(summary)
+        .join(models.ExamSemester, models.ExamSemester.id == summary.exam_semester_id)
+        .where(summary.teacher_id == teacher_id)
+        .order_by(models.ExamSemester.year, models.ExamSemester.id)
+    )
+
+
+def _build_index_entry(teacher_id: str, row) -> schemas.TeacherSemesterIndexEntry:
+    values = row._mapping
+    return schemas.TeacherSemesterIndexEntry.model_construct(
+        semester=schemas.SemesterSummary.model_construct(
+            **{column.key: values[column.key] for column in _INDEX_SEMESTER_COLUMNS}
+        ),
+        summary=schemas.RemunerationSummary.model_construct(
+            teacher_id=teacher_id,
+            **{column.name: values[column.name] for column in _SUMMARY_COLUMNS}
+        )
+    )
+
+
+def _teacher_totals(teacher_id: str, semester_ids: Sequence[int]):
+    summary = models.RemunerationSummary
+    return select(summary.exam_semester_id, summary.total_amount).where(
+        summary.teacher_id == teacher_id,
+        summary.exam_semester_id.in_(semester_ids)
+    )
+
+
+def _build_entry(row) -> schemas.TeacherSummaryEntry:
+    values = row._mapping
+    return schemas.TeacherSummaryEntry.model_construct(
+        teacher=schemas.Teacher.model_construct(
+            **{column.name: values[column.name] for column in models.Teacher.__table__.columns}
+        ),
+        summary=schemas.RemunerationSummary.model_construct(
+            teacher_id=values["id"],
+            **{column.name: values[column.name] for column in _SUMMARY_COLUMNS}
+        )
+    )
+
+
+class SummaryRepository:
+    """
+    Repository for the materialized per teacher per semester summaries
+    (models.RemunerationSummary). Writers call refresh() for the teachers and
+    semesters they changed before committing, so the summary commits with them.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def refresh(self, semester_id: int, teacher_ids: Optional[Sequence[str]] = None) -> None:
+        """Recompute a semester's summaries (only `teacher_ids`' if given) in the current transaction"""
+        # Pending activity rows must be visible to the aggregate
+        self.db.flush()
+        for statement in _refresh_statements(semester_id, teacher_ids):
+            self.db.execute(statement)
+
+    def rebuild(self) -> List[int]:
+        """Recompute every summary from the activity tables; returns the semesters rebuilt"""
+        self.db.execute(delete(models.RemunerationSummary))
+        semester_ids = self.get_semesters_with_activity()
+        for semester_id in semester_ids:
+            self.refresh(semester_id)
+        return semester_ids
+
+    def get_semesters_with_activity(self) -> List[int]:
+        stmt = select(models.RemunerationActivity.exam_semester_id).distinct()
+        return [semester_id for semester_id in self.db.execute(stmt).scalars() if semester_id is not None]
+
+    def get_drifted_semesters(self) -> List[int]:
+        """
+        Semesters whose summaries disagree with the activity ledger on the
+        number of teachers or activity rows, e.g. after ledger rows were
+        changed outside the write paths
+        """
+        summary = models.RemunerationSummary
+        counted = self.db.execute(
+            select(
+                summary.exam_semester_id,
+                func.count(),
+                func.sum(sum(getattr(summary, column) for column in SUMMARY_COUNT_COLUMNS.values()))
+            ).group_by(summary.exam_semester_id)
+        )
+        summarized = {semester_id: (teachers, activities) for semester_id, teachers, activities in counted}
+        ledger = {semester_id: (teachers, activities) for semester_id, teachers, activities in self.db.execute(ledger_semester_counts())}
+        return sorted(
+            semester_id for semester_id in summarized.keys() | ledger.keys()
+            if semester_id is not None and summarized.get(semester_id) != ledger.get(semester_id)
+        )
+
+    def get_semester_summaries(self, semester_id: int) -> List[schemas.TeacherSummaryEntry]:
+        """Summaries of a semester with their teachers, in teacher id order"""
+        return [_build_entry(row) for row in self.db.execute(_semester_summaries(semester_id))]
+
+    def get_teacher_totals(self, teacher_id: str, semester_ids: Sequence[int]) -> Dict[int, float]:
+        """A teacher's total per semester id, for the given semesters"""
+        result = self.db.execute(_teacher_totals(teacher_id, semester_ids))
+        return {row.exam_semester_id: row.total_amount for row in result}
+
+
+class AsyncSummaryRepository:
+    """Async reads of the materialized summaries"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_semester_summaries(self, semester_id: int) -> List[schemas.TeacherSummaryEntry]:
+        """Summaries of a semester with their teachers, in teacher id order"""
+        result = await self.db.execute(_semester_summaries(semester_id))
+        return [_build_entry(row) for row in result]
+
+    async def stream_semester_summaries(
+        self, semester_id: int, batch_size: int
+    ) -> AsyncIterator[List[schemas.TeacherSummaryEntry]]:
+        """Summaries of a semester in teacher id order, in batches from a server-side cursor"""
+        stmt = _semester_summaries(semester_id).execution_options(yield_per=batch_size)
+        result = await self.db.stream(stmt)
+        async for partition in result.partitions():
+            yield [_build_entry(row) for row in partition]
+
+    async def get_teacher_totals(self, teacher_id: str, semester_ids: Sequence[int]) -> Dict[int, float]:
+        """A teacher's total per semester id, for the given semesters"""
+        result = await self.db.execute(_teacher_totals(teacher_id, semester_ids))
+        return {row.exam_semester_id: row.total_amount for row in result}
+
+    async def get_teacher_semester_ids(self, teacher_id: str) -> List[int]:
+        """Ids of the semesters a teacher has a summary (i.e. activity) in"""
+        summary = models.RemunerationSummary
+        result = await self.db.execute(select(summary.exam_semester_id).where(summary.teacher_id == teacher_id))
+        return list(result.scalars())
+
+    async def get_teacher_semester_index(self, teacher_id: str) -> List[schemas.TeacherSemesterIndexEntry]:
+        """A teacher's per semester counts and totals, oldest semester first"""
+        result = await self.db.execute(_teacher_semester_index(teacher_id))
+        return [_build_index_entry(teacher_id, row) for row in result]
@@ -1,12 +1,16 @@
 from typing import List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from repositories.base import BaseRepository
+from repositories.base import AsyncBaseRepository, BaseRepository
 import models
 import schemas
 
 class TeacherRepository(BaseRepository[models.Teacher]):
     """Repository for Teacher entity operations"""
     
+    filter_fields = ("department", "designation")
+    
     def __init__(self, db: Session):
         super().__init__(db)
         self.model = models.Teacher
@@ -53,4 +57,63 @@ class TeacherRepository(BaseRepository[models.Teacher]):
         """Check if teacher exists"""
         return self.db.query(self.model).filter(
             self.model.id == teacher_id
-        ).count() > 0
\ No newline at end of file
+        ).count() > 0
+
+
+class AsyncTeacherRepository(AsyncBaseRepository[models.Teacher]):
+    """Async repository for Teacher entity operations"""
+    
+    filter_fields = ("department", "designation")
+    
+    def __init__(self, db: AsyncSession):
+        super().__init__(db)
+        self.model = models.Teacher
+    
+    async def get_by_id(self, teacher_id: str) -> Optional[models.Teacher]:
+        result = await self.db.execute(
+            select(self.model).where(self.model.id == teacher_id)
+        )
+        return result.scalars().first()
+    
+    async def get_by_name(self, teacher_name: str) -> Optional[models.Teacher]:
+        result = await self.db.execute(
+            select(self.model).where(self.model.name.contains(teacher_name))
+        )
+        return result.scalars().first()
+    
+    async def get_all(self) -> List[models.Teacher]:
+        result = await self.db.execute(select(self.model))
+        return list(result.scalars().all())
+    
+    async def create(self, teacher_data: schemas.TeacherCreate) -> models.Teacher:
+        db_teacher = self.model(**teacher_data.dict())
+        self.db.add(db_teacher)
+        await self.db.commit()
+        await self.db.refresh(db_teacher)
+        return db_teacher
+    
+    async def update(self, teacher: models.Teacher) -> models.Teacher:
+        await self.db.commit()
+        await self.db.refresh(teacher)
+        return teacher
+    
+    async def delete(self, teacher_id: str) -> bool:
+        teacher = await self.get_by_id(teacher_id)
+        if teacher:
+            await self.db.delete(teacher)
+            await self.db.commit()
+            return True
+        return False
+    
+    async def get_by_department(self, department: str) -> List[models.Teacher]:
+        result = await self.db.execute(
+            select(self.model).where(self.model.department == department)
+        )
+        return list(result.scalars().all())
+    
+    async def exists(self, teacher_id: str) -> bool:
+        """Check if teacher exists"""
+        result = await self.db.execute(
+            select(func.count()).select_from(self.model).where(self.model.id == teacher_id)
+        )
+        return result.scalar_one() > 0
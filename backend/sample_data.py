@@ -1,20 +1,14 @@
 from sqlalchemy.orm import Session
 import models
+from repositories.change_log_repository import ChangeLogRepository
 from datetime import date
 
 def create_sample_data(db: Session):
-    # Clear existing data
-    db.query(models.QuestionPreparation).delete()
-    db.query(models.QuestionModeration).delete()
-    db.query(models.ScriptEvaluation).delete()
-    db.query(models.PracticalExam).delete()
-    db.query(models.VivaExam).delete()
-    db.query(models.Tabulation).delete()
-    db.query(models.AnswerSheetReview).delete()
-    db.query(models.OtherRemuneration).delete()
-    db.query(models.Course).delete()
-    db.query(models.ExamSemester).delete()
-    db.query(models.Teacher).delete()
+    # Clear existing data; bulk deletes skip the mapper events, so log the tombstones here
+    changes = ChangeLogRepository(db)
+    for model in (models.RemunerationActivity, models.Course, models.ExamSemester, models.Teacher):
+        changes.record(model, models.CHANGE_DELETE)
+        db.query(model).delete()
     
     # Create teachers
     teachers = [
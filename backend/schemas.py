@@ -1,6 +1,6 @@
 from datetime import datetime
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import date
 
 # Teacher schemas
@@ -97,6 +97,162 @@ class RemunerationSubmission(BaseModel):
     answer_sheet_reviews: List[AnswerSheetReviewData] = []
     other_remunerations: List[OtherRemunerationData] = []
 
+# Remuneration response schemas. Documentation only: they give the OpenAPI
+# docs the shape of the activity rows, but the endpoints return
+# FastJSONResponse with record rows (repositories/records.py), so FastAPI
+# never validates or serializes through them
+class ActivityRowKeys(BaseModel):
+    id: int
+    teacher_id: str
+    exam_semester_id: int
+
+class QuestionPreparationRow(QuestionPreparationData, ActivityRowKeys):
+    pass
+
+class QuestionModerationRow(QuestionModerationData, ActivityRowKeys):
+    pass
+
+class ScriptEvaluationRow(ScriptEvaluationData, ActivityRowKeys):
+    pass
+
+class PracticalExamRow(PracticalExamData, ActivityRowKeys):
+    pass
+
+class VivaExamRow(VivaExamData, ActivityRowKeys):
+    pass
+
+class TabulationRow(TabulationData, ActivityRowKeys):
+    pass
+
+class AnswerSheetReviewRow(AnswerSheetReviewData, ActivityRowKeys):
+    pass
+
+class OtherRemunerationRow(OtherRemunerationData, ActivityRowKeys):
+    pass
+
+class RemunerationDetails(BaseModel):
+    question_preparations: List[QuestionPreparationRow] = []
+    question_moderations: List[QuestionModerationRow] = []
+    script_evaluations: List[ScriptEvaluationRow] = []
+    practical_exams: List[PracticalExamRow] = []
+    viva_exams: List[VivaExamRow] = []
+    tabulations: List[TabulationRow] = []
+    answer_sheet_reviews: List[AnswerSheetReviewRow] = []
+    other_remunerations: List[OtherRemunerationRow] = []
+
+class SemesterSummary(BaseModel):
+    id: int
+    name: str
+    year: int
+    exam_start_date: Optional[date] = None
+    exam_end_date: Optional[date] = None
+    result_publish_date: Optional[date] = None
+
+class TeacherSemesterRemuneration(BaseModel):
+    semester: SemesterSummary
+    remunerations: RemunerationDetails
+
+# Multi-year statement: semesters grouped by year, oldest first
+class StatementSemester(BaseModel):
+    semester: SemesterSummary
+    total_amount: float
+    remunerations: RemunerationDetails
+
+class StatementYear(BaseModel):
+    year: int
+    total_amount: float
+    semesters: List[StatementSemester]
+
+class TeacherStatement(BaseModel):
+    teacher: Teacher
+    from_year: Optional[int] = None
+    to_year: Optional[int] = None
+    years: List[StatementYear]
+    total_amount: float
+
+class CumulativeReportEntry(BaseModel):
+    teacher: Teacher
+    details: RemunerationDetails
+    total_amount: float
+
+# Materialized per teacher per semester summary (models.RemunerationSummary)
+class RemunerationSummary(BaseModel):
+    teacher_id: str
+    exam_semester_id: int
+    question_preparation_count: int = 0
+    question_moderation_count: int = 0
+    script_evaluation_count: int = 0
+    practical_exam_count: int = 0
+    viva_exam_count: int = 0
+    tabulation_count: int = 0
+    answer_sheet_review_count: int = 0
+    other_remuneration_count: int = 0
+    script_count: int = 0
+    student_count: int = 0
+    answer_sheet_count: int = 0
+    total_amount: float = 0.0
+
+class TeacherSummaryEntry(BaseModel):
+    teacher: Teacher
+    summary: RemunerationSummary
+
+# Teacher dashboard index: counts and totals per semester, details fetched per semester
+class TeacherSemesterIndexEntry(BaseModel):
+    semester: SemesterSummary
+    summary: RemunerationSummary
+
+# Analytics rollup: one row per group; dimensions not grouped by are null
+class RollupEntry(BaseModel):
+    department: Optional[str] = None
+    year: Optional[int] = None
+    exam_semester_id: Optional[int] = None
+    activity_type: Optional[str] = None
+    activity_count: int = 0
+    question_count: int = 0
+    script_count: int = 0
+    student_count: int = 0
+    answer_sheet_count: int = 0
+    page_count: int = 0
+    amount: float = 0.0
+
+# Delta sync: changes of teachers, courses, semesters and activity rows after a seq
+class ChangeEntry(BaseModel):
+    seq: int
+    entity: str  # teachers / courses / exam_semesters / remuneration_activities
+    key: str  # primary key, as text
+    op: str  # upsert / delete
+    data: Optional[Dict[str, Any]] = None  # current row for upserts; None for tombstones
+
+class ChangeFeed(BaseModel):
+    changes: List[ChangeEntry]
+    next_since: int  # pass as ?since= to continue
+    has_more: bool
+
+class ChangeCursor(BaseModel):
+    since: int
+
+# Rate schedule schemas
+class RateEntry(BaseModel):
+    activity_type: str
+    variant: str = "*"
+    rate: float
+
+    class Config:
+        from_attributes = True
+
+class RateScheduleCreate(BaseModel):
+    rates: List[RateEntry]
+
+class RateSchedule(BaseModel):
+    id: int
+    exam_semester_id: Optional[int] = None
+    version: int
+    created_at: Optional[datetime] = None
+    rates: List[RateEntry]
+
+    class Config:
+        from_attributes = True
+
 class PDFExportRequest(BaseModel):
     teacher_id: str
     exam_semester_id: int
@@ -104,6 +260,11 @@ class PDFExportRequest(BaseModel):
 class CumulativeReportRequest(BaseModel):
     exam_semester_id: int
 
+class StatementPDFRequest(BaseModel):
+    teacher_id: str
+    from_year: Optional[int] = None
+    to_year: Optional[int] = None
+
 # Auth schemas
 class UserBase(BaseModel):
     username: str
@@ -129,6 +290,11 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     username: Optional[str] = None
 
+class StreamTicket(BaseModel):
+    """Single-use ticket for opening /api/v1/events (?ticket=...)"""
+    ticket: str
+    expires_at: datetime
+
 # Teacher Auth schemas
 class TeacherAuthCreate(BaseModel):
     teacher_id: str
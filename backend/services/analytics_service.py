@@ -0,0 +1,69 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
+import schemas
+from repositories.remuneration_repository import ACTIVITY_MODELS
+from repositories.rollup_repository import AsyncRollupRepository, ROLLUP_DIMENSIONS
+from services.base_service import AsyncBaseService
+from monitoring.server_timing import timed_stage
+from caching.conditional import make_etag
+from caching.report_cache import semester_versions
+
+# Rollup dimensions when the caller doesn't choose any
+DEFAULT_ROLLUP_GROUPS = ("department", "semester", "activity_type")
+
+class AsyncAnalyticsService(AsyncBaseService):
+    """
+    Service layer for remuneration analytics, answered from the
+    department x semester x activity type rollup (models.RemunerationRollup)
+    rather than the activity ledger.
+    """
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db)
+        self.rollup_repo = AsyncRollupRepository(db)
+
+    @timed_stage("analytics-rollup")
+    async def get_rollup(
+        self,
+        group_by: Optional[List[str]] = None,
+        department: Optional[str] = None,
+        year: Optional[int] = None,
+        semester_id: Optional[int] = None,
+        activity_type: Optional[str] = None
+    ) -> List[schemas.RollupEntry]:
+        """
+        Counts, quantity sums and amounts per combination of the `group_by`
+        dimensions (department, year, semester, activity_type), over the
+        cells matching the given filters. Raises ValueError on an unknown
+        dimension or activity type.
+        """
+        group_by = self._validate_groups(group_by)
+        if activity_type is not None and activity_type not in ACTIVITY_MODELS:
+            raise ValueError(f"Unknown activity type: {activity_type}")
+        filters: Dict[str, object] = {
+            name: value
+            for name, value in (
+                ("department", department),
+                ("year", year),
+                ("semester", semester_id),
+                ("activity_type", activity_type),
+            )
+            if value is not None
+        }
+        return await self.rollup_repo.rollup(group_by, filters)
+
+    def get_rollup_etag(self, *params) -> str:
+        """ETag of a rollup query; the rollup changes only with semester data"""
+        return make_etag("rollup", *params, semester_versions())
+
+    def _validate_groups(self, group_by: Optional[List[str]]) -> List[str]:
+        if group_by is None:
+            return list(DEFAULT_ROLLUP_GROUPS)
+        unknown = [name for name in group_by if name not in ROLLUP_DIMENSIONS]
+        if unknown:
+            raise ValueError(
+                f"Unknown group_by dimension(s): {', '.join(unknown)}; "
+                f"expected any of {', '.join(ROLLUP_DIMENSIONS)}"
+            )
+        # Repeated dimensions would only repeat columns
+        return list(dict.fromkeys(group_by))
@@ -1,4 +1,5 @@
 from abc import ABC
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 class BaseService(ABC):
@@ -11,4 +12,11 @@ class BaseService(ABC):
         """Common validation method"""
         if not entity:
             raise ValueError(f"{entity_name} with id {entity_id} not found")
-        return entity
\ No newline at end of file
+        return entity
+
+
+class AsyncBaseService(BaseService):
+    """Base class for services running on the asyncio session"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
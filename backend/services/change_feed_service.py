@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+import os
+from typing import Optional
+import schemas
+from repositories.change_log_repository import AsyncChangeLogRepository, ChangeLogRepository
+from services.base_service import AsyncBaseService, BaseService
+
+# Change log entries older than this are pruned on startup; clients further behind resync fully
+CHANGE_LOG_RETENTION_DAYS = int(os.getenv("CHANGE_LOG_RETENTION_DAYS", "30"))
+# Log entries read per changes page
+CHANGES_PAGE_SIZE = int(os.getenv("CHANGES_PAGE_SIZE", "500"))
+MAX_CHANGES_PAGE_SIZE = 5000
+
+
+class ChangesExpiredError(ValueError):
+    """The requested cursor is older than the retained change log"""
+
+
+class ChangeFeedService(BaseService):
+    """Maintenance of the change log behind the delta sync feed"""
+
+    def __init__(self, db: Session):
+        super().__init__(db)
+        self.change_repo = ChangeLogRepository(db)
+
+    def prune_change_log(self) -> int:
+        """Drop entries older than CHANGE_LOG_RETENTION_DAYS; returns how many"""
+        pruned = self.change_repo.prune(datetime.utcnow() - timedelta(days=CHANGE_LOG_RETENTION_DAYS))
+        self.db.commit()
+        return pruned
+
+
+class AsyncChangeFeedService(AsyncBaseService):
+    """
+    Delta sync of teachers, courses, semesters and activity rows. A client
+    takes a cursor (get_cursor), loads the collections, then polls
+    get_changes from that cursor to apply upserts and tombstones.
+    """
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db)
+        self.change_repo = AsyncChangeLogRepository(db)
+
+    async def get_cursor(self) -> schemas.ChangeCursor:
+        """Cursor at the latest logged change"""
+        _, latest = await self.change_repo.get_bounds()
+        return schemas.ChangeCursor(since=latest or 0)
+
+    async def get_changes(self, since: int, limit: Optional[int] = None) -> schemas.ChangeFeed:
+        """
+        Changes after the `since` cursor. Raises ChangesExpiredError if
+        entries after `since` were pruned (the client must resync fully),
+        ValueError on invalid arguments.
+        """
+        if since < 0:
+            raise ValueError("since must not be negative")
+        limit = limit or CHANGES_PAGE_SIZE
+        if not 1 <= limit <= MAX_CHANGES_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_CHANGES_PAGE_SIZE}")
+        oldest, _ = await self.change_repo.get_bounds()
+        if oldest is not None and since < oldest - 1:
+            raise ChangesExpiredError(f"Changes after {since} are no longer available; resync fully")
+        changes, next_since, has_more = await self.change_repo.get_changes(since, limit)
+        return schemas.ChangeFeed.model_construct(changes=changes, next_since=next_since, has_more=has_more)
@@ -1,8 +1,10 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import schemas
-from repositories.course_repository import CourseRepository
-from services.base_service import BaseService
+from repositories.course_repository import AsyncCourseRepository, CourseRepository
+from services.base_service import AsyncBaseService, BaseService
+from caching import reference_cache
 
 class CourseService(BaseService):
     """
@@ -15,15 +17,18 @@ class CourseService(BaseService):
         self.course_repo = CourseRepository(db)
     
     def get_all_courses(self) -> List[schemas.Course]:
-        """Get all courses in the system"""
-        return self.course_repo.get_all()
+        """Get all courses in the system (reference-data cache)"""
+        return list(reference_cache.courses.get().items)
     
     def get_course_by_code(self, course_code: str) -> Optional[schemas.Course]:
         """
         Get a specific course by code.
         Raises ValueError if course doesn't exist.
         """
-        course = self.course_repo.get_by_id(course_code)
+        course = reference_cache.courses.get().by_key.get(course_code)
+        if not course:
+            # May have been created by another worker since the snapshot was taken
+            course = self.course_repo.get_by_id(course_code)
         if not course:
             raise ValueError(f"Course with code {course_code} not found")
         return course
@@ -43,14 +48,16 @@ class CourseService(BaseService):
         # Validate course data
         self._validate_course_data(course_data)
         
-        return self.course_repo.create(course_data)
+        course = self.course_repo.create(course_data)
+        reference_cache.courses.invalidate()
+        return course
     
     def get_courses_by_department(self, department: str) -> List[schemas.Course]:
         """Get all courses for a specific department"""
         if not department:
             raise ValueError("Department name is required")
         
-        return self.course_repo.get_by_department(department)
+        return reference_cache.courses.get().filter_by("department", department)
     
     def _validate_course_data(self, course_data: schemas.CourseCreate):
         """Validate course business rules"""
@@ -58,4 +65,55 @@ class CourseService(BaseService):
             raise ValueError("Course credits must be positive")
         
         if not course_data.course_title or len(course_data.course_title.strip()) == 0:
-            raise ValueError("Course title cannot be empty")
\ No newline at end of file
+            raise ValueError("Course title cannot be empty")
+
+
+class AsyncCourseService(AsyncBaseService):
+    """
+    Async counterpart of CourseService for the read endpoints.
+    Writes still go through CourseService.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        super().__init__(db)
+        self.course_repo = AsyncCourseRepository(db)
+    
+    async def get_all_courses(self) -> List[schemas.Course]:
+        """Get all courses in the system (reference-data cache)"""
+        return list((await reference_cache.courses.get_async()).items)
+    
+    async def get_all_courses_etag(self) -> str:
+        """ETag of the get_all_courses() result"""
+        return (await reference_cache.courses.get_async()).etag
+    
+    async def get_course_by_code(self, course_code: str) -> Optional[schemas.Course]:
+        """
+        Get a specific course by code.
+        Raises ValueError if course doesn't exist.
+        """
+        course = (await reference_cache.courses.get_async()).by_key.get(course_code)
+        if not course:
+            course = await self.course_repo.get_by_id(course_code)
+        if not course:
+            raise ValueError(f"Course with code {course_code} not found")
+        return course
+    
+    async def get_courses_by_department(self, department: str) -> List[schemas.Course]:
+        """Get all courses for a specific department"""
+        if not department:
+            raise ValueError("Department name is required")
+        
+        return (await reference_cache.courses.get_async()).filter_by("department", department)
+    
+    async def list_courses(
+        self, department: Optional[str] = None,
+        cursor: Optional[str] = None, limit: Optional[int] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Courses filtered by department, read from the database in keyset pages
+        (see BaseRepository.list_page). Returns the rows and the next cursor.
+        """
+        return await self.course_repo.list_page(
+            {"department": department}, cursor=cursor, limit=limit, fields=fields
+        )
@@ -1,8 +1,10 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import schemas
-from repositories.exam_semester_repository import ExamSemesterRepository
-from services.base_service import BaseService
+from repositories.exam_semester_repository import AsyncExamSemesterRepository, ExamSemesterRepository
+from services.base_service import AsyncBaseService, BaseService
+from caching import reference_cache
 
 class ExamSemesterService(BaseService):
     """
@@ -15,15 +17,18 @@ class ExamSemesterService(BaseService):
         self.semester_repo = ExamSemesterRepository(db)
     
     def get_all_semesters(self) -> List[schemas.ExamSemester]:
-        """Get all exam semesters"""
-        return self.semester_repo.get_all()
+        """Get all exam semesters (reference-data cache)"""
+        return list(reference_cache.semesters.get().items)
     
     def get_semester_by_id(self, semester_id: int) -> Optional[schemas.ExamSemester]:
         """
         Get semester by ID.
         Raises ValueError if not found.
         """
-        semester = self.semester_repo.get_by_id(semester_id)
+        semester = reference_cache.semesters.get().by_key.get(semester_id)
+        if not semester:
+            # May have been created by another worker since the snapshot was taken
+            semester = self.semester_repo.get_by_id(semester_id)
         if not semester:
             raise ValueError(f"Semester with ID {semester_id} not found")
         return semester
@@ -58,7 +63,9 @@ class ExamSemesterService(BaseService):
         # Validate semester data
         self._validate_semester_data(semester_data)
         
-        return self.semester_repo.create(semester_data)
+        semester = self.semester_repo.create(semester_data)
+        reference_cache.semesters.invalidate()
+        return semester
     
     def get_or_create_semester(
         self, year: int, semester_name: str
@@ -76,6 +83,7 @@ class ExamSemesterService(BaseService):
                     semester_name=semester_name
                 )
             )
+            reference_cache.semesters.invalidate()
         
         return semester
     
@@ -95,3 +103,47 @@ class ExamSemesterService(BaseService):
         if semester_data.exam_end_date and semester_data.result_publish_date:
             if semester_data.exam_end_date > semester_data.result_publish_date:
                 raise ValueError("Result publish date must be after exam end date")
+
+
+class AsyncExamSemesterService(AsyncBaseService):
+    """
+    Async counterpart of ExamSemesterService for the read endpoints.
+    Writes still go through ExamSemesterService.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        super().__init__(db)
+        self.semester_repo = AsyncExamSemesterRepository(db)
+    
+    async def get_all_semesters(self) -> List[schemas.ExamSemester]:
+        """Get all exam semesters (reference-data cache)"""
+        return list((await reference_cache.semesters.get_async()).items)
+    
+    async def get_all_semesters_etag(self) -> str:
+        """ETag of the get_all_semesters() result"""
+        return (await reference_cache.semesters.get_async()).etag
+    
+    async def get_semester_by_id(self, semester_id: int) -> Optional[schemas.ExamSemester]:
+        """
+        Get semester by ID.
+        Raises ValueError if not found.
+        """
+        semester = (await reference_cache.semesters.get_async()).by_key.get(semester_id)
+        if not semester:
+            semester = await self.semester_repo.get_by_id(semester_id)
+        if not semester:
+            raise ValueError(f"Semester with ID {semester_id} not found")
+        return semester
+    
+    async def list_semesters(
+        self, year: Optional[int] = None,
+        cursor: Optional[str] = None, limit: Optional[int] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Exam semesters filtered by year, read from the database in keyset pages
+        (see BaseRepository.list_page). Returns the rows and the next cursor.
+        """
+        return await self.semester_repo.list_page(
+            {"year": year}, cursor=cursor, limit=limit, fields=fields
+        )
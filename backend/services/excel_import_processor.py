@@ -5,7 +5,9 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Set, Tuple
 import pandas as pd
 import io
+import time
 from fastapi import UploadFile
+from monitoring.metrics import excel_import_rows_per_second, excel_import_rows_total
 
 
 class ExcelImportProcessor(ABC):
@@ -31,6 +33,7 @@ class ExcelImportProcessor(ABC):
         """
         try:
             # Step 1: Read and validate Excel file
+            start = time.perf_counter()
             excel_file = await self._read_excel_file(file)
             dataframes = self._load_required_sheets(excel_file)
             
@@ -57,6 +60,7 @@ class ExcelImportProcessor(ABC):
             # Step 4: Build remuneration data for each teacher
             teachers_data = self._initialize_teacher_data(teacher_map, exam_year)
             self._process_remuneration_data(dataframes, teachers_data, teacher_map, course_map)
+            self._record_import_metrics(dataframes, time.perf_counter() - start)
             
             # Step 5: Return success response
             return self._create_success_response(
@@ -200,6 +204,13 @@ class ExcelImportProcessor(ABC):
     
     # Helper methods for subclasses
     
+    def _record_import_metrics(self, dataframes: Dict[str, pd.DataFrame], elapsed: float) -> None:
+        """Record rows read and rows/sec for this upload."""
+        rows = sum(len(df) for df in dataframes.values())
+        excel_import_rows_total.inc(rows)
+        if elapsed > 0:
+            excel_import_rows_per_second.observe(rows / elapsed)
+    
     def _extract_course_code_from_string(self, course_str: str) -> str:
         """Extract course code from a course string (e.g., 'CSE-4101 AI' -> 'CSE-4101')."""
         return str(course_str).split()[0] if course_str else None
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+import hashlib
+import os
+from typing import Any, Callable, Optional, Tuple
+from pydantic import BaseModel
+import models
+from repositories.idempotency_repository import IdempotencyRepository
+from services.base_service import BaseService
+from utils.responses import encode_json
+
+# Stored responses are replayed for retries within this period
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+# Header marking a replayed response
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyKeyMismatch(ValueError):
+    """The key was already used with a different request body"""
+
+
+def request_hash(*parts: Any) -> str:
+    """sha256 over a request's parts: bytes as they are, models as their JSON, the rest as text"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, BaseModel):
+            part = part.model_dump_json()
+        if not isinstance(part, bytes):
+            part = str(part).encode()
+        digest.update(b"%d:" % len(part))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class IdempotencyService(BaseService):
+    """
+    Idempotency-Key handling for writes clients retry. A successful response
+    is stored under the caller's scope and key; a retry with the same key
+    and body gets the stored response without the write running again.
+    """
+
+    def __init__(self, db: Session):
+        super().__init__(db)
+        self.idempotency_repo = IdempotencyRepository(db)
+
+    def replay(self, scope: str, key: str, body_hash: str) -> Optional[models.IdempotencyKey]:
+        """
+        Stored response of an earlier request with this key, None if there is
+        none. Raises IdempotencyKeyMismatch if that request had another body.
+        """
+        record = self.idempotency_repo.get(scope, key, datetime.utcnow())
+        if record is not None and record.body_hash != body_hash:
+            raise IdempotencyKeyMismatch(f"Idempotency-Key {key} was already used with a different request")
+        return record
+
+    def _record(self, scope: str, key: str, body_hash: str, status_code: int, content: Any, now: datetime) -> models.IdempotencyKey:
+        return models.IdempotencyKey(
+            scope=scope,
+            key=key,
+            body_hash=body_hash,
+            status_code=status_code,
+            response=encode_json(content).decode(),
+            created_at=now,
+            expires_at=now + timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS),
+        )
+
+    def stage(self, scope: str, key: str, body_hash: str, status_code: int, content: Any) -> models.IdempotencyKey:
+        """Add a successful response under the key to the current transaction, for the write to commit with it"""
+        now = datetime.utcnow()
+        record = self._record(scope, key, body_hash, status_code, content, now)
+        self.idempotency_repo.save(record, now)
+        return record
+
+    def store(self, scope: str, key: str, body_hash: str, status_code: int, content: Any) -> models.IdempotencyKey:
+        """Store a successful response under the key and commit it, for writes that already committed"""
+        now = datetime.utcnow()
+        record = self._record(scope, key, body_hash, status_code, content, now)
+        try:
+            self.idempotency_repo.save(record, now)
+            self.idempotency_repo.commit()
+        except IntegrityError:
+            # Another worker stored the same request meanwhile
+            self.idempotency_repo.rollback()
+        return record
+
+    def run(
+        self, scope: str, key: str, body_hash: str, status_code: int,
+        operation: Callable[[Callable[[Any], None]], Any]
+    ) -> Tuple[models.IdempotencyKey, bool]:
+        """
+        Replay the stored response for the key, or run `operation(stage)`.
+        The operation calls stage(response) before it commits, so the
+        response is stored in the write's own transaction: a retry of the
+        whole operation finds either both committed or neither. Run it inside
+        the write coordinator so retries of one request are checked one after
+        the other. Returns the record and whether it was replayed.
+        """
+        record = self.replay(scope, key, body_hash)
+        if record is not None:
+            return record, True
+        staged = []
+        try:
+            operation(lambda content: staged.append(self.stage(scope, key, body_hash, status_code, content)))
+        except Exception:
+            # Another worker may have committed the same request meanwhile
+            self.idempotency_repo.rollback()
+            record = self.replay(scope, key, body_hash)
+            if record is None:
+                raise
+            return record, True
+        return staged[0], False
+
+    def prune_expired(self) -> int:
+        """Drop expired keys; returns how many"""
+        pruned = self.idempotency_repo.prune(datetime.utcnow())
+        self.db.commit()
+        return pruned
@@ -16,6 +16,7 @@ class InviteService:
         resend.api_key = os.getenv("RESEND_API_KEY")
 
     def create_invite(self, invite_data: schemas.TeacherInviteCreate) -> models.TeacherInvite:
+        """Store the invite; send it with send_invite_email() once the write is done"""
         # Check if teacher exists
         teacher = self.db.query(models.Teacher).filter(models.Teacher.id == invite_data.teacher_id).first()
         if not teacher:
@@ -45,9 +46,6 @@ class InviteService:
         self.db.commit()
         self.db.refresh(invite)
 
-        # Send email
-        self._send_invite_email(invite, teacher)
-
         return invite
 
     def activate_account(self, activation_data: schemas.TeacherActivation) -> models.TeacherAuth:
@@ -87,7 +85,9 @@ class InviteService:
 
         return teacher_auth
 
-    def _send_invite_email(self, invite: models.TeacherInvite, teacher: models.Teacher):
+    def send_invite_email(self, invite: models.TeacherInvite):
+        """Email the activation link; call outside the write coordinator, the provider may be slow"""
+        teacher = invite.teacher
         frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
         activation_link = f"{frontend_url}/activate?token={invite.token}"
 
@@ -0,0 +1,129 @@
+from sqlalchemy.orm import Session
+from typing import List, Optional
+import schemas
+from caching.report_cache import bump_semesters
+from events.event_bus import event_bus
+from repositories.exam_semester_repository import ExamSemesterRepository
+from repositories.rate_schedule_repository import RateScheduleRepository
+from repositories.remuneration_repository import ACTIVITY_MODELS
+from repositories.summary_repository import SummaryRepository
+from repositories.rollup_repository import RollupRepository
+from services.base_service import BaseService
+
+# Rates of the initial default schedule. A rate applies per unit of the
+# activity's quantity:
+# - question_preparations: per section; variant = section type (full/half)
+# - question_moderations: per question, divided by the team member count
+# - script_evaluations: per script; variant = script type
+# - practical_exams: per student per day
+# - viva_exams, tabulations: per student
+# - answer_sheet_reviews: per answer sheet
+# - other_remunerations: per page when a page count is given, else fixed
+# Variant "*" applies to every variant without a rate of its own. A
+# semester's own schedule only needs the rates it changes: anything it
+# doesn't list is priced from the default schedule.
+DEFAULT_RATES = [
+    schemas.RateEntry(activity_type="question_preparations", variant="full", rate=500.0),
+    schemas.RateEntry(activity_type="question_preparations", variant="*", rate=250.0),
+    schemas.RateEntry(activity_type="question_moderations", variant="*", rate=100.0),
+    schemas.RateEntry(activity_type="script_evaluations", variant="final", rate=15.0),
+    schemas.RateEntry(activity_type="script_evaluations", variant="incourse", rate=5.0),
+    schemas.RateEntry(activity_type="script_evaluations", variant="assignment", rate=5.0),
+    schemas.RateEntry(activity_type="script_evaluations", variant="presentation", rate=10.0),
+    schemas.RateEntry(activity_type="script_evaluations", variant="practical", rate=10.0),
+    schemas.RateEntry(activity_type="script_evaluations", variant="*", rate=10.0),
+    schemas.RateEntry(activity_type="practical_exams", variant="*", rate=2.0),
+    schemas.RateEntry(activity_type="viva_exams", variant="*", rate=10.0),
+    schemas.RateEntry(activity_type="tabulations", variant="*", rate=5.0),
+    schemas.RateEntry(activity_type="answer_sheet_reviews", variant="*", rate=20.0),
+    schemas.RateEntry(activity_type="other_remunerations", variant="page", rate=10.0),
+    schemas.RateEntry(activity_type="other_remunerations", variant="fixed", rate=500.0),
+]
+
+
+class RateScheduleService(BaseService):
+    """
+    Service layer for the remuneration rate schedules.
+    Totals are computed in SQL against the schedule in force for each
+    semester (see RemunerationRepository.get_semester_totals).
+    """
+
+    def __init__(self, db: Session):
+        super().__init__(db)
+        self.rate_repo = RateScheduleRepository(db)
+        self.semester_repo = ExamSemesterRepository(db)
+        self.summary_repo = SummaryRepository(db)
+        self.rollup_repo = RollupRepository(db)
+
+    def get_schedule(self, semester_id: Optional[int] = None) -> schemas.RateSchedule:
+        """
+        Rate schedule in force for a semester, or the default schedule.
+        Raises ValueError if the semester or a schedule doesn't exist.
+        """
+        if semester_id is not None and not self.semester_repo.get_by_id(semester_id):
+            raise ValueError(f"Semester with ID {semester_id} not found")
+        schedule = self.rate_repo.get_effective(semester_id)
+        if not schedule:
+            raise ValueError("No rate schedule defined")
+        return schedule
+
+    def set_schedule(
+        self, semester_id: Optional[int], rates: List[schemas.RateEntry]
+    ) -> schemas.RateSchedule:
+        """
+        Store `rates` as the next version of a semester's schedule (None: the
+        default schedule). Earlier versions are kept. A semester schedule
+        overrides the default rates it lists; the default schedule must
+        price every activity type.
+        """
+        if semester_id is not None and not self.semester_repo.get_by_id(semester_id):
+            raise ValueError(f"Semester with ID {semester_id} not found")
+        rates = self._validate_rates(rates)
+        if semester_id is None:
+            missing = sorted(set(ACTIVITY_MODELS) - {rate.activity_type for rate in rates})
+            if missing:
+                raise ValueError(f"The default rate schedule needs rates for: {', '.join(missing)}")
+
+        version = self.rate_repo.latest_version(semester_id) + 1
+        schedule = self.rate_repo.add_version(semester_id, version, rates)
+
+        # Re-price the stored summaries and rollup with the new rates before committing
+        affected = [semester_id] if semester_id is not None else self.summary_repo.get_semesters_with_activity()
+        for affected_id in affected:
+            self.summary_repo.refresh(affected_id)
+            self.rollup_repo.refresh(affected_id)
+        self.db.commit()
+        self.db.refresh(schedule)
+
+        # Cached reports and their ETags carry the totals of these semesters
+        bump_semesters(affected)
+        event_bus.publish(
+            "rate_schedule.updated",
+            schedule_semester_id=semester_id,
+            semester_ids=sorted(affected)
+        )
+        return schedule
+
+    def ensure_default_schedule(self) -> None:
+        """Create the default schedule from DEFAULT_RATES if there is none yet"""
+        if self.rate_repo.latest_version(None) == 0:
+            self.rate_repo.add_version(None, 1, DEFAULT_RATES)
+            self.db.commit()
+
+    def _validate_rates(self, rates: List[schemas.RateEntry]) -> List[schemas.RateEntry]:
+        """Check activity types and rates; variants are matched case-insensitively"""
+        if not rates:
+            raise ValueError("A rate schedule needs at least one rate")
+        normalized = []
+        seen = set()
+        for rate in rates:
+            if rate.activity_type not in ACTIVITY_MODELS:
+                raise ValueError(f"Unknown activity type: {rate.activity_type}")
+            if rate.rate < 0:
+                raise ValueError(f"Rate for {rate.activity_type}/{rate.variant} cannot be negative")
+            variant = rate.variant.strip().lower() or "*"
+            if (rate.activity_type, variant) in seen:
+                raise ValueError(f"Duplicate rate for {rate.activity_type}/{variant}")
+            seen.add((rate.activity_type, variant))
+            normalized.append(schemas.RateEntry(activity_type=rate.activity_type, variant=variant, rate=rate.rate))
+        return normalized
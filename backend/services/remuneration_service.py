@@ -1,17 +1,64 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Dict, List, Any
 import schemas
-from repositories.remuneration_repository import RemunerationRepository
-from repositories.teacher_repository import TeacherRepository
-from repositories.exam_semester_repository import ExamSemesterRepository
+from repositories.remuneration_repository import AsyncRemunerationRepository, RemunerationRepository, empty_details
+from repositories.summary_repository import AsyncSummaryRepository, SummaryRepository
+from repositories.rollup_repository import RollupRepository
+from repositories.teacher_repository import AsyncTeacherRepository, TeacherRepository
+from repositories.exam_semester_repository import AsyncExamSemesterRepository, ExamSemesterRepository
 from repositories.course_repository import CourseRepository
-from services.base_service import BaseService
+from services.base_service import AsyncBaseService, BaseService
 from services.excel_import_processor import ExcelImportProcessor, StandardExcelImportProcessor
+from monitoring.server_timing import timed_stage
+from caching import reference_cache
+from caching.conditional import make_etag
+from caching.report_cache import bump_semesters, cumulative_reports, semester_etag, semester_version, semester_versions
+from events.event_bus import event_bus
+import os
 import pandas as pd
-from typing import Dict, List, Any, Optional, Set, Tuple
+from typing import AsyncIterator, Callable, Dict, List, Any, Optional, Set, Tuple
 from fastapi import HTTPException, UploadFile
 import io
 
+# Teachers per batch when streaming the cumulative report
+REPORT_STREAM_BATCH_SIZE = int(os.getenv("REPORT_STREAM_BATCH_SIZE", "200"))
+
+class InvalidYearRange(ValueError):
+    """A statement's from_year is after its to_year"""
+
+def _validate_year_range(from_year: Optional[int], to_year: Optional[int]) -> None:
+    if from_year is not None and to_year is not None and from_year > to_year:
+        raise InvalidYearRange(f"from_year {from_year} is after to_year {to_year}")
+
+def _build_statement(
+    teacher,
+    semesters: List[schemas.SemesterSummary],
+    remunerations: Dict[int, Dict[str, List[Any]]],
+    totals: Dict[int, float],
+    from_year: Optional[int],
+    to_year: Optional[int]
+) -> schemas.TeacherStatement:
+    """Assemble a statement from its batched loads, grouping the (year-ordered) semesters by year"""
+    years: List[schemas.StatementYear] = []
+    for semester in semesters:
+        entry = schemas.StatementSemester.model_construct(
+            semester=semester,
+            total_amount=totals.get(semester.id, 0.0),
+            remunerations=schemas.RemunerationDetails.model_construct(**remunerations.get(semester.id, {}))
+        )
+        if not years or years[-1].year != semester.year:
+            years.append(schemas.StatementYear.model_construct(year=semester.year, total_amount=0.0, semesters=[]))
+        years[-1].semesters.append(entry)
+        years[-1].total_amount += entry.total_amount
+    return schemas.TeacherStatement.model_construct(
+        teacher=schemas.Teacher.model_validate(teacher, from_attributes=True),
+        from_year=from_year,
+        to_year=to_year,
+        years=years,
+        total_amount=sum(year.total_amount for year in years)
+    )
+
 class RemunerationService(BaseService):
     """
     Service layer for remuneration business logic.
@@ -21,6 +68,8 @@ class RemunerationService(BaseService):
     def __init__(self, db):
         self.db = db
         self.remuneration_repo = RemunerationRepository(db)  
+        self.summary_repo = SummaryRepository(db)
+        self.rollup_repo = RollupRepository(db)
         self.teacher_repo = TeacherRepository(db)
         self.semester_repo = ExamSemesterRepository(db)
         self.course_repo = CourseRepository(db)
@@ -33,7 +82,8 @@ class RemunerationService(BaseService):
         )
     
     def submit_remuneration(
-        self, data: schemas.RemunerationSubmission
+        self, data: schemas.RemunerationSubmission,
+        before_commit: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, str]:
         """
         Submit remuneration data for a teacher.
@@ -42,6 +92,8 @@ class RemunerationService(BaseService):
         - Semester must exist
         - Replaces any existing data for this teacher+semester
         - All operations must succeed or rollback
+        `before_commit(response)` runs in the same transaction, e.g. to stage
+        the response for idempotent retries.
         """
         # Validate teacher exists
         teacher = self.teacher_repo.get_by_id(data.teacher_id)
@@ -62,19 +114,33 @@ class RemunerationService(BaseService):
             # Save all new records
             self._save_all_remuneration_data(data)
             
-            # Commit transaction
-            self.remuneration_repo.commit()
+            # Keep the teacher's summary and department rollup in step, in the same transaction
+            self.summary_repo.refresh(data.exam_semester_id, [data.teacher_id])
+            self.rollup_repo.refresh(data.exam_semester_id, [teacher.department or ""])
             
-            return {
+            result = {
                 "message": "Remuneration submitted successfully",
                 "teacher_id": data.teacher_id,
                 "semester_id": data.exam_semester_id
             }
+            if before_commit is not None:
+                before_commit(result)
+            
+            # Commit transaction
+            self.remuneration_repo.commit()
+            event_bus.publish(
+                "remuneration.submitted",
+                teacher_id=data.teacher_id,
+                semester_ids=[data.exam_semester_id]
+            )
+            
+            return result
             
         except Exception as e:
             # Rollback will happen automatically
             raise ValueError(f"Failed to submit remuneration: {str(e)}")
     
+    @timed_stage("report-teacher")
     def get_teacher_remuneration(
         self, teacher_id: str, semester_id: int
     ) -> Dict[str, List[Any]]:
@@ -96,6 +162,7 @@ class RemunerationService(BaseService):
             teacher_id, semester_id
         )
     
+    @timed_stage("report-teacher-all")
     def get_teacher_all_remunerations(
         self, teacher_id: str
     ) -> List[Dict[str, Any]]:
@@ -108,8 +175,9 @@ class RemunerationService(BaseService):
         if not teacher:
             raise ValueError(f"Teacher with ID {teacher_id} not found")
         
-        # Get all semesters where teacher has activity
+        # Get all semesters where teacher has activity, and all their rows in one read
         semesters_with_activity = self.remuneration_repo.get_semesters_with_teacher_activity(teacher_id)
+        remunerations = self.remuneration_repo.get_teacher_remuneration_by_semester(teacher_id)
         
         result = []
         for semester in semesters_with_activity:
@@ -122,12 +190,32 @@ class RemunerationService(BaseService):
                     "exam_end_date": semester.exam_end_date,
                     "result_publish_date": semester.result_publish_date
                 },
-                "remunerations": self.remuneration_repo.get_teacher_remuneration(teacher_id, semester.id)
+                "remunerations": remunerations[semester.id]
             }
             result.append(semester_data)
         
         return result
     
+    @timed_stage("report-statement")
+    def get_teacher_statement(
+        self, teacher_id: str, from_year: Optional[int] = None, to_year: Optional[int] = None
+    ) -> schemas.TeacherStatement:
+        """
+        A teacher's remuneration over a range of years (inclusive; either end
+        may be open), semester by semester with year and grand totals. All
+        the teacher's activity rows in the range are loaded in one query.
+        """
+        _validate_year_range(from_year, to_year)
+        teacher = self.teacher_repo.get_by_id(teacher_id)
+        if not teacher:
+            raise ValueError(f"Teacher with ID {teacher_id} not found")
+        
+        semesters = self.remuneration_repo.get_teacher_semesters(teacher_id, from_year, to_year)
+        remunerations = self.remuneration_repo.get_teacher_remuneration_by_semester(teacher_id, from_year, to_year)
+        totals = self.summary_repo.get_teacher_totals(teacher_id, [semester.id for semester in semesters])
+        return _build_statement(teacher, semesters, remunerations, totals, from_year, to_year)
+    
+    @timed_stage("report-cumulative")
     def get_cumulative_report(self, semester_id: int) -> List[Dict[str, Any]]:
         """
         Generate cumulative report for all teachers in a semester.
@@ -138,29 +226,52 @@ class RemunerationService(BaseService):
         if not semester:
             raise ValueError(f"Semester with ID {semester_id} not found")
         
-        # Get all teachers with activity in this semester
-        teachers = self.remuneration_repo.get_teachers_with_semester_activity(
+        # Teachers with activity in this semester and their totals, from the summary table
+        summaries = self.summary_repo.get_semester_summaries(semester_id)
+        
+        # All of the semester's rows in one query per activity table
+        details = self.remuneration_repo.get_semester_remuneration_by_teacher(
             semester_id
         )
         
         # Build report data
         report_data = []
-        for teacher in teachers:
-            teacher_data = self.remuneration_repo.get_teacher_remuneration(
-                teacher.id, semester_id
-            )
-            
-            # Calculate total remuneration (business logic)
-            total_amount = self._calculate_total_remuneration(teacher_data)
-            
+        for entry in summaries:
             report_data.append({
-                "teacher": teacher,
-                "details": teacher_data,
-                "total_amount": total_amount  # Service layer adds computed data
+                "teacher": entry.teacher,
+                "details": details.get(entry.teacher.id, empty_details()),
+                "total_amount": entry.summary.total_amount
             })
         
         return report_data
     
+    def rebuild_summaries(self) -> List[int]:
+        """
+        Recompute the materialized summaries and the analytics rollup from
+        the activity tables in one transaction. Returns the semesters that
+        have activity.
+        """
+        semester_ids = self.summary_repo.rebuild()
+        self.rollup_repo.rebuild(semester_ids)
+        self.db.commit()
+        bump_semesters(semester_ids)
+        return semester_ids
+    
+    def ensure_summaries(self) -> List[int]:
+        """
+        Recompute the summaries and rollup of semesters where they disagree
+        with the activity ledger (a new table, or ledger rows changed outside
+        the write paths); returns those semesters
+        """
+        drifted = sorted(set(self.summary_repo.get_drifted_semesters()) | set(self.rollup_repo.get_drifted_semesters()))
+        for semester_id in drifted:
+            self.summary_repo.refresh(semester_id)
+            self.rollup_repo.refresh(semester_id)
+        if drifted:
+            self.db.commit()
+            bump_semesters(drifted)
+        return drifted
+    
     def _save_all_remuneration_data(self, data: schemas.RemunerationSubmission):
         """Private method to save all remuneration types"""
         if data.question_preparations:
@@ -203,64 +314,6 @@ class RemunerationService(BaseService):
                 data.teacher_id, data.exam_semester_id, data.other_remunerations
             )
     
-    def _calculate_total_remuneration(self, teacher_data: Dict[str, List[Any]]) -> float:
-        """
-        Calculate total remuneration amount.
-        This is business logic that belongs in the service layer.
-        You can customize rates based on your business rules.
-        """
-        total = 0.0
-        
-        # Example calculation - adjust rates as per your requirements
-        # Question preparation: 500 per full section, 250 per half
-        for prep in teacher_data.get('question_preparations', []):
-            if prep.section_type.lower() == 'full':
-                total += 500.0
-            else:
-                total += 250.0
-        
-        # Question moderation: 100 per question / team member count
-        for mod in teacher_data.get('question_moderations', []):
-            if mod.team_member_count > 0:
-                total += (mod.question_count * 100.0) / mod.team_member_count
-        
-        # Script evaluation: varies by type
-        for script in teacher_data.get('script_evaluations', []):
-            rate_map = {
-                'final': 15.0,
-                'incourse': 5.0,
-                'assignment': 5.0,
-                'presentation': 10.0,
-                'practical': 10.0
-            }
-            rate = rate_map.get(script.script_type.lower(), 10.0)
-            total += script.script_count * rate
-        
-        # Practical exams: 200 per day per student (example)
-        for practical in teacher_data.get('practical_exams', []):
-            total += practical.student_count * practical.day_count * 2.0
-        
-        # Viva exams: 10 per student
-        for viva in teacher_data.get('viva_exams', []):
-            total += viva.student_count * 10.0
-        
-        # Tabulation: 5 per student
-        for tab in teacher_data.get('tabulations', []):
-            total += tab.student_count * 5.0
-        
-        # Answer sheet review: 20 per sheet
-        for review in teacher_data.get('answer_sheet_reviews', []):
-            total += review.answer_sheet_count * 20.0
-        
-        # Other remunerations: calculate based on page count or fixed amount
-        for other in teacher_data.get('other_remunerations', []):
-            if other.page_count:
-                total += other.page_count * 10.0  # 10 per page
-            else:
-                total += 500.0  # Fixed amount for non-page based
-        
-        return total
-    
 
     # async def process_excel_import(
     #     self, 
@@ -477,8 +530,242 @@ class RemunerationService(BaseService):
         Delegate Excel import processing to the processor.
         This maintains backward compatibility with existing code.
         """
-        return await self.excel_processor.process_excel_import(
+        result = await self.excel_processor.process_excel_import(
             file, 
             semester_name, 
             exam_year
-        )
\ No newline at end of file
+        )
+        if result.get("status") == "success":
+            event_bus.publish(
+                "import.completed",
+                semester_name=semester_name,
+                exam_year=exam_year,
+                teacher_count=len(result["teachers_data"])
+            )
+        return result
+
+
+class AsyncRemunerationService(AsyncBaseService):
+    """
+    Async counterpart of RemunerationService for the read/report endpoints.
+    Submissions and Excel imports still go through RemunerationService.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        super().__init__(db)
+        self.remuneration_repo = AsyncRemunerationRepository(db)
+        self.summary_repo = AsyncSummaryRepository(db)
+        self.teacher_repo = AsyncTeacherRepository(db)
+        self.semester_repo = AsyncExamSemesterRepository(db)
+    
+    @timed_stage("report-teacher")
+    async def get_teacher_remuneration(
+        self, teacher_id: str, semester_id: int
+    ) -> schemas.RemunerationDetails:
+        """
+        Get all remuneration data for a teacher in a specific semester.
+        Validates that both teacher and semester exist.
+        """
+        teacher = await self.teacher_repo.get_by_id(teacher_id)
+        if not teacher:
+            raise ValueError(f"Teacher with ID {teacher_id} not found")
+        
+        await self._validate_semester(semester_id)
+        
+        details = await self.remuneration_repo.get_teacher_remuneration(
+            teacher_id, semester_id
+        )
+        return schemas.RemunerationDetails.model_construct(**details)
+    
+    @timed_stage("report-teacher-all")
+    async def get_teacher_all_remunerations(
+        self, teacher_id: str
+    ) -> List[schemas.TeacherSemesterRemuneration]:
+        """
+        Get all remuneration data for a teacher across all semesters.
+        Returns data grouped by semester.
+        """
+        teacher = await self.teacher_repo.get_by_id(teacher_id)
+        if not teacher:
+            raise ValueError(f"Teacher with ID {teacher_id} not found")
+        
+        semesters_with_activity = await self.remuneration_repo.get_semesters_with_teacher_activity(teacher_id)
+        remunerations = await self.remuneration_repo.get_teacher_remuneration_by_semester(teacher_id)
+        
+        return [
+            schemas.TeacherSemesterRemuneration.model_construct(
+                semester=semester,
+                remunerations=schemas.RemunerationDetails.model_construct(**remunerations[semester.id])
+            )
+            for semester in semesters_with_activity
+        ]
+    
+    @timed_stage("report-teacher-index")
+    async def get_teacher_semester_index(self, teacher_id: str) -> List[schemas.TeacherSemesterIndexEntry]:
+        """
+        The semesters a teacher has activity in, each with its counts and
+        total from the summary table (no activity rows are read). Details
+        of a semester come from get_teacher_remuneration.
+        """
+        teacher = await self.teacher_repo.get_by_id(teacher_id)
+        if not teacher:
+            raise ValueError(f"Teacher with ID {teacher_id} not found")
+        return await self.summary_repo.get_teacher_semester_index(teacher_id)
+    
+    async def _teacher_semester_versions(self, teacher_id: str) -> Dict[int, int]:
+        """
+        Data versions of the semesters the teacher has activity in, so other
+        teachers' writes elsewhere leave the teacher's ETags alone
+        """
+        semester_ids = await self.summary_repo.get_teacher_semester_ids(teacher_id)
+        return {semester_id: semester_version(semester_id) for semester_id in sorted(semester_ids)}
+    
+    async def get_teacher_semester_index_etag(self, teacher_id: str) -> str:
+        """ETag of get_teacher_semester_index(teacher_id), from the teacher's semester versions and the semester list"""
+        semesters = await reference_cache.semesters.get_async()
+        versions = await self._teacher_semester_versions(teacher_id)
+        return make_etag("teacher-semesters", teacher_id, versions, semesters.etag)
+    
+    async def get_teacher_remuneration_etag(self, teacher_id: str, semester_id: int) -> str:
+        """
+        ETag of get_teacher_remuneration(teacher_id, semester_id); changes
+        only with that semester's data. Raises ValueError for an unknown
+        semester first, so one is never answered 304.
+        """
+        await self._validate_semester(semester_id)
+        return make_etag("teacher-semester", teacher_id, semester_id, semester_version(semester_id))
+    
+    @timed_stage("report-statement")
+    async def get_teacher_statement(
+        self, teacher_id: str, from_year: Optional[int] = None, to_year: Optional[int] = None
+    ) -> schemas.TeacherStatement:
+        """
+        A teacher's remuneration over a range of years (inclusive; either end
+        may be open), semester by semester with year and grand totals. All
+        the teacher's activity rows in the range are loaded in one query.
+        """
+        _validate_year_range(from_year, to_year)
+        teacher = await self.teacher_repo.get_by_id(teacher_id)
+        if not teacher:
+            raise ValueError(f"Teacher with ID {teacher_id} not found")
+        
+        semesters = await self.remuneration_repo.get_teacher_semesters(teacher_id, from_year, to_year)
+        remunerations = await self.remuneration_repo.get_teacher_remuneration_by_semester(teacher_id, from_year, to_year)
+        totals = await self.summary_repo.get_teacher_totals(teacher_id, [semester.id for semester in semesters])
+        return _build_statement(teacher, semesters, remunerations, totals, from_year, to_year)
+    
+    async def get_teacher_statement_etag(
+        self, teacher_id: str, from_year: Optional[int] = None, to_year: Optional[int] = None
+    ) -> str:
+        """
+        ETag of get_teacher_statement(...), from the semester data versions
+        and semester list. Validates the request the same way first, so a bad
+        one is never answered 304.
+        """
+        _validate_year_range(from_year, to_year)
+        if teacher_id not in (await reference_cache.teachers.get_async()).by_key:
+            raise ValueError(f"Teacher with ID {teacher_id} not found")
+        semesters = await reference_cache.semesters.get_async()
+        return make_etag("teacher-statement", teacher_id, from_year, to_year, semester_versions(), semesters.etag)
+    
+    async def get_teacher_all_remunerations_etag(self, teacher_id: str) -> str:
+        """
+        ETag of get_teacher_all_remunerations(teacher_id), derived from the
+        teacher's semester versions and the semester list without loading any
+        activity rows.
+        """
+        semesters = await reference_cache.semesters.get_async()
+        versions = await self._teacher_semester_versions(teacher_id)
+        return make_etag("teacher-remuneration", teacher_id, versions, semesters.etag)
+    
+    @timed_stage("report-summary")
+    async def get_semester_summary(self, semester_id: int) -> List[schemas.TeacherSummaryEntry]:
+        """
+        Per teacher counts and totals for a semester, read from the
+        materialized summary table in one indexed scan
+        """
+        await self._validate_semester(semester_id)
+        return await self.summary_repo.get_semester_summaries(semester_id)
+    
+    async def get_cumulative_report(self, semester_id: int) -> List[schemas.CumulativeReportEntry]:
+        """
+        Generate cumulative report for all teachers in a semester.
+        Business rule: Only include teachers with at least one remuneration entry.
+        """
+        _, report_data = await self.get_cumulative_report_versioned(semester_id)
+        return report_data
+    
+    async def get_semester_etag(self, semester_id: int, kind: str) -> str:
+        """
+        ETag of the semester's `kind` report at its current data version.
+        Raises ValueError for an unknown semester first, so one is never
+        answered 304.
+        """
+        await self._validate_semester(semester_id)
+        return semester_etag(semester_id, semester_version(semester_id), kind)
+    
+    async def _validate_semester(self, semester_id: int) -> None:
+        """Raise ValueError for an unknown semester, checked against the cached semester list"""
+        if semester_id not in (await reference_cache.semesters.get_async()).by_key:
+            raise ValueError(f"Semester with ID {semester_id} not found")
+    
+    async def get_cumulative_report_versioned(
+        self, semester_id: int
+    ) -> Tuple[int, List[schemas.CumulativeReportEntry]]:
+        """
+        Cumulative report together with the semester data version it reflects.
+        Served from the report cache until a write bumps the version.
+        """
+        version = semester_version(semester_id)
+        report_data = cumulative_reports.get(semester_id, version)
+        if report_data is None:
+            report_data = await self._build_cumulative_report(semester_id)
+            cumulative_reports.put(semester_id, version, report_data)
+        return version, report_data
+    
+    async def stream_cumulative_report(
+        self, semester_id: int, batch_size: int = REPORT_STREAM_BATCH_SIZE
+    ) -> AsyncIterator[schemas.CumulativeReportEntry]:
+        """
+        Cumulative report as an async iterator of entries, computed
+        `batch_size` teachers at a time so memory stays flat however large the
+        semester is. The semester is validated before iteration starts.
+        """
+        await self._validate_semester(semester_id)
+        return self._iter_cumulative_report(semester_id, batch_size)
+    
+    async def _iter_cumulative_report(
+        self, semester_id: int, batch_size: int
+    ) -> AsyncIterator[schemas.CumulativeReportEntry]:
+        batches = self.summary_repo.stream_semester_summaries(semester_id, batch_size)
+        async for summaries in batches:
+            details = await self.remuneration_repo.get_semester_remuneration_by_teacher(
+                semester_id, teacher_ids=[entry.teacher.id for entry in summaries]
+            )
+            for entry in summaries:
+                yield schemas.CumulativeReportEntry.model_construct(
+                    teacher=entry.teacher,
+                    details=schemas.RemunerationDetails.model_construct(**details.get(entry.teacher.id, empty_details())),
+                    total_amount=entry.summary.total_amount
+                )
+    
+    @timed_stage("report-cumulative")
+    async def _build_cumulative_report(self, semester_id: int) -> List[schemas.CumulativeReportEntry]:
+        semester = await self.semester_repo.get_by_id(semester_id)
+        if not semester:
+            raise ValueError(f"Semester with ID {semester_id} not found")
+        
+        summaries = await self.summary_repo.get_semester_summaries(semester_id)
+        details = await self.remuneration_repo.get_semester_remuneration_by_teacher(
+            semester_id
+        )
+        
+        report_data = []
+        for entry in summaries:
+            report_data.append(schemas.CumulativeReportEntry.model_construct(
+                teacher=entry.teacher,
+                details=schemas.RemunerationDetails.model_construct(**details.get(entry.teacher.id, empty_details())),
+                total_amount=entry.summary.total_amount
+            ))
+        
+        return report_data
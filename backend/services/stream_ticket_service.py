@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+import hashlib
+import os
+import secrets
+import models
+import schemas
+from repositories.stream_ticket_repository import StreamTicketRepository
+from services.base_service import BaseService
+
+# A ticket has to be redeemed within this period
+STREAM_TICKET_TTL_SECONDS = int(os.getenv("STREAM_TICKET_TTL_SECONDS", "30"))
+
+
+def _ticket_hash(ticket: str) -> str:
+    return hashlib.sha256(ticket.encode()).hexdigest()
+
+
+class StreamTicketService(BaseService):
+    """
+    Tickets for opening event streams. EventSource can't send headers, so
+    the stream URL carries a ticket instead of the bearer token: it is
+    issued to an authenticated user, expires within seconds and works once,
+    so one that ends up in an access log is useless.
+    """
+
+    def __init__(self, db: Session):
+        super().__init__(db)
+        self.ticket_repo = StreamTicketRepository(db)
+
+    def issue(self, user: models.User) -> schemas.StreamTicket:
+        """A new ticket for `user`"""
+        now = datetime.utcnow()
+        ticket = secrets.token_urlsafe(32)
+        expires_at = now + timedelta(seconds=STREAM_TICKET_TTL_SECONDS)
+        self.ticket_repo.save(
+            models.StreamTicket(ticket_hash=_ticket_hash(ticket), username=user.username, expires_at=expires_at), now
+        )
+        self.ticket_repo.commit()
+        return schemas.StreamTicket(ticket=ticket, expires_at=expires_at)
+
+    def redeem(self, ticket: str) -> str:
+        """Use up a ticket; returns the username it was issued to. Raises ValueError if it is unknown, used or expired."""
+        username = self.ticket_repo.consume(_ticket_hash(ticket), datetime.utcnow())
+        self.ticket_repo.commit()
+        if username is None:
+            raise ValueError("Invalid or expired stream ticket")
+        return username
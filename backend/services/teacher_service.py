@@ -1,8 +1,10 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import schemas
-from repositories.teacher_repository import TeacherRepository
-from services.base_service import BaseService
+from repositories.teacher_repository import AsyncTeacherRepository, TeacherRepository
+from services.base_service import AsyncBaseService, BaseService
+from caching import reference_cache
 
 class TeacherService(BaseService):
     """
@@ -18,16 +20,19 @@ class TeacherService(BaseService):
         """
         Get all teachers from the system.
         Business rule: Return all active teachers.
+        Served from the reference-data cache.
         """
-        teachers = self.teacher_repo.get_all()
-        return teachers
+        return list(reference_cache.teachers.get().items)
     
     def get_teacher_by_id(self, teacher_id: str) -> Optional[schemas.Teacher]:
         """
         Get a specific teacher by ID.
         Raises ValueError if teacher doesn't exist.
         """
-        teacher = self.teacher_repo.get_by_id(teacher_id)
+        teacher = reference_cache.teachers.get().by_key.get(teacher_id)
+        if not teacher:
+            # May have been created by another worker since the snapshot was taken
+            teacher = self.teacher_repo.get_by_id(teacher_id)
         if not teacher:
             raise ValueError(f"Teacher with ID {teacher_id} not found")
         return teacher
@@ -54,7 +59,9 @@ class TeacherService(BaseService):
         # Additional business validation can go here
         self._validate_teacher_data(teacher_data)
         
-        return self.teacher_repo.create(teacher_data)
+        teacher = self.teacher_repo.create(teacher_data)
+        reference_cache.teachers.invalidate()
+        return teacher
     
     def get_teachers_by_department(self, department: str) -> List[schemas.Teacher]:
         """
@@ -64,7 +71,7 @@ class TeacherService(BaseService):
         if not department:
             raise ValueError("Department name is required")
         
-        return self.teacher_repo.get_by_department(department)
+        return reference_cache.teachers.get().filter_by("department", department)
     
     def teacher_exists(self, teacher_id: str) -> bool:
         """Check if a teacher exists in the system"""
@@ -79,4 +86,55 @@ class TeacherService(BaseService):
             raise ValueError("Teacher name cannot be empty")
         
         if not teacher_data.designation:
-            raise ValueError("Teacher designation is required")
\ No newline at end of file
+            raise ValueError("Teacher designation is required")
+
+
+class AsyncTeacherService(AsyncBaseService):
+    """
+    Async counterpart of TeacherService for the read endpoints.
+    Writes still go through TeacherService.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        super().__init__(db)
+        self.teacher_repo = AsyncTeacherRepository(db)
+    
+    async def get_all_teachers(self) -> List[schemas.Teacher]:
+        """Get all teachers from the system (reference-data cache)"""
+        return list((await reference_cache.teachers.get_async()).items)
+    
+    async def get_all_teachers_etag(self) -> str:
+        """ETag of the get_all_teachers() result"""
+        return (await reference_cache.teachers.get_async()).etag
+    
+    async def get_teacher_by_id(self, teacher_id: str) -> Optional[schemas.Teacher]:
+        """
+        Get a specific teacher by ID.
+        Raises ValueError if teacher doesn't exist.
+        """
+        teacher = (await reference_cache.teachers.get_async()).by_key.get(teacher_id)
+        if not teacher:
+            teacher = await self.teacher_repo.get_by_id(teacher_id)
+        if not teacher:
+            raise ValueError(f"Teacher with ID {teacher_id} not found")
+        return teacher
+    
+    async def get_teachers_by_department(self, department: str) -> List[schemas.Teacher]:
+        """Get all teachers in a specific department"""
+        if not department:
+            raise ValueError("Department name is required")
+        
+        return (await reference_cache.teachers.get_async()).filter_by("department", department)
+    
+    async def list_teachers(
+        self, department: Optional[str] = None, designation: Optional[str] = None,
+        cursor: Optional[str] = None, limit: Optional[int] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Teachers filtered by department/designation, read from the database in keyset pages
+        (see BaseRepository.list_page). Returns the rows and the next cursor.
+        """
+        return await self.teacher_repo.list_page(
+            {"department": department, "designation": designation}, cursor=cursor, limit=limit, fields=fields
+        )
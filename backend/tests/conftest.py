@@ -0,0 +1,143 @@
+"""
+Shared fixtures. Run from backend/: python -m pytest
+
+The suite uses its own SQLite file (DATABASE_URL is set before the app is
+imported, as is a long cache invalidation poll interval); every test starts from freshly created tables holding the seed
+below, with the in-process caches emptied.
+"""
+import os
+import sys
+import tempfile
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="remuneration-tests-"), "test.db")
+# query_budget counts every thread's statements: keep the invalidation poll
+# from landing in a budget (tests that need it call refresh() themselves)
+os.environ["CACHE_INVALIDATION_POLL_SECONDS"] = "3600"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect, text
+
+import database
+import models
+from auth import create_access_token, get_password_hash
+from caching import reference_cache
+from caching.invalidation import invalidation_bus
+from caching.report_cache import cumulative_reports, semester_key
+from monitoring.pytest_plugin import query_budget  # noqa: F401 (fixture)
+
+PASSWORD = "password123"
+_PASSWORD_HASH = get_password_hash(PASSWORD)
+
+TEACHER_COUNT = 12
+COURSE_COUNT = 8
+SEMESTER_IDS = (1, 2)
+
+
+def _seed() -> None:
+    db = database.SessionLocal()
+    try:
+        db.add(models.User(username="admin", hashed_password=_PASSWORD_HASH, is_super_admin=True))
+        for i in range(TEACHER_COUNT):
+            db.add(models.Teacher(
+                id=str(1000 + i),
+                name=f"Teacher {i}",
+                designation="Professor" if i % 2 else "Lecturer",
+                department="CSE" if i % 3 else "EEE",
+                mobile_no="01700000000",
+            ))
+        for i in range(COURSE_COUNT):
+            db.add(models.Course(course_code=f"CSE-{4100 + i}", course_title=f"Course {i}", credits=3.0, department="CSE"))
+        db.add(models.ExamSemester(id=1, year=2024, semester_name="4th Year 1st Semester", chairman_id="1001", exam_start_date=date(2024, 1, 1)))
+        db.add(models.ExamSemester(id=2, year=2025, semester_name="4th Year 2nd Semester", chairman_id="1001"))
+        db.flush()
+        db.add(models.TeacherAuth(teacher_id="1001", username="teacher1", hashed_password=_PASSWORD_HASH))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _drop_everything() -> None:
+    # Not just the mapped tables: also the activity views and anything a test created
+    with database.engine.begin() as conn:
+        inspector = inspect(conn)
+        for view in inspector.get_view_names():
+            conn.execute(text(f"DROP VIEW {view}"))
+        for table in inspector.get_table_names():
+            conn.execute(text(f"DROP TABLE {table}"))
+
+
+def _reset_caches() -> None:
+    # Versions restart at 0 with the fresh tables; cached values of earlier tests must go
+    invalidation_bus._versions.clear()
+    invalidation_bus._pending.clear()
+    for semester_id in SEMESTER_IDS:
+        cumulative_reports.drop(semester_id)
+    for table in reference_cache.TABLES.values():
+        table._drop()
+
+
+@pytest.fixture
+def client():
+    """TestClient over freshly seeded tables (runs the app's startup)"""
+    _drop_everything()
+    database.Base.metadata.create_all(bind=database.engine)
+    _seed()
+    _reset_caches()
+    import main
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db(client):
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def admin_headers(client):
+    return {"Authorization": "Bearer " + create_access_token({"sub": "admin", "role": "super_admin"})}
+
+
+@pytest.fixture
+def teacher_headers(client):
+    return {"Authorization": "Bearer " + create_access_token({"sub": "teacher1", "role": "teacher"})}
+
+
+def submission(teacher_id: str, semester_id: int, scripts: int = 40) -> dict:
+    """A remuneration submission touching every activity type"""
+    return {
+        "teacher_id": teacher_id,
+        "exam_semester_id": semester_id,
+        "question_preparations": [
+            {"course_code": "CSE-4100", "section_type": "Full"},
+            {"course_code": "CSE-4101", "section_type": "Half"},
+        ],
+        "question_moderations": [{"course_code": "CSE-4100", "question_count": 3, "team_member_count": 2}],
+        "script_evaluations": [
+            {"course_code": "CSE-4100", "script_type": "Final", "script_count": scripts},
+            {"course_code": "CSE-4101", "script_type": "Incourse", "script_count": scripts},
+        ],
+        "practical_exams": [{"course_code": "CSE-4101", "student_count": 30, "day_count": 2}],
+        "viva_exams": [{"course_code": "CSE-4102", "student_count": 50}],
+        "tabulations": [{"course_code": "CSE-4103", "student_count": 60}],
+        "answer_sheet_reviews": [{"course_code": "CSE-4104", "answer_sheet_count": 7}],
+        "other_remunerations": [
+            {"remuneration_type": "Stencil", "details": "Question papers", "page_count": 4},
+            {"remuneration_type": "Exam Committee Honorium", "details": "Member"},
+        ],
+    }
+
+
+@pytest.fixture
+def submit(client, admin_headers):
+    """Submit remuneration as the super admin; returns the response"""
+    def _submit(teacher_id: str, semester_id: int, **kwargs):
+        return client.post("/api/v1/remuneration/submit", json=submission(teacher_id, semester_id, **kwargs), headers=admin_headers)
+    return _submit
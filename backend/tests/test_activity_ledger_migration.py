@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import inspect, text
+
+import database
+from migrate_activity_ledger import ensure_activity_views, migrate_activity_ledger
+
+
+@pytest.fixture
+def legacy_table(client):
+    """Turn script_evaluations back into a former per-activity table holding two rows"""
+    with database.engine.begin() as conn:
+        conn.execute(text("DROP VIEW script_evaluations"))
+        conn.execute(text(
+            "CREATE TABLE script_evaluations (id INTEGER PRIMARY KEY, teacher_id VARCHAR, exam_semester_id INTEGER, "
+            "course_code VARCHAR, script_type VARCHAR, script_count INTEGER)"
+        ))
+        conn.execute(text(
+            "INSERT INTO script_evaluations VALUES "
+            "(7, '1001', 1, 'CSE-4100', 'Final', 10), (3, '1002', 1, 'CSE-4101', 'Incourse', 4)"
+        ))
+
+
+def test_startup_refuses_unmigrated_tables(legacy_table):
+    with pytest.raises(RuntimeError, match="script_evaluations"):
+        ensure_activity_views(database.engine)
+
+
+def test_migration_moves_rows_and_keeps_the_former_table(legacy_table):
+    assert migrate_activity_ledger(database.engine) == 2
+    with database.engine.connect() as conn:
+        inspector = inspect(conn)
+        assert "script_evaluations_legacy" in inspector.get_table_names()
+        assert "script_evaluations" in inspector.get_view_names()
+        rows = conn.execute(text("SELECT teacher_id, script_type, script_count FROM script_evaluations ORDER BY id")).all()
+    # Ledger order follows the former ids
+    assert [tuple(row) for row in rows] == [("1002", "Incourse", 4), ("1001", "Final", 10)]
+    ensure_activity_views(database.engine)
+    assert migrate_activity_ledger(database.engine) == 0
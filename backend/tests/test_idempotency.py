@@ -0,0 +1,121 @@
+"""Idempotency-Key handling of remuneration submits"""
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import OperationalError
+
+import models
+from repositories.idempotency_repository import IdempotencyRepository
+from repositories.remuneration_repository import RemunerationRepository
+from services.idempotency_service import IdempotencyService
+from services.remuneration_service import RemunerationService
+from tests.conftest import submission
+
+SUBMIT = "/api/v1/remuneration/submit"
+
+
+def post(client, headers, key, **kwargs):
+    return client.post(SUBMIT, json=submission("1001", 1, **kwargs), headers={**headers, "Idempotency-Key": key})
+
+
+def script_counts(db):
+    ledger = models.RemunerationActivity
+    rows = db.execute(
+        select(ledger.script_count)
+        .where(ledger.teacher_id == "1001", ledger.activity_type == "script_evaluations")
+        .order_by(ledger.id)
+    )
+    return rows.scalars().all()
+
+
+def stored_keys(db):
+    return db.execute(select(func.count()).select_from(models.IdempotencyKey)).scalar()
+
+
+def test_retry_replays_without_submitting_again(client, db, admin_headers, submit):
+    first = post(client, admin_headers, "k1")
+    assert first.status_code == 201
+    assert submit("1001", 1, scripts=7).status_code == 201
+
+    retry = post(client, admin_headers, "k1")
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert script_counts(db) == [7, 7]
+
+
+def test_key_reused_with_another_body_is_rejected(client, db, admin_headers):
+    assert post(client, admin_headers, "k1").status_code == 201
+    response = post(client, admin_headers, "k1", scripts=7)
+    assert response.status_code == 422
+    assert script_counts(db) == [40, 40]
+
+
+def test_expired_key_runs_the_submit_again(client, db, admin_headers, submit):
+    assert post(client, admin_headers, "k1").status_code == 201
+    assert submit("1001", 1, scripts=7).status_code == 201
+    db.execute(update(models.IdempotencyKey).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+
+    response = post(client, admin_headers, "k1")
+    assert response.status_code == 201
+    assert "Idempotent-Replayed" not in response.headers
+    assert script_counts(db) == [40, 40]
+    assert stored_keys(db) == 1
+
+
+def test_busy_error_never_runs_the_submit_twice(client, db, admin_headers, monkeypatch):
+    # A busy error while storing the key used to make the coordinator re-run the committed submit
+    commit = RemunerationRepository.commit
+    idempotency_commit = IdempotencyRepository.commit
+    commits = []
+
+    def counted(self):
+        commit(self)
+        commits.append(True)
+
+    def busy(self):
+        raise OperationalError("COMMIT", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(RemunerationRepository, "commit", counted)
+    monkeypatch.setattr(IdempotencyRepository, "commit", busy)
+    response = post(client, admin_headers, "k1")
+    assert response.status_code == 201
+    assert len(commits) == 1 and stored_keys(db) == 1
+
+    monkeypatch.setattr(IdempotencyRepository, "commit", idempotency_commit)
+    assert post(client, admin_headers, "k1").headers["Idempotent-Replayed"] == "true"
+    assert len(commits) == 1
+
+
+def test_import_keys_are_handled_off_the_event_loop(client, admin_headers, monkeypatch):
+    threads = {}
+
+    async def process_excel_import(self, file, semester_name, exam_year):
+        threads["loop"] = threading.current_thread()
+        return {"status": "success", "code": 200, "semester_name": semester_name, "exam_year": exam_year}
+
+    def recorded(name, method):
+        def wrapper(*args, **kwargs):
+            threads[name] = threading.current_thread()
+            return method(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(RemunerationService, "process_excel_import", process_excel_import)
+    monkeypatch.setattr(IdempotencyService, "replay", recorded("replay", IdempotencyService.replay))
+    monkeypatch.setattr(IdempotencyService, "store", recorded("store", IdempotencyService.store))
+
+    def post_import():
+        return client.post(
+            "/api/remuneration/import-excel",
+            data={"semester_name": "S", "exam_year": "2024"},
+            files={"file": ("bills.xlsx", b"PK")},
+            headers={**admin_headers, "Idempotency-Key": "import-1"},
+        )
+
+    assert post_import().status_code == 200
+    assert threads["replay"] is not threads["loop"] and threads["store"] is not threads["loop"]
+    retry = post_import()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json()["semester_name"] == "S"
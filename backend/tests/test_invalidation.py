@@ -0,0 +1,133 @@
+import queue
+import threading
+import time
+
+import pytest
+
+import database
+from caching.invalidation import REDIS_CHANNEL, InvalidationBus, invalidation_bus
+
+
+class FakeRedis:
+    """In-memory stand-in for the Redis pub/sub calls the bus makes"""
+
+    def __init__(self):
+        self.published = []
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+        with self._lock:
+            subscribers = [pubsub for pubsub in self._subscribers if channel in pubsub.channels]
+        for pubsub in subscribers:
+            pubsub.messages.put({"type": "message", "channel": channel, "data": message})
+        return len(subscribers)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        pubsub = FakePubSub(self)
+        with self._lock:
+            self._subscribers.append(pubsub)
+        return pubsub
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.channels = set()
+        self.messages = queue.Queue()
+
+    def subscribe(self, channel):
+        self.channels.add(channel)
+
+    def get_message(self, timeout=0.0):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        with self.redis._lock:
+            self.redis._subscribers.remove(self)
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def failing_bump(monkeypatch):
+    """Make the shared version bump of the app's bus fail until the returned callable is called"""
+    original = invalidation_bus._bump
+
+    def fail(names):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(invalidation_bus, "_bump", fail)
+    return lambda: monkeypatch.setattr(invalidation_bus, "_bump", original)
+
+
+def test_failed_bump_still_moves_this_workers_version(client, failing_bump):
+    invalidation_bus.publish("semester:1")
+    assert invalidation_bus.version("semester:1") == 1
+    assert invalidation_bus.pending_count == 1
+
+    # Another worker does not see the change until the bump is retried
+    other = InvalidationBus(database.engine, redis_url=None)
+    other.refresh(notify=False)
+    assert other.version("semester:1") == 0
+
+    failing_bump()
+    invalidation_bus._retry_pending()
+    assert invalidation_bus.pending_count == 0
+    assert other.refresh() == {"semester:1"}
+    assert other.version("semester:1") == 1
+    assert invalidation_bus.version("semester:1") == 1
+
+
+def test_failed_bump_does_not_leave_a_stale_etag(client, admin_headers, submit, failing_bump):
+    first = client.get("/api/v1/reports/cumulative/1", headers=admin_headers)
+    assert submit("1001", 1).status_code == 201
+    again = client.get("/api/v1/reports/cumulative/1", headers={**admin_headers, "If-None-Match": first.headers["etag"]})
+    assert again.status_code == 200
+    assert len(again.json()) == 1
+
+
+def test_pending_name_stays_ahead_of_other_workers_bumps(client, failing_bump):
+    invalidation_bus.publish("semester:1")
+    other = InvalidationBus(database.engine, redis_url=None)
+    other.publish("semester:1")
+    # The table's version 1 is the other worker's change, not this one's
+    invalidation_bus.refresh()
+    assert invalidation_bus.version("semester:1") == 2
+
+    failing_bump()
+    invalidation_bus._retry_pending()
+    assert invalidation_bus.version("semester:1") == 2
+    other.refresh()
+    assert other.version("semester:1") == 2
+
+
+def test_redis_message_wakes_subscribers(client):
+    redis = FakeRedis()
+    publisher = InvalidationBus(database.engine, redis_url="redis://stand-in")
+    subscriber = InvalidationBus(database.engine, poll_interval=60, redis_url="redis://stand-in")
+    publisher._redis = redis
+    subscriber._redis = redis
+    seen = []
+    subscriber.subscribe(seen.append)
+    subscriber.start()
+    try:
+        assert _wait_for(lambda: redis._subscribers)
+        publisher.publish("semester:2")
+        assert redis.published == [(REDIS_CHANNEL, '["semester:2"]')]
+        # Far sooner than the 60s poll
+        assert _wait_for(lambda: {"semester:2"} in seen)
+        assert subscriber.version("semester:2") == 1
+    finally:
+        subscriber.stop()
@@ -0,0 +1,22 @@
+import resend
+
+from write_coordinator import write_coordinator
+
+
+def test_invite_email_is_sent_outside_the_writer_slot(client, admin_headers, monkeypatch):
+    sent = []
+
+    def send(message):
+        # Another write could take the slot while the provider is busy
+        assert write_coordinator._writer.acquire(blocking=False)
+        write_coordinator._writer.release()
+        sent.append(message)
+
+    monkeypatch.setattr(resend.Emails, "send", send)
+    response = client.post(
+        "/api/v1/teachers/1002/invite",
+        json={"teacher_id": "1002", "email": "teacher2@example.com"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 201
+    assert [message["to"] for message in sent] == ["teacher2@example.com"]
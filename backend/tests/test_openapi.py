@@ -0,0 +1,4 @@
+def test_openapi_schema_builds(client):
+    response = client.get("/openapi.json")
+    assert response.status_code == 200
+    assert "/api/v1/reports/cumulative/{semester_id}/stream" in response.json()["paths"]
@@ -0,0 +1,68 @@
+"""
+SQL statement budgets of the hot endpoints (monitoring.pytest_plugin's
+query_budget fixture). Every teacher has a submission, so a per-teacher or
+per-row query shows up as a blown budget or a suspected N+1. Budgets
+include the statement authenticating the caller.
+"""
+import pytest
+
+from conftest import COURSE_COUNT, SEMESTER_IDS, TEACHER_COUNT
+
+
+@pytest.fixture
+def submitted(submit):
+    for i in range(TEACHER_COUNT):
+        for semester_id in SEMESTER_IDS:
+            assert submit(str(1000 + i), semester_id).status_code == 201
+
+
+def test_cumulative_report(client, admin_headers, submitted, query_budget):
+    with query_budget(5):
+        response = client.get("/api/v1/reports/cumulative/1", headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == TEACHER_COUNT
+
+
+def test_cumulative_report_served_from_cache(client, admin_headers, submitted, query_budget):
+    client.get("/api/v1/reports/cumulative/1", headers=admin_headers)
+    with query_budget(1):
+        response = client.get("/api/v1/reports/cumulative/1", headers=admin_headers)
+    assert response.status_code == 200
+
+
+def test_semester_summary_report(client, admin_headers, submitted, query_budget):
+    with query_budget(3):
+        response = client.get("/api/v1/reports/summary/1", headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == TEACHER_COUNT
+
+
+def test_teacher_remuneration(client, teacher_headers, submitted, query_budget):
+    # One of them finds the teacher's semesters for the ETag, so other teachers' writes leave it alone
+    with query_budget(7):
+        response = client.get("/api/v1/teacher/remuneration", headers=teacher_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == len(SEMESTER_IDS)
+
+
+def test_teacher_remuneration_semester(client, teacher_headers, submitted, query_budget):
+    with query_budget(5):
+        response = client.get("/api/v1/teacher/remuneration/semesters/1", headers=teacher_headers)
+    assert response.status_code == 200
+
+
+def test_admin_teacher_remuneration(client, admin_headers, submitted, query_budget):
+    with query_budget(4):
+        response = client.get("/api/v1/remuneration/teacher/1001/semester/1", headers=admin_headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("path, count", [("/api/v1/teachers", TEACHER_COUNT), ("/api/v1/courses", COURSE_COUNT)])
+def test_reference_lists(client, admin_headers, query_budget, path, count):
+    with query_budget(1):
+        response = client.get(path, headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == count
+    # Served from the reference cache afterwards
+    with query_budget(0):
+        assert client.get(path, headers=admin_headers).status_code == 200
@@ -0,0 +1,62 @@
+"""Totals priced in SQL (priced_activities) against default and per-semester rate schedules"""
+import pytest
+
+
+def scripts_only(teacher_id, semester_id, final=10, incourse=0):
+    """A submission with only script evaluations: 15.0 per final and 5.0 per incourse script by default"""
+    scripts = [{"course_code": "CSE-4100", "script_type": "Final", "script_count": final}]
+    if incourse:
+        scripts.append({"course_code": "CSE-4101", "script_type": "Incourse", "script_count": incourse})
+    return {"teacher_id": teacher_id, "exam_semester_id": semester_id, "script_evaluations": scripts}
+
+
+@pytest.fixture
+def priced(client, admin_headers):
+    """Submit scripts for teacher 1001 in both semesters and return a reader of its totals"""
+    for semester_id in (1, 2):
+        response = client.post("/api/v1/remuneration/submit", json=scripts_only("1001", semester_id, incourse=4), headers=admin_headers)
+        assert response.status_code == 201
+
+    def totals(semester_id):
+        cumulative = client.get(f"/api/v1/reports/cumulative/{semester_id}", headers=admin_headers).json()
+        summary = client.get(f"/api/v1/reports/summary/{semester_id}", headers=admin_headers).json()
+        rollup = client.get(f"/api/v1/analytics/rollup?semester_id={semester_id}&group_by=semester", headers=admin_headers).json()
+        return cumulative[0]["total_amount"], summary[0]["summary"]["total_amount"], rollup[0]["amount"]
+
+    return totals
+
+
+def set_rates(client, headers, rates, semester_id=None):
+    path = "/api/v1/rate-schedule" if semester_id is None else f"/api/v1/semesters/{semester_id}/rate-schedule"
+    return client.put(path, json={"rates": rates}, headers=headers)
+
+
+def test_default_rates(priced):
+    assert priced(1) == (170.0, 170.0, 170.0)
+
+
+def test_semester_schedule_keeps_default_rates_it_does_not_list(client, admin_headers, priced):
+    response = set_rates(client, admin_headers, [{"activity_type": "viva_exams", "variant": "*", "rate": 12.0}], semester_id=1)
+    assert response.status_code == 200
+    assert priced(1) == (170.0, 170.0, 170.0)
+
+
+def test_semester_rate_overrides_default(client, admin_headers, priced):
+    rates = [{"activity_type": "script_evaluations", "variant": "final", "rate": 20.0}]
+    assert set_rates(client, admin_headers, rates, semester_id=1).status_code == 200
+    # 10 * 20.0 + 4 * 5.0 (incourse still from the default schedule)
+    assert priced(1) == (220.0, 220.0, 220.0)
+    assert priced(2) == (170.0, 170.0, 170.0)
+
+
+def test_semester_star_rate_comes_before_default_variant_rates(client, admin_headers, priced):
+    rates = [{"activity_type": "script_evaluations", "variant": "*", "rate": 1.0}]
+    assert set_rates(client, admin_headers, rates, semester_id=1).status_code == 200
+    assert priced(1) == (14.0, 14.0, 14.0)
+
+
+def test_default_schedule_must_price_every_activity_type(client, admin_headers, priced):
+    response = set_rates(client, admin_headers, [{"activity_type": "viva_exams", "variant": "*", "rate": 12.0}])
+    assert response.status_code == 400
+    assert "script_evaluations" in response.json()["detail"]
+    assert priced(1) == (170.0, 170.0, 170.0)
@@ -0,0 +1,13 @@
+"""Reference table snapshots"""
+import asyncio
+
+from caching import reference_cache
+
+
+def test_concurrent_async_misses_load_the_table_once(client, query_budget):
+    async def load_together():
+        snapshots = await asyncio.gather(*(reference_cache.teachers.get_async() for _ in range(8)))
+        return {id(snapshot) for snapshot in snapshots}
+
+    with query_budget(1):
+        assert len(asyncio.run(load_together())) == 1
@@ -0,0 +1,29 @@
+"""Incremental refreshes of the analytics cube against a full rebuild"""
+from sqlalchemy import select, update
+
+import models
+from repositories.rollup_repository import RollupRepository
+
+
+def cube(db):
+    rollup = models.RemunerationRollup
+    rows = db.execute(
+        select(rollup.department, rollup.exam_semester_id, rollup.activity_type, rollup.activity_count, rollup.amount)
+        .order_by(rollup.department, rollup.exam_semester_id, rollup.activity_type)
+    )
+    return [tuple(row) for row in rows]
+
+
+def test_department_refresh_matches_rebuild(client, db, submit):
+    db.execute(update(models.Teacher).where(models.Teacher.id == "1004").values(department=None))
+    db.commit()
+    for teacher_id in ("1001", "1003", "1004"):
+        assert submit(teacher_id, 1).status_code == 201
+    assert submit("1001", 1, scripts=7).status_code == 201
+    assert submit("1004", 1, scripts=3).status_code == 201
+
+    incremental = cube(db)
+    assert {cell[0] for cell in incremental} == {"", "CSE", "EEE"}
+    RollupRepository(db).rebuild([1, 2])
+    db.commit()
+    assert cube(db) == incremental
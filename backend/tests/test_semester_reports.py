@@ -0,0 +1,15 @@
+"""Semester reports validate the semester before their ETag is checked"""
+import pytest
+
+REVALIDATE = {"If-None-Match": "*"}
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/reports/cumulative/{}",
+    "/api/v1/reports/summary/{}",
+    "/api/v1/reports/cumulative/{}/stream",
+])
+def test_unknown_semester_is_not_answered_304(client, admin_headers, path):
+    headers = {**admin_headers, **REVALIDATE}
+    assert client.get(path.format(1), headers=headers).status_code == 304
+    assert client.get(path.format(999), headers=headers).status_code == 404
@@ -0,0 +1,18 @@
+"""Statement requests are validated before their ETag is checked"""
+
+
+def test_unknown_teacher_is_not_answered_304(client, admin_headers, submit):
+    assert submit("1001", 1).status_code == 201
+    headers = {**admin_headers, "If-None-Match": "*"}
+    assert client.get("/api/v1/reports/teachers/1001/statement", headers=headers).status_code == 304
+    assert client.get("/api/v1/reports/teachers/9999/statement", headers=headers).status_code == 404
+
+
+def test_reversed_year_range_is_a_bad_request(client, admin_headers, teacher_headers):
+    query = "?from_year=2025&to_year=2024"
+    response = client.get(f"/api/v1/reports/teachers/1001/statement{query}", headers={**admin_headers, "If-None-Match": "*"})
+    assert response.status_code == 400
+    response = client.get(f"/api/v1/reports/teachers/1001/statement{query}", headers=admin_headers)
+    assert response.status_code == 400
+    response = client.get(f"/api/v1/teacher/statement{query}", headers={**teacher_headers, "If-None-Match": "*"})
+    assert response.status_code == 400
@@ -0,0 +1,42 @@
+"""Event streams open with single-use tickets, never a bearer token in the URL"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+
+import models
+from auth import create_access_token, get_current_stream_admin
+
+
+def issue_ticket(client, headers):
+    response = client.post("/api/v1/events/ticket", headers=headers)
+    assert response.status_code == 201
+    return response.json()["ticket"]
+
+
+def test_ticket_opens_one_stream(client, db, admin_headers):
+    ticket = issue_ticket(client, admin_headers)
+    assert get_current_stream_admin(token=None, ticket=ticket, db=db).username == "admin"
+    with pytest.raises(HTTPException) as error:
+        get_current_stream_admin(token=None, ticket=ticket, db=db)
+    assert error.value.status_code == 401
+
+
+def test_expired_ticket_is_refused(client, db, admin_headers):
+    ticket = issue_ticket(client, admin_headers)
+    db.execute(update(models.StreamTicket).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+    with pytest.raises(HTTPException) as error:
+        get_current_stream_admin(token=None, ticket=ticket, db=db)
+    assert error.value.status_code == 401
+
+
+def test_tickets_are_for_super_admins(client, teacher_headers):
+    assert client.post("/api/v1/events/ticket", headers=teacher_headers).status_code == 403
+
+
+def test_token_in_the_url_is_not_accepted(client):
+    token = create_access_token({"sub": "admin", "role": "super_admin"})
+    assert client.get(f"/api/v1/events?access_token={token}").status_code == 401
+    assert client.get("/api/v1/events?ticket=made-up").status_code == 401
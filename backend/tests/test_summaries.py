@@ -0,0 +1,43 @@
+"""Materialized summaries against the activity ledger they are computed from"""
+from sqlalchemy import delete
+
+import models
+from services.remuneration_service import RemunerationService
+
+
+def report_teachers(client, headers, semester_id=1):
+    response = client.get(f"/api/v1/reports/cumulative/{semester_id}", headers=headers)
+    assert response.status_code == 200
+    return {entry["teacher"]["id"]: entry for entry in response.json()}
+
+
+def test_report_survives_ledger_rows_removed_behind_the_summaries(client, db, admin_headers, submit):
+    assert submit("1001", 1).status_code == 201
+    assert submit("1002", 1).status_code == 201
+    ledger = models.RemunerationActivity
+    db.execute(delete(ledger).where(ledger.teacher_id == "1002"))
+    db.commit()
+
+    teachers = report_teachers(client, admin_headers)
+    assert teachers["1002"]["details"]["script_evaluations"] == []
+
+    assert RemunerationService(db).ensure_summaries() == [1]
+    assert set(report_teachers(client, admin_headers)) == {"1001"}
+
+
+def test_ensure_summaries_picks_up_rows_added_behind_them(client, db, admin_headers, submit):
+    assert submit("1001", 1).status_code == 201
+    db.add(models.ScriptEvaluation(teacher_id="1003", exam_semester_id=1, course_code="CSE-4100", script_type="Final", script_count=10))
+    db.commit()
+    assert set(report_teachers(client, admin_headers)) == {"1001"}
+
+    assert RemunerationService(db).ensure_summaries() == [1]
+    teachers = report_teachers(client, admin_headers)
+    assert teachers["1003"]["total_amount"] == 150.0
+    rollup = client.get("/api/v1/analytics/rollup?group_by=semester", headers=admin_headers).json()
+    assert rollup[0]["amount"] == teachers["1001"]["total_amount"] + 150.0
+
+
+def test_ensure_summaries_leaves_matching_semesters_alone(client, db, submit):
+    assert submit("1001", 1).status_code == 201
+    assert RemunerationService(db).ensure_summaries() == []
@@ -0,0 +1,27 @@
+"""A teacher's dashboard ETags move with that teacher's semesters only"""
+import pytest
+
+INDEX = "/api/v1/teacher/remuneration/semesters"
+
+
+def etag(client, headers, path):
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+
+@pytest.mark.parametrize("path", [INDEX, "/api/v1/teacher/remuneration"])
+def test_etag_ignores_semesters_the_teacher_has_no_activity_in(client, teacher_headers, submit, path):
+    assert submit("1001", 1).status_code == 201
+    before = etag(client, teacher_headers, path)
+    assert submit("1002", 2).status_code == 201
+    assert etag(client, teacher_headers, path) == before
+    assert submit("1002", 1).status_code == 201
+    assert etag(client, teacher_headers, path) != before
+
+
+def test_unknown_semester_detail_is_not_answered_304(client, teacher_headers, submit):
+    assert submit("1001", 1).status_code == 201
+    headers = {**teacher_headers, "If-None-Match": "*"}
+    assert client.get(f"{INDEX}/1", headers=headers).status_code == 304
+    assert client.get(f"{INDEX}/999", headers=headers).status_code == 404
@@ -0,0 +1,39 @@
+"""Write coordinator metrics in the Prometheus registry"""
+from sqlalchemy.exc import OperationalError
+
+from monitoring import metrics
+from write_coordinator import WriteDeadlineExceeded, write_coordinator
+
+
+def outcome(name):
+    return metrics.write_outcomes_total.labels(name).value
+
+
+def test_waits_and_outcomes_are_recorded(db):
+    waits = metrics.write_wait_seconds.labels().count
+    completed, retries, deadlines = outcome("completed"), outcome("busy_retries"), outcome("deadline_exceeded")
+    attempts = []
+
+    def busy_once():
+        attempts.append(True)
+        if len(attempts) == 1:
+            raise OperationalError("COMMIT", {}, Exception("database is locked"))
+        return "done"
+
+    assert write_coordinator.run(db, busy_once) == "done"
+
+    def always_busy():
+        raise OperationalError("COMMIT", {}, Exception("database is locked"))
+
+    try:
+        write_coordinator.run(db, always_busy, deadline=0.01)
+    except WriteDeadlineExceeded:
+        pass
+
+    assert metrics.write_wait_seconds.labels().count == waits + 2
+    assert (outcome("completed"), outcome("busy_retries"), outcome("deadline_exceeded")) == (
+        completed + 1, retries + 1, deadlines + 1
+    )
+    rendered = metrics.registry.render()
+    assert "write_wait_seconds_count" in rendered
+    assert 'write_outcomes_total{outcome="busy_retries"}' in rendered
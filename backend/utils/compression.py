@@ -0,0 +1,156 @@
+"""
+Negotiated response compression (brotli or gzip) with a size threshold.
+
+Responses are compressed when the client accepts a supported coding, the
+body is a compressible media type, it is not already encoded, and a
+single-chunk body is at least COMPRESSION_MIN_SIZE bytes. Streamed bodies
+are compressed chunk by chunk and flushed after each chunk, so streaming
+endpoints keep delivering data as it is produced.
+
+Brotli is used when the `brotli` package is installed and the client
+accepts `br`; otherwise gzip. The coding is appended to a strong ETag
+("abc" -> "abc-br") because a compressed representation is a different
+representation; caching.conditional strips the suffix when comparing.
+"""
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+
+def _accepted_codings(headers: Headers) -> set:
+    codings = set()
+    for part in headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        codings.add(coding.strip().lower())
+    return codings
+
+
+def choose_coding(headers: Headers):
+    accepted = _accepted_codings(headers)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, coding: str):
+        if coding == "br":
+            self._impl = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._compress = self._impl.process
+            self._flush = self._impl.flush
+            self._finish = self._impl.finish
+        else:
+            self._impl = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._compress = self._impl.compress
+            self._flush = lambda: self._impl.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._impl.flush
+
+    def chunk(self, data: bytes, final: bool) -> bytes:
+        out = self._compress(data)
+        return out + (self._finish() if final else self._flush())
+
+
+def _tag_not_modified(message, coding: str, request_headers: Headers) -> None:
+    """Keep the coding suffix on a 304 when the client revalidated a compressed copy"""
+    headers = MutableHeaders(scope=message)
+    etag = headers.get("etag")
+    if etag and etag.endswith('"'):
+        coded = f'{etag[:-1]}-{coding}"'
+        if coded in request_headers.get("if-none-match", ""):
+            headers["ETag"] = coded
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing eligible responses with br/gzip"""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        coding = choose_coding(request_headers)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = Headers(raw=message["headers"])
+                media_type = headers.get("content-type", "")
+                passthrough = (
+                    "content-encoding" in headers
+                    or message["status"] in (204, 304)
+                    or not media_type.startswith(_COMPRESSIBLE_TYPES)
+                )
+                if message["status"] == 304:
+                    _tag_not_modified(message, coding, request_headers)
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = _Compressor(coding)
+                headers = MutableHeaders(scope=start_message)
+                headers["Content-Encoding"] = coding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and etag.endswith('"') and not etag.startswith("W/"):
+                    headers["ETag"] = f'{etag[:-1]}-{coding}"'
+                if more_body:
+                    del headers["content-length"]
+                    await send(start_message)
+                else:
+                    compressed = compressor.chunk(body, final=True)
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+            await send({
+                "type": "http.response.body",
+                "body": compressor.chunk(body, final=not more_body),
+                "more_body": more_body,
+            })
+
+        await self.app(scope, receive, send_compressed)
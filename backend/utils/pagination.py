@@ -0,0 +1,45 @@
+"""
+Query parameters and responses for keyset-paginated list endpoints.
+
+List endpoints keep returning the full cached list when called without
+parameters. Any filter, `limit`, `cursor` or `fields` switches them to a
+database listing (BaseRepository.list_page): the body is still a JSON array,
+and when more rows follow, the next page is linked in the `Link` header
+(rel="next") and its cursor is sent in `X-Next-Cursor`.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from fastapi import Query, Request
+
+from repositories.base import MAX_PAGE_SIZE
+from utils.responses import FastJSONResponse
+
+
+@dataclass
+class PageParams:
+    cursor: Optional[str] = None
+    limit: Optional[int] = None
+    fields: Optional[List[str]] = None
+
+    @property
+    def requested(self) -> bool:
+        return self.cursor is not None or self.limit is not None or self.fields is not None
+
+
+def page_params(
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (the key is always included)"),
+) -> PageParams:
+    field_list = [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+    return PageParams(cursor=cursor, limit=limit, fields=field_list)
+
+
+def page_response(request: Request, items: List[Dict[str, Any]], next_cursor: Optional[str]) -> FastJSONResponse:
+    headers = {}
+    if next_cursor is not None:
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+        headers["X-Next-Cursor"] = next_cursor
+    return FastJSONResponse(items, headers=headers)
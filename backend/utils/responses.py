@@ -0,0 +1,110 @@
+"""
+Fast JSON responses for the heavy report endpoints.
+
+Returning a FastJSONResponse from an endpoint skips FastAPI's
+jsonable_encoder walk: the content is encoded in one pass by orjson. ORM
+instances are encoded as their loaded column attributes, the same shape
+jsonable_encoder produces for them, and pydantic response schemas as their
+fields (schemas built with model_construct are not re-validated).
+
+Because the endpoint returns the response object itself, headers set on an
+injected `Response` parameter are not merged by FastAPI; pass them through
+with `FastJSONResponse(content, headers=response.headers)`.
+
+EncodedJSONResponse sends a body encoded earlier (encode_json), such as a
+stored response replayed for an idempotent retry.
+
+NDJSONResponse streams an async iterable as newline-delimited JSON, one
+item per line, encoded as the items arrive.
+
+EventStreamResponse streams events (anything with id, type and data, e.g.
+events.event_bus.Event) as Server-Sent Events; a None item becomes a
+comment line that keeps idle connections open.
+"""
+from typing import Any, AsyncIterable, AsyncIterator
+
+import orjson
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+
+from monitoring.server_timing import stage
+
+
+def _encode_default(obj: Any) -> Any:
+    """orjson fallback: response schemas, ORM instances and other plain objects become dicts of their attributes"""
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    if hasattr(obj, "__dict__"):
+        return {key: value for key, value in vars(obj).items() if not key.startswith("_sa")}
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def encode_json(content: Any) -> bytes:
+    """Content encoded the way FastJSONResponse sends it"""
+    return orjson.dumps(content, default=_encode_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson"""
+
+    def render(self, content: Any) -> bytes:
+        with stage("json-encode"):
+            return encode_json(content)
+
+
+class EncodedJSONResponse(Response):
+    """Sends an already encoded JSON body, e.g. a stored response"""
+
+    media_type = "application/json"
+
+
+# Encoded lines are sent in chunks of about this size; each chunk is also
+# one compression flush, so single tiny lines would compress poorly
+NDJSON_CHUNK_BYTES = 16 * 1024
+
+
+async def _ndjson_chunks(items: AsyncIterable[Any]) -> AsyncIterator[bytes]:
+    buffer = bytearray()
+    async for item in items:
+        buffer += orjson.dumps(item, default=_encode_default, option=orjson.OPT_NON_STR_KEYS)
+        buffer += b"\n"
+        if len(buffer) >= NDJSON_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+class NDJSONResponse(StreamingResponse):
+    """Streams the items of an async iterable as newline-delimited JSON"""
+
+    media_type = "application/x-ndjson"
+
+    # status_code is spelled out so FastAPI can read the default for the OpenAPI docs
+    def __init__(self, items: AsyncIterable[Any], status_code: int = 200, **kwargs):
+        super().__init__(_ndjson_chunks(items), status_code=status_code, **kwargs)
+
+
+async def _sse_frames(events: AsyncIterable[Any]) -> AsyncIterator[bytes]:
+    async for event in events:
+        if event is None:
+            yield b": heartbeat\n\n"
+            continue
+        frame = b""
+        if event.id:
+            frame += b"id: %d\n" % event.id
+        frame += b"event: " + event.type.encode() + b"\n"
+        frame += b"data: " + orjson.dumps(event.data, default=_encode_default) + b"\n\n"
+        yield frame
+
+
+class EventStreamResponse(StreamingResponse):
+    """Streams events from an async iterable as Server-Sent Events (text/event-stream)"""
+
+    media_type = "text/event-stream"
+
+    def __init__(self, events: AsyncIterable[Any], **kwargs):
+        super().__init__(_sse_frames(events), **kwargs)
+        # Reverse proxies must not buffer the stream, nor caches keep it
+        self.headers.setdefault("Cache-Control", "no-cache")
+        self.headers.setdefault("X-Accel-Buffering", "no")
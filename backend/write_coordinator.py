@@ -0,0 +1,168 @@
+"""
+Write coordinator for SQLite.
+
+SQLite allows a single writer at a time. Instead of letting every threadpool
+worker start a write transaction and collide on the database lock, write
+operations are funnelled through one writer slot per process:
+
+- at most WRITE_QUEUE_MAX_DEPTH operations may wait for the slot; further
+  writes are rejected immediately (WriteQueueFull)
+- every operation has a deadline covering both queueing and retries
+  (WriteDeadlineExceeded)
+- SQLITE_BUSY / "database is locked" errors, which still happen when several
+  uvicorn workers share one file, are rolled back and retried with jittered
+  exponential backoff until the deadline
+
+Reads never touch the coordinator; with WAL enabled (see database.py) they run
+concurrently with the single writer.
+"""
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from monitoring.metrics import write_outcomes_total, write_queue_depth, write_wait_seconds
+
+WRITE_QUEUE_MAX_DEPTH = int(os.getenv("WRITE_QUEUE_MAX_DEPTH", "64"))
+WRITE_DEADLINE_SECONDS = float(os.getenv("WRITE_DEADLINE_SECONDS", "15"))
+WRITE_RETRY_BASE_DELAY = 0.05
+WRITE_RETRY_MAX_DELAY = 1.0
+
+
+class WriteCoordinatorError(Exception):
+    """Base class for write coordinator rejections"""
+
+
+class WriteQueueFull(WriteCoordinatorError):
+    """Raised when too many writes are already waiting"""
+
+
+class WriteDeadlineExceeded(WriteCoordinatorError):
+    """Raised when a write could not complete before its deadline"""
+
+
+def is_busy_error(exc: BaseException) -> bool:
+    """
+    True if the exception (or anything it wraps) is SQLITE_BUSY/SQLITE_LOCKED.
+    Services re-raise database errors as ValueError, so the cause chain is walked.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, OperationalError):
+            message = str(exc.orig if exc.orig is not None else exc).lower()
+            if "database is locked" in message or "database is busy" in message:
+                return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+class WriteCoordinator:
+    """Single-writer gate with bounded queueing, deadlines and busy retries"""
+
+    def __init__(self, max_depth: int = WRITE_QUEUE_MAX_DEPTH, deadline: float = WRITE_DEADLINE_SECONDS):
+        self.max_depth = max_depth
+        self.deadline = deadline
+        self._writer = threading.Lock()
+        self._state = threading.Lock()
+        self._waiting = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected_queue_full": 0,
+            "deadline_exceeded": 0,
+            "busy_retries": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+
+    def run(self, db: Session, operation: Callable[[], Any], deadline: Optional[float] = None) -> Any:
+        """
+        Run `operation` while holding the writer slot.
+        `db` is the session the operation writes through; it is rolled back
+        before every retry.
+        """
+        deadline_at = time.monotonic() + (deadline if deadline is not None else self.deadline)
+
+        with self._state:
+            if self._waiting >= self.max_depth:
+                self._count_locked("rejected_queue_full")
+                raise WriteQueueFull(
+                    f"Write queue is full ({self._waiting} writes waiting), try again shortly"
+                )
+            self._waiting += 1
+            self._stats["submitted"] += 1
+
+        enqueued_at = time.monotonic()
+        acquired = self._writer.acquire(timeout=max(0.0, deadline_at - enqueued_at))
+        waited = time.monotonic() - enqueued_at
+        write_wait_seconds.observe(waited)
+        with self._state:
+            self._waiting -= 1
+            self._stats["wait_seconds_total"] += waited
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+            if not acquired:
+                self._count_locked("deadline_exceeded")
+        if not acquired:
+            raise WriteDeadlineExceeded(f"Write not started within its deadline ({waited:.1f}s queued)")
+
+        try:
+            return self._run_with_retry(db, operation, deadline_at)
+        finally:
+            self._writer.release()
+
+    def _run_with_retry(self, db: Session, operation: Callable[[], Any], deadline_at: float) -> Any:
+        attempt = 0
+        while True:
+            try:
+                result = operation()
+            except Exception as exc:
+                if not is_busy_error(exc):
+                    self._count("failed")
+                    raise
+                db.rollback()
+                attempt += 1
+                delay = min(WRITE_RETRY_BASE_DELAY * (2 ** attempt), WRITE_RETRY_MAX_DELAY)
+                delay *= random.uniform(0.5, 1.0)
+                if time.monotonic() + delay > deadline_at:
+                    self._count("deadline_exceeded")
+                    raise WriteDeadlineExceeded(
+                        f"Database stayed locked for the whole write deadline ({attempt} attempts)"
+                    ) from exc
+                self._count("busy_retries")
+                time.sleep(delay)
+            else:
+                self._count("completed")
+                return result
+
+    def _count(self, key: str) -> None:
+        with self._state:
+            self._count_locked(key)
+
+    def _count_locked(self, key: str) -> None:
+        self._stats[key] += 1
+        write_outcomes_total.labels(key).inc()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current queue depth and cumulative counters"""
+        with self._state:
+            stats = dict(self._stats)
+            stats["queue_depth"] = self._waiting
+        stats["max_depth"] = self.max_depth
+        stats["deadline_seconds"] = self.deadline
+        queued = stats["submitted"]
+        stats["wait_seconds_avg"] = stats["wait_seconds_total"] / queued if queued else 0.0
+        return stats
+
+
+write_coordinator = WriteCoordinator()
+write_queue_depth.set_function(lambda: write_coordinator.queue_depth)